@@ -1,56 +1,245 @@
 import os
 import json
+import time
+import uuid
 import datetime
-from flask import Flask, render_template, request, jsonify, send_file
-from news_harvester import NewsScraper
-from news_classifier import NewsClassifier
-from news_analyzer import NewsAnalyzer
-from text_to_speech import TextToSpeech
+import threading
+from collections import OrderedDict
+from flask import Flask, Response, render_template, request, jsonify, send_file, stream_with_context, redirect, url_for, abort, g
+from harvest_jobs import HarvestJobRunner
+from result_cache import ResultCache, news_data_hash
+from lazy_component import LazyComponent, lazy
+from scheduler import SourceScheduler
+from snapshots import is_snapshot, list_snapshots, save_snapshot, load_snapshot, read_article
+from instrumentation import registry, STAGE_SECONDS, IN_FLIGHT, REQUEST_SECONDS, SamplingProfiler
 
 app = Flask(__name__)
 app.config['JSON_SORT_KEYS'] = False
 
-# Initialize components
-news_scraper = NewsScraper()
-news_classifier = NewsClassifier()
-news_analyzer = NewsAnalyzer()
-text_to_speech = TextToSpeech()
+# Initialize components. Each one (and its heavy imports: newspaper, scikit-learn,
+# NLTK, numpy) is only built when a request first needs it, so workers start fast.
+news_scraper = lazy('news_harvester', 'NewsScraper')
+news_classifier = lazy('news_classifier', 'NewsClassifier')
+news_analyzer = lazy('news_analyzer', 'NewsAnalyzer')
+text_to_speech = lazy('text_to_speech', 'TextToSpeech')
+article_store = lazy('article_store', 'ArticleStore')
+corpus_stats = lazy('corpus_stats', 'CorpusStats')
+result_cache = ResultCache()
+story_index = lazy('dedup', 'StoryIndex')
+
+# Threat spike alerts are POSTed to FIJI_NEWS_ALERT_WEBHOOK when it is set
+threat_monitor = lazy('threat_monitor', 'ThreatMonitor', webhook_url=os.environ.get('FIJI_NEWS_ALERT_WEBHOOK'))
 
 # Create data directory if it doesn't exist
 if not os.path.exists('data'):
     os.makedirs('data')
 
+# A request with ?profile=1 is sampled and its folded stacks saved to data/profiles.
+# Off unless FIJI_NEWS_PROFILING=1, since sampling slows the request down.
+app.config['PROFILING_ENABLED'] = os.environ.get('FIJI_NEWS_PROFILING') == '1'
+
+@app.before_request
+def start_request_metrics():
+    g.request_started = time.perf_counter()
+    IN_FLIGHT.inc(operation="http_request")
+    if app.config['PROFILING_ENABLED'] and request.args.get('profile'):
+        g.profiler = SamplingProfiler().start()
+
+@app.after_request
+def record_request_metrics(response):
+    # Routes rather than raw paths keep the number of label values bounded
+    endpoint = request.url_rule.rule if request.url_rule else "unmatched"
+    REQUEST_SECONDS.observe(
+        time.perf_counter() - g.request_started,
+        endpoint=endpoint, method=request.method, status=str(response.status_code)
+    )
+    
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        if not os.path.exists('data/profiles'):
+            os.makedirs('data/profiles')
+        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        filename = f"data/profiles/{request.endpoint}_{timestamp}.folded"
+        with open(filename, 'w', encoding='utf-8') as f:
+            f.write(profiler.stop())
+        response.headers['X-Profile'] = os.path.basename(filename)
+    return response
+
+@app.teardown_request
+def finish_request_metrics(error=None):
+    IN_FLIGHT.dec(operation="http_request")
+    # A request that raised never reached after_request
+    profiler = g.pop('profiler', None)
+    if profiler is not None:
+        profiler.stop()
+
+@app.route('/metrics')
+def metrics():
+    return Response(registry.render(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/')
 def index():
     return render_template('index.html')
 
+def ingest_articles(articles):
+    """Record classified articles in the article store and the corpus statistics; returns how many were new"""
+    new_count = article_store.save(articles)
+    # Syndicated copies would count the same story's terms several times
+    originals = [article for article in articles if not article.get("duplicate_of")]
+    corpus_stats.add(originals)
+    threat_monitor.observe(originals)
+    return new_count
+
+def summarize_batch(articles):
+    """Summarize freshly harvested articles, keeping the results in the harvester's index"""
+    try:
+        # Keyword weights come from the whole archive rather than the few articles of the batch
+        news_analyzer.summarize_articles(articles, document_frequencies=article_store.document_frequencies)
+        news_scraper.store_summaries(articles)
+    except Exception as e:
+        # Unsummarized articles are still classified and saved, and summarized at the next harvest
+        print(f"Error summarizing articles: {str(e)}")
+
+def poll_source(source):
+    """Harvest, classify and ingest one source for the scheduler; returns the number of new articles"""
+    articles = news_scraper.harvest_source(source)
+    story_index.classify_once(articles, news_classifier.categorize, summarize_batch)
+    return ingest_articles(articles)
+
+# Background polling of each source on its own adaptive interval.
+# Started with FIJI_NEWS_SCHEDULER=1 or through POST /scheduler, by one server process at a time.
+source_scheduler = LazyComponent(lambda: SourceScheduler(poll_source, news_scraper.sources, lock_path='data/scheduler.lock'))
+app.config['SCHEDULER_ENABLED'] = os.environ.get('FIJI_NEWS_SCHEDULER') == '1'
+
+# Fields of the articles streamed to the browser during a harvest; the rest is fetched when opened
+ARTICLE_LIST_FIELDS = ['url', 'title', 'source', 'published_date', 'category']
+
+def run_harvest(job):
+    """Harvest, classify and save news, streaming progress to the job"""
+    articles = []
+    
+    def on_source_start(source_name):
+        job.emit("source_started", {"source": source_name})
+    
+    def on_source_done(source_name, source_articles):
+        # Summarize and classify each source's articles as one batch as soon as the source
+        # finishes; copies of a story already seen at another source reuse its summary and category
+        story_index.classify_once(source_articles, news_classifier.categorize, summarize_batch)
+        articles.extend(source_articles)
+        for article in source_articles:
+            job.add_article(article, ARTICLE_LIST_FIELDS)
+        
+        # Threats are checked per source rather than after the whole harvest; ingest skips them later
+        for alert in threat_monitor.observe([a for a in source_articles if not a.get("duplicate_of")]):
+            job.emit("threat_alert", alert)
+        job.emit("source_finished", {"source": source_name, "count": len(source_articles)})
+    
+    news_scraper.harvest(on_source_start=on_source_start, on_source_done=on_source_done)
+    
+    categorized_articles = {category: [] for category in news_classifier.categories}
+    for article in articles:
+        categorized_articles[article["category"]].append(article)
+    
+    # Save the categorized news as a compressed snapshot with an index of the list fields
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    filename = f"data/fiji_news_{timestamp}.jsonl.gz"
+    
+    with STAGE_SECONDS.time(stage="serialize"):
+        save_snapshot(filename, categorized_articles)
+    
+    # Keep the article store and trend statistics up to date
+    ingest_articles(articles)
+    
+    job.emit("complete", {
+        "message": f"Harvested {len(articles)} articles",
+        "filename": os.path.basename(filename)
+    })
+
+harvest_jobs = HarvestJobRunner(run_harvest)
+
 @app.route('/harvest_news', methods=['POST'])
 def harvest_news():
     try:
-        articles = news_scraper.harvest()
-        categorized_articles = news_classifier.categorize(articles)
-        
-        # Save the categorized news to a JSON file
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"data/fiji_news_{timestamp}.json"
-        
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(categorized_articles, f, indent=4)
+        # A harvest that is already running is joined instead of starting a second crawl
+        job, created = harvest_jobs.start()
         
         return jsonify({
-            "status": "success",
-            "message": f"Harvested {len(articles)} articles",
-            "data": categorized_articles
-        })
+            "status": "accepted",
+            "message": "Harvest started" if created else "Joined the harvest already in progress",
+            "job_id": job.id
+        }), 202
     except Exception as e:
         return jsonify({
             "status": "error",
             "message": str(e)
         }), 500
 
+@app.route('/harvest_jobs/<job_id>', methods=['GET'])
+def harvest_job_status(job_id):
+    job = harvest_jobs.get(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": "Unknown harvest job"}), 404
+    
+    return jsonify({"status": "success", "job": job.to_dict()})
+
+@app.route('/harvest_jobs/<job_id>/events', methods=['GET'])
+def harvest_job_events(job_id):
+    job = harvest_jobs.get(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": "Unknown harvest job"}), 404
+    
+    # Reconnecting EventSource clients resume after the last event they saw
+    last_event_id = request.headers.get('Last-Event-ID', type=int)
+    start = last_event_id + 1 if last_event_id is not None else 0
+    
+    return Response(
+        stream_with_context(job.stream(start)),
+        mimetype='text/event-stream',
+        headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'}
+    )
+
+@app.route('/harvest_jobs/<job_id>/articles/<int:position>', methods=['GET'])
+def harvest_job_article(job_id, position):
+    job = harvest_jobs.get(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": "Unknown harvest job"}), 404
+    
+    try:
+        return jsonify({"status": "success", "article": job.article(position)})
+    except IndexError as e:
+        return jsonify({"status": "error", "message": str(e)}), 404
+
+@app.route('/scheduler', methods=['GET', 'POST'])
+def scheduler_status():
+    try:
+        if request.method == 'POST':
+            action = (request.json or {}).get('action')
+            if action == 'start':
+                if not source_scheduler.start():
+                    return jsonify({"status": "error", "message": "The scheduler is running in another server process"}), 409
+            elif action == 'stop':
+                source_scheduler.stop()
+            else:
+                return jsonify({"status": "error", "message": "action must be start or stop"}), 400
+        
+        return jsonify({"status": "success", "scheduler": source_scheduler.status()})
+    except Exception as e:
+        return jsonify({
+            "status": "error",
+            "message": str(e)
+        }), 500
+
+def snapshot_path(filename):
+    """Path of a saved snapshot, refusing anything that isn't one"""
+    filename = os.path.basename(filename)
+    path = os.path.join('data', filename)
+    if not is_snapshot(filename) or not os.path.exists(path):
+        raise ValueError(f"Unknown snapshot {filename}")
+    return path
+
 @app.route('/get_news_files', methods=['GET'])
 def get_news_files():
-    files = [f for f in os.listdir('data') if f.startswith('fiji_news_')]
+    files = [os.path.basename(path) for path in list_snapshots('data')]
     return jsonify({"files": files})
 
 @app.route('/load_news', methods=['POST'])
@@ -59,21 +248,189 @@ def load_news():
     if not filename:
         return jsonify({"status": "error", "message": "No filename provided"}), 400
     
+    # Only the requested fields are sent, e.g. what the article lists show
+    fields = request.json.get('fields')
+    if isinstance(fields, str):
+        fields = fields.split(',')
+    
     try:
-        with open(f"data/{filename}", 'r', encoding='utf-8') as f:
-            news_data = json.load(f)
+        with STAGE_SECONDS.time(stage="load_snapshot"):
+            news_data = load_snapshot(snapshot_path(filename), fields)
         return jsonify({"status": "success", "data": news_data})
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
+@app.route('/snapshots/<filename>/articles/<int:position>', methods=['GET'])
+def snapshot_article(filename, position):
+    try:
+        return jsonify({"status": "success", "article": read_article(snapshot_path(filename), position)})
+    except (ValueError, IndexError) as e:
+        return jsonify({"status": "error", "message": str(e)}), 404
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@app.route('/articles', methods=['GET'])
+def list_articles():
+    try:
+        page = max(request.args.get('page', 1, type=int), 1)
+        per_page = min(max(request.args.get('per_page', 50, type=int), 1), 200)
+        
+        # "days" is a shortcut for a since date relative to today
+        since = request.args.get('since')
+        days = request.args.get('days', type=int)
+        if days:
+            since = (datetime.date.today() - datetime.timedelta(days=days)).strftime("%Y-%m-%d")
+        
+        fields = request.args.get('fields')
+        result = article_store.query(
+            source=request.args.get('source'),
+            category=request.args.get('category'),
+            since=since,
+            until=request.args.get('until'),
+            search=request.args.get('q'),
+            limit=per_page,
+            offset=(page - 1) * per_page,
+            fields=fields.split(',') if fields else None
+        )
+        
+        return jsonify({
+            "status": "success",
+            "total": result["total"],
+            "page": page,
+            "per_page": per_page,
+            "articles": result["articles"]
+        })
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@app.route('/search', methods=['GET'])
+def search_articles():
+    try:
+        per_page = min(max(request.args.get('per_page', 20, type=int), 1), 100)
+        
+        since = request.args.get('since')
+        days = request.args.get('days', type=int)
+        if days:
+            since = (datetime.date.today() - datetime.timedelta(days=days)).strftime("%Y-%m-%d")
+        
+        fields = request.args.get('fields')
+        result = article_store.search(
+            text=request.args.get('q'),
+            source=request.args.get('source'),
+            category=request.args.get('category'),
+            since=since,
+            until=request.args.get('until'),
+            limit=per_page,
+            cursor=request.args.get('cursor'),
+            fields=fields.split(',') if fields else None,
+            # Facets don't change while paging, so later pages can skip them with facets=0
+            facets=request.args.get('facets', '1') != '0'
+        )
+        
+        return jsonify({
+            "status": "success",
+            "total": result["total"],
+            "per_page": per_page,
+            "next_cursor": result["next_cursor"],
+            "facets": result["facets"],
+            "articles": result["articles"]
+        })
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@app.route('/threat_alerts', methods=['GET'])
+def threat_alerts():
+    try:
+        # Clients poll with the ID of the last alert they have seen
+        after = request.args.get('after', 0, type=int)
+        limit = min(max(request.args.get('limit', 100, type=int), 1), 500)
+        alerts = threat_monitor.alerts(after=after, limit=limit)
+        return jsonify({
+            "status": "success",
+            "alerts": alerts,
+            "last_id": alerts[-1]["id"] if alerts else after
+        })
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@app.route('/import_snapshots', methods=['POST'])
+def import_snapshots():
+    try:
+        results = article_store.import_snapshots('data')
+        
+        # Backfill trend statistics; articles already counted are skipped
+        corpus_stats.add(article_store.query(limit=None)["articles"])
+        return jsonify({
+            "status": "success",
+            "message": f"Imported {sum(results.values())} new articles from {len(results)} snapshots",
+            "files": results
+        })
+    except Exception as e:
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+def query_news_data(query):
+    """Load articles matching an article store query, grouped by category"""
+    articles = article_store.query(
+        source=query.get('source'),
+        category=query.get('category'),
+        since=query.get('since'),
+        until=query.get('until'),
+        search=query.get('q'),
+        limit=None
+    )["articles"]
+    
+    news_data = {category: [] for category in news_classifier.categories}
+    for article in articles:
+        news_data.setdefault(article["category"] or "others", []).append(article)
+    return news_data
+
+def resolve_news_data(payload):
+    """Identify the news a request refers to, returning (content hash, loader) or None"""
+    # A saved snapshot is identified by its file name, so the browser doesn't upload it again
+    snapshot = payload.get('snapshot')
+    if snapshot:
+        path = snapshot_path(snapshot)
+        return "snapshot:" + result_cache.file_hash(path), lambda: load_snapshot(path)
+    
+    # A harvest still running is identified by its job, whose articles are held in memory
+    job_id = payload.get('harvest_job')
+    if job_id:
+        job = harvest_jobs.get(job_id)
+        if job is None:
+            raise ValueError(f"Unknown harvest job {job_id}")
+        news_data = job.news_data(news_classifier.categories)
+        return "data:" + news_data_hash(news_data), lambda: news_data
+    
+    query = payload.get('query')
+    if query:
+        news_data = query_news_data(query)
+        return "query:" + news_data_hash(news_data), lambda: news_data
+    
+    news_data = payload.get('news_data')
+    if news_data:
+        return "data:" + news_data_hash(news_data), lambda: news_data
+    
+    return None
+
 @app.route('/generate_summary', methods=['POST'])
 def generate_summary():
     try:
-        news_data = request.json.get('news_data')
-        if not news_data:
+        resolved = resolve_news_data(request.json)
+        if not resolved:
             return jsonify({"status": "error", "message": "No news data provided"}), 400
         
-        summary = news_analyzer.generate_summary(news_data)
+        # Repeat requests for the same content are answered from the cache
+        content_hash, load_news_data = resolved
+        cache_key = result_cache.key('summary', content_hash, news_analyzer.VERSION)
+        cached = result_cache.get(cache_key)
+        if cached:
+            return jsonify({"status": "success", "cached": True, **cached})
+        
+        summary = news_analyzer.generate_summary(load_news_data())
         
         # Save the summary
         timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
@@ -82,11 +439,16 @@ def generate_summary():
         with open(filename, 'w', encoding='utf-8') as f:
             f.write(summary)
         
+        result = {"summary": summary, "filename": filename}
+        result_cache.put(cache_key, result)
+        
         return jsonify({
             "status": "success",
-            "summary": summary,
-            "filename": filename
+            "cached": False,
+            **result
         })
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
     except Exception as e:
         return jsonify({
             "status": "error",
@@ -96,24 +458,49 @@ def generate_summary():
 @app.route('/analyze_trends', methods=['POST'])
 def analyze_trends():
     try:
-        news_data = request.json.get('news_data')
-        if not news_data:
-            return jsonify({"status": "error", "message": "No news data provided"}), 400
+        since = request.json.get('since')
+        until = request.json.get('until')
+        resolved = resolve_news_data(request.json)
         
-        analysis = news_analyzer.analyze_trends(news_data)
+        # A date range is answered from the stored statistics without any article payload
+        if resolved:
+            content_hash, load_news_data = resolved
+        elif since or until:
+            # Both parts change with every write: the store's revision with any article saved,
+            # the ingested count once the statistics have caught up with new articles
+            content_hash = f"period:{since}:{until}:{article_store.revision()}:{corpus_stats.ingested_count()}"
+            load_news_data = None
+        else:
+            return jsonify({"status": "error", "message": "No news data or date range provided"}), 400
+        
+        # Repeat requests for the same content are answered from the cache
+        cache_key = result_cache.key('analysis', content_hash, news_analyzer.VERSION)
+        cached = result_cache.get(cache_key)
+        if cached:
+            return jsonify({"status": "success", "cached": True, **cached})
+        
+        if load_news_data:
+            analysis = news_analyzer.analyze_trends(load_news_data())
+        else:
+            analysis = news_analyzer.analyze_period(corpus_stats, article_store, since, until)
         
         # Save the analysis
         timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
         filename = f"data/analysis_{timestamp}.json"
         
-        with open(filename, 'w', encoding='utf-8') as f:
+        with open(filename, 'w', encoding='utf-8') as f, STAGE_SECONDS.time(stage="serialize"):
             json.dump(analysis, f, indent=4)
         
+        result = {"analysis": analysis, "filename": filename}
+        result_cache.put(cache_key, result)
+        
         return jsonify({
             "status": "success",
-            "analysis": analysis,
-            "filename": filename
+            "cached": False,
+            **result
         })
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
     except Exception as e:
         return jsonify({
             "status": "error",
@@ -127,6 +514,20 @@ def convert_to_speech():
         if not text:
             return jsonify({"status": "error", "message": "No text provided"}), 400
         
+        # Streaming requests get a URL that plays while the audio is being synthesized
+        if request.json.get('stream'):
+            stream_id = uuid.uuid4().hex
+            with audio_streams_lock:
+                audio_streams[stream_id] = text
+                while len(audio_streams) > 100:
+                    audio_streams.popitem(last=False)
+            return jsonify({"status": "success", "audio_url": url_for('stream_audio', stream_id=stream_id)})
+        
+        # Asynchronous requests return a job ID to poll instead of holding the request open
+        if request.json.get('async'):
+            job_id = text_to_speech.submit(text)
+            return jsonify({"status": "accepted", "job_id": job_id}), 202
+        
         audio_file = text_to_speech.convert(text)
         
         return jsonify({
@@ -139,9 +540,61 @@ def convert_to_speech():
             "message": str(e)
         }), 500
 
+@app.route('/speech_jobs/<job_id>', methods=['GET'])
+def speech_job_status(job_id):
+    job = text_to_speech.job_status(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": "Unknown speech job"}), 404
+    
+    return jsonify({"status": "success", "job": job})
+
+# Content types by extension; files from the old offline path are WAV data named .mp3
+AUDIO_MIMETYPES = {'.mp3': 'audio/mpeg', '.wav': 'audio/wav'}
+
 @app.route('/audio/<filename>')
 def serve_audio(filename):
-    return send_file(f"data/{filename}", mimetype="audio/mp3")
+    path = os.path.abspath(os.path.join('data', os.path.basename(filename)))
+    extension = os.path.splitext(path)[1].lower()
+    if not filename.startswith('audio_') or extension not in AUDIO_MIMETYPES or not os.path.exists(path):
+        abort(404)
+    
+    with open(path, 'rb') as f:
+        mimetype = 'audio/wav' if f.read(4) == b'RIFF' else AUDIO_MIMETYPES[extension]
+    
+    # conditional=True answers Range requests with 206 and If-None-Match with 304
+    return send_file(path, mimetype=mimetype, conditional=True, etag=True, max_age=3600)
+
+# Texts waiting to be streamed, by stream ID; request threads share it, so it is only used under the lock
+audio_streams = OrderedDict()
+audio_streams_lock = threading.Lock()
+
+@app.route('/audio_stream/<stream_id>')
+def stream_audio(stream_id):
+    with audio_streams_lock:
+        text = audio_streams.get(stream_id)
+    if text is None:
+        abort(404)
+    
+    # Once the audio is complete, replays are served from the file with range and ETag support
+    filename = text_to_speech.cache_filename(text)
+    if os.path.exists(filename):
+        return redirect(url_for('serve_audio', filename=os.path.basename(filename)))
+    
+    return Response(
+        stream_with_context(text_to_speech.stream(text)),
+        mimetype=AUDIO_MIMETYPES['.' + text_to_speech.online_backend.extension],
+        headers={'Cache-Control': 'no-cache'}
+    )
+
+def is_reloader_parent():
+    """True in the process `python app.py` starts only to run the debug reloader, which serves nothing"""
+    return __name__ == '__main__' and os.environ.get('WERKZEUG_RUN_MAIN') != 'true'
+
+# Polling starts with the app however it is served (python app.py, flask run, gunicorn),
+# except in the reloader's watcher process, which would poll alongside its child. Of several
+# workers only the first takes the scheduler lock; start() returns False in the others
+if app.config['SCHEDULER_ENABLED'] and not is_reloader_parent():
+    source_scheduler.start()
 
 if __name__ == '__main__':
     app.run(debug=True) 
\ No newline at end of file
@@ -0,0 +1,90 @@
+import os
+import json
+import time
+import sqlite3
+import threading
+
+class ArticleIndex:
+    """Persistent index of every article URL seen by the scraper"""
+    def __init__(self, db_path='data/article_index.db', recheck_after=6 * 3600):
+        # Create the data directory if it doesn't exist
+        directory = os.path.dirname(db_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        # Entries checked more recently than this (in seconds) are trusted without a request
+        self.recheck_after = recheck_after
+
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS articles (
+                url TEXT PRIMARY KEY,
+                content_hash TEXT,
+                etag TEXT,
+                last_modified TEXT,
+                record TEXT,
+                checked_at REAL
+            )
+        """)
+        self.conn.commit()
+
+    def get(self, url):
+        """Return the stored entry for a URL, or None if it has never been seen"""
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT content_hash, etag, last_modified, record, checked_at FROM articles WHERE url = ?",
+                (url,)
+            ).fetchone()
+
+        if row is None:
+            return None
+
+        return {
+            "url": url,
+            "content_hash": row[0],
+            "etag": row[1],
+            "last_modified": row[2],
+            # A stored None means the page was fetched but yielded no usable article
+            "record": json.loads(row[3]) if row[3] else None,
+            "checked_at": row[4]
+        }
+
+    def is_fresh(self, entry):
+        """Check whether an entry was verified recently enough to skip the network"""
+        return time.time() - entry["checked_at"] < self.recheck_after
+
+    def put(self, url, content_hash, etag, last_modified, record):
+        """Insert or replace the entry for a URL"""
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO articles VALUES (?, ?, ?, ?, ?, ?)",
+                (url, content_hash, etag, last_modified, json.dumps(record) if record else None, time.time())
+            )
+            self.conn.commit()
+
+    def update_summaries(self, articles):
+        """Store the summary and keywords of articles in their indexed records"""
+        with self.lock:
+            self.conn.executemany(
+                """UPDATE articles SET record = json_set(record, '$.summary', ?, '$.keywords', json(?))
+                   WHERE url = ? AND record IS NOT NULL""",
+                [(article.get("summary") or "", json.dumps(article.get("keywords") or []), article["url"]) for article in articles]
+            )
+            self.conn.commit()
+
+    def touch(self, url, etag=None, last_modified=None):
+        """Mark an entry as verified unchanged, refreshing its validators if the server sent new ones"""
+        with self.lock:
+            self.conn.execute(
+                """UPDATE articles SET checked_at = ?,
+                   etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified)
+                   WHERE url = ?""",
+                (time.time(), etag, last_modified, url)
+            )
+            self.conn.commit()
+
+    def close(self):
+        """Close the database connection"""
+        with self.lock:
+            self.conn.close()
\ No newline at end of file
@@ -0,0 +1,365 @@
+import os
+import re
+import json
+import base64
+import sqlite3
+import datetime
+import threading
+from collections import Counter
+from snapshots import list_snapshots, load_snapshot
+
+class ArticleStore:
+    """Persistent SQLite store of harvested articles, keyed by URL, with full-text search"""
+    # Columns that can be requested from query()
+    FIELDS = ['url', 'title', 'source', 'category', 'published_date', 'text', 'summary', 'keywords', 'harvested_at', 'story_id']
+
+    # BM25 weights of the title, text and keywords columns of the full-text index
+    SEARCH_WEIGHTS = (5.0, 1.0, 3.0)
+
+    # Columns whose value counts search() reports for the matching articles
+    FACETS = ['source', 'category', 'published_date']
+
+    def __init__(self, db_path='data/articles.db'):
+        # Create the data directory if it doesn't exist
+        directory = os.path.dirname(db_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS articles (
+                id INTEGER PRIMARY KEY,
+                url TEXT UNIQUE NOT NULL,
+                title TEXT,
+                source TEXT,
+                category TEXT,
+                published_date TEXT,
+                text TEXT,
+                summary TEXT,
+                keywords TEXT,
+                harvested_at TEXT
+            );
+            CREATE INDEX IF NOT EXISTS idx_articles_source ON articles (source, published_date);
+            CREATE INDEX IF NOT EXISTS idx_articles_category ON articles (category, published_date);
+            CREATE INDEX IF NOT EXISTS idx_articles_published ON articles (published_date);
+
+            -- Full-text index kept in sync with the articles table by triggers
+            CREATE VIRTUAL TABLE IF NOT EXISTS articles_fts USING fts5(
+                title, text, keywords, content='articles', content_rowid='id'
+            );
+            CREATE TRIGGER IF NOT EXISTS articles_ai AFTER INSERT ON articles BEGIN
+                INSERT INTO articles_fts (rowid, title, text, keywords)
+                VALUES (new.id, new.title, new.text, new.keywords);
+            END;
+            CREATE TRIGGER IF NOT EXISTS articles_ad AFTER DELETE ON articles BEGIN
+                INSERT INTO articles_fts (articles_fts, rowid, title, text, keywords)
+                VALUES ('delete', old.id, old.title, old.text, old.keywords);
+            END;
+            CREATE TRIGGER IF NOT EXISTS articles_au AFTER UPDATE ON articles BEGIN
+                INSERT INTO articles_fts (articles_fts, rowid, title, text, keywords)
+                VALUES ('delete', old.id, old.title, old.text, old.keywords);
+                INSERT INTO articles_fts (rowid, title, text, keywords)
+                VALUES (new.id, new.title, new.text, new.keywords);
+            END;
+
+            -- Terms of the full-text index with the number of articles containing each
+            CREATE VIRTUAL TABLE IF NOT EXISTS articles_vocab USING fts5vocab(articles_fts, 'row');
+        """)
+
+        # Databases created before story clustering lack the story_id column
+        columns = {row[1] for row in self.conn.execute("PRAGMA table_info(articles)")}
+        if 'story_id' not in columns:
+            self.conn.execute("ALTER TABLE articles ADD COLUMN story_id INTEGER")
+
+        # Revision counter bumped by every change to the stored articles, for cache keys
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS revision (value INTEGER NOT NULL);
+            INSERT INTO revision SELECT 0 WHERE NOT EXISTS (SELECT 1 FROM revision);
+            CREATE TRIGGER IF NOT EXISTS articles_revision_ai AFTER INSERT ON articles BEGIN
+                UPDATE revision SET value = value + 1;
+            END;
+            CREATE TRIGGER IF NOT EXISTS articles_revision_ad AFTER DELETE ON articles BEGIN
+                UPDATE revision SET value = value + 1;
+            END;
+            -- Harvesting an unchanged article again only moves harvested_at, which no analysis reads
+            CREATE TRIGGER IF NOT EXISTS articles_revision_au AFTER UPDATE ON articles
+            WHEN old.title IS NOT new.title OR old.source IS NOT new.source OR old.category IS NOT new.category
+                OR old.published_date IS NOT new.published_date OR old.text IS NOT new.text
+                OR old.summary IS NOT new.summary OR old.keywords IS NOT new.keywords OR old.story_id IS NOT new.story_id
+            BEGIN
+                UPDATE revision SET value = value + 1;
+            END;
+        """)
+
+        # The full-text index ranks by BM25 with these column weights (persisted in the index)
+        self.conn.execute(
+            "INSERT INTO articles_fts (articles_fts, rank) VALUES ('rank', ?)",
+            ("bm25({}, {}, {})".format(*self.SEARCH_WEIGHTS),)
+        )
+        self.conn.commit()
+
+    def save(self, articles, harvested_at=None):
+        """Insert or update articles by URL and return how many were new"""
+        if harvested_at is None:
+            harvested_at = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+        new_count = 0
+        with self.lock:
+            for article in articles:
+                exists = self.conn.execute("SELECT 1 FROM articles WHERE url = ?", (article["url"],)).fetchone()
+                self.conn.execute(
+                    """INSERT INTO articles (url, title, source, category, published_date, text, summary, keywords, harvested_at, story_id)
+                       VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                       ON CONFLICT (url) DO UPDATE SET
+                           title = excluded.title, source = excluded.source, category = excluded.category,
+                           published_date = excluded.published_date, text = excluded.text,
+                           summary = excluded.summary, keywords = excluded.keywords,
+                           story_id = COALESCE(excluded.story_id, story_id)""",
+                    (
+                        article["url"], article["title"], article["source"], article.get("category"),
+                        article["published_date"], article["text"], article.get("summary"),
+                        json.dumps(article.get("keywords") or []), harvested_at, article.get("story_id")
+                    )
+                )
+                if not exists:
+                    new_count += 1
+            self.conn.commit()
+
+        return new_count
+
+    def import_snapshot(self, path):
+        """Import a fiji_news_<timestamp> snapshot and return how many articles were new"""
+        news_data = load_snapshot(path)
+
+        # The snapshot timestamp is the best record of when its articles were harvested
+        harvested_at = None
+        match = re.search(r'(\d{8})_(\d{6})', os.path.basename(path))
+        if match:
+            harvested_at = datetime.datetime.strptime("".join(match.groups()), "%Y%m%d%H%M%S").strftime("%Y-%m-%d %H:%M:%S")
+
+        articles = []
+        for category, category_articles in news_data.items():
+            for article in category_articles:
+                article.setdefault("category", category)
+                articles.append(article)
+
+        return self.save(articles, harvested_at)
+
+    def import_snapshots(self, directory='data'):
+        """Import every JSON snapshot in a directory"""
+        results = {}
+        for path in list_snapshots(directory):
+            results[os.path.basename(path)] = self.import_snapshot(path)
+        return results
+
+    def query(self, source=None, category=None, since=None, until=None, search=None,
+              limit=50, offset=0, fields=None):
+        """Return one page of articles matching the filters, newest first (limit=None for all)"""
+        fields = self._fields(fields)
+        match = self._match_expression(search) if search else None
+        conditions = []
+        params = []
+
+        if source:
+            conditions.append("a.source = ?")
+            params.append(source)
+        if category:
+            conditions.append("a.category = ?")
+            params.append(category)
+        if since:
+            conditions.append("a.published_date >= ?")
+            params.append(since)
+        if until:
+            conditions.append("a.published_date <= ?")
+            params.append(until)
+        if match:
+            conditions.append("a.id IN (SELECT rowid FROM articles_fts WHERE articles_fts MATCH ?)")
+            params.append(match)
+
+        where = ("WHERE " + " AND ".join(conditions)) if conditions else ""
+        columns = ", ".join(f"a.{f}" for f in fields)
+
+        with self.lock:
+            total = self.conn.execute(f"SELECT COUNT(*) FROM articles a {where}", params).fetchone()[0]
+            rows = self.conn.execute(
+                f"SELECT {columns} FROM articles a {where} ORDER BY a.published_date DESC, a.id DESC LIMIT ? OFFSET ?",
+                params + [-1 if limit is None else limit, offset]
+            ).fetchall()
+
+        return {"total": total, "articles": [self._row_to_article(row) for row in rows]}
+
+    def search(self, text=None, source=None, category=None, since=None, until=None,
+               limit=20, cursor=None, fields=None, facets=True):
+        """Return one page of articles ranked by BM25 relevance (newest first without text)
+
+        The cursor returned with a page fetches the next one, so deep pages cost the
+        same as the first. Facets count the matching articles per source, category
+        and date, for the charts.
+        """
+        fields = self._fields(fields)
+        match = self._match_expression(text) if text else None
+        conditions = []
+        params = []
+
+        if match:
+            conditions.append("articles_fts MATCH ?")
+            params.append(match)
+        if source:
+            conditions.append("a.source = ?")
+            params.append(source)
+        if category:
+            conditions.append("a.category = ?")
+            params.append(category)
+        if since:
+            conditions.append("a.published_date >= ?")
+            params.append(since)
+        if until:
+            conditions.append("a.published_date <= ?")
+            params.append(until)
+
+        if match:
+            # The index's rank is its weighted BM25 score, lower for better matches
+            tables = "articles_fts JOIN articles a ON a.id = articles_fts.rowid"
+            sort_key = "articles_fts.rank"
+            order = "ASC"
+            extra_columns = ", snippet(articles_fts, 1, '<mark>', '</mark>', '...', 24) AS snippet"
+        else:
+            # Sorting on the bare column lets SQLite walk the published_date index
+            tables = "articles a"
+            sort_key = "a.published_date"
+            order = "DESC"
+            extra_columns = ""
+
+        where = ("WHERE " + " AND ".join(conditions)) if conditions else ""
+
+        # Keyset pagination: continue after the (sort key, id) of the last article sent
+        page_conditions = list(conditions)
+        page_params = list(params)
+        if cursor:
+            last_key, last_id = self._decode_cursor(cursor)
+            comparison = ">" if order == "ASC" else "<"
+            if last_key is None:
+                # Articles without a date sort last
+                page_conditions.append(f"({sort_key} IS NULL AND a.id {comparison} ?)")
+                page_params.append(last_id)
+            else:
+                page_conditions.append(
+                    f"({sort_key} {comparison} ? OR ({sort_key} = ? AND a.id {comparison} ?)"
+                    + (f" OR {sort_key} IS NULL)" if order == "DESC" else ")")
+                )
+                page_params.extend([last_key, last_key, last_id])
+        page_where = ("WHERE " + " AND ".join(page_conditions)) if page_conditions else ""
+        columns = ", ".join(f"a.{f}" for f in fields)
+
+        with self.lock:
+            rows = self.conn.execute(
+                f"""SELECT {columns}{extra_columns}, {sort_key} AS sort_key, a.id AS row_id
+                    FROM {tables} {page_where}
+                    ORDER BY {sort_key} {order}, a.id {order} LIMIT ?""",
+                page_params + [limit + 1]
+            ).fetchall()
+
+            facet_counts = {}
+            if facets and match:
+                # Counting one pass over the matches beats running the full-text match once per facet
+                matches = self.conn.execute(
+                    f"SELECT {', '.join('a.' + f for f in self.FACETS)} FROM {tables} {where}", params
+                ).fetchall()
+                total = len(matches)
+                for i, column in enumerate(self.FACETS):
+                    counts = Counter(row[i] for row in matches)
+                    facet_counts[column] = dict(sorted(counts.items(), key=lambda item: (-item[1], str(item[0]))))
+            else:
+                total = self.conn.execute(f"SELECT COUNT(*) FROM {tables} {where}", params).fetchone()[0]
+
+                # Without a text query the column indexes make a GROUP BY per facet cheap
+                for column in (self.FACETS if facets else []):
+                    facet_counts[column] = {
+                        row[0]: row[1] for row in self.conn.execute(
+                            f"""SELECT a.{column}, COUNT(*) AS total FROM {tables} {where}
+                                GROUP BY a.{column} ORDER BY total DESC, a.{column}""",
+                            params
+                        )
+                    }
+
+        # One extra row tells whether there is a next page
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = self._encode_cursor(rows[-1]["sort_key"], rows[-1]["row_id"])
+
+        articles = []
+        for row in rows:
+            article = self._row_to_article(row)
+            del article["sort_key"], article["row_id"]
+            articles.append(article)
+
+        return {"total": total, "articles": articles, "next_cursor": next_cursor, "facets": facet_counts}
+
+    def _fields(self, fields):
+        """Requested article fields, all of them by default; unknown names raise ValueError"""
+        if not fields:
+            return list(self.FIELDS)
+        unknown = [f for f in fields if f not in self.FIELDS]
+        if unknown:
+            raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+        return list(fields)
+
+    def _match_expression(self, text):
+        """FTS5 query for free text: every word must match, and a trailing * matches a prefix"""
+        terms = re.findall(r'\w+\*?', text)
+        if not terms:
+            return None
+        # Quoting each word keeps user input from being read as FTS5 syntax
+        return " ".join(f'"{term.rstrip("*")}"' + ("*" if term.endswith("*") else "") for term in terms)
+
+    def _encode_cursor(self, sort_key, row_id):
+        return base64.urlsafe_b64encode(json.dumps([sort_key, row_id]).encode('utf-8')).decode('ascii')
+
+    def _decode_cursor(self, cursor):
+        try:
+            sort_key, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+            return sort_key, int(row_id)
+        except Exception:
+            raise ValueError("Invalid cursor")
+
+    def revision(self):
+        """Number that changes whenever any stored article is added, changed or removed"""
+        with self.lock:
+            return self.conn.execute("SELECT value FROM revision").fetchone()[0]
+
+    def document_frequencies(self, terms):
+        """Number of stored articles containing each term, and the number of stored articles"""
+        terms = list(terms)
+        found = {}
+        with self.lock:
+            total = self.conn.execute("SELECT COUNT(*) FROM articles").fetchone()[0]
+            # Looked up in chunks to stay under SQLite's limit on query parameters
+            for start in range(0, len(terms), 500):
+                chunk = terms[start:start + 500]
+                found.update(self.conn.execute(
+                    f"SELECT term, doc FROM articles_vocab WHERE term IN ({', '.join('?' * len(chunk))})", chunk
+                ).fetchall())
+        return [found.get(term, 0) for term in terms], total
+
+    def get(self, url):
+        """Return a single article by URL, or None"""
+        with self.lock:
+            row = self.conn.execute(
+                f"SELECT {', '.join(self.FIELDS)} FROM articles WHERE url = ?", (url,)
+            ).fetchone()
+        return self._row_to_article(row) if row else None
+
+    def _row_to_article(self, row):
+        """Convert a database row into an article dictionary"""
+        article = dict(row)
+        if "keywords" in article:
+            article["keywords"] = json.loads(article["keywords"]) if article["keywords"] else []
+        return article
+
+    def close(self):
+        """Close the database connection"""
+        with self.lock:
+            self.conn.close()
\ No newline at end of file
@@ -0,0 +1,110 @@
+import random
+import datetime
+
+# Vocabulary per category, loosely modelled on Fiji news coverage
+TOPICS = {
+    'politics': {
+        'subjects': ['The Prime Minister', 'The Opposition Leader', 'The Minister for Finance', 'Members of Parliament', 'The Fijian Government', 'The Electoral Commission'],
+        'actions': ['tabled a new bill on', 'debated the budget for', 'announced a policy review of', 'called for an inquiry into', 'passed legislation on', 'criticised the handling of'],
+        'objects': ['rural electrification', 'sugar industry reform', 'public service wages', 'the national budget', 'land lease renewals', 'climate adaptation funding'],
+        'places': ['Parliament in Suva', 'the Government Buildings', 'a press conference in Suva', 'a cabinet meeting']
+    },
+    'community': {
+        'subjects': ['Villagers', 'The church group', 'Local volunteers', 'The school committee', 'Youth leaders', 'The women\'s club'],
+        'actions': ['organised a fundraiser for', 'celebrated the opening of', 'gathered to support', 'held a festival for', 'welcomed donations for', 'began rebuilding'],
+        'objects': ['the new community hall', 'a village water project', 'the local school', 'families affected by flooding', 'the health centre', 'the Hibiscus Festival'],
+        'places': ['Nadi', 'Lautoka', 'Labasa', 'a village on Vanua Levu', 'Savusavu', 'Ba']
+    },
+    'sports': {
+        'subjects': ['The Flying Fijians', 'The Fiji Sevens team', 'The national coach', 'The football squad', 'Young athletes', 'The netball team'],
+        'actions': ['won the final against', 'trained hard ahead of', 'named a squad for', 'celebrated victory over', 'lost narrowly to', 'prepared for'],
+        'objects': ['the Pacific Nations Cup', 'the World Rugby Sevens series', 'the Coral Coast tournament', 'the national championship', 'Tonga', 'Samoa'],
+        'places': ['ANZ Stadium in Suva', 'Churchill Park in Lautoka', 'Prince Charles Park in Nadi', 'the national training centre']
+    },
+    'crime': {
+        'subjects': ['Police', 'The High Court', 'Investigators', 'The Director of Public Prosecutions', 'A magistrate', 'Officers'],
+        'actions': ['arrested two suspects over', 'opened an investigation into', 'charged a man with', 'sentenced the accused for', 'issued a warning about', 'seized evidence linked to'],
+        'objects': ['a burglary', 'drug trafficking', 'a serious assault', 'fraud at a local business', 'a robbery', 'theft of livestock'],
+        'places': ['the Suva Magistrates Court', 'Totogo Police Station', 'Nausori', 'Sigatoka', 'Rakiraki']
+    },
+    'others': {
+        'subjects': ['Tourism operators', 'The weather office', 'Farmers', 'Exporters', 'Airline staff', 'Scientists'],
+        'actions': ['reported strong demand for', 'issued a forecast for', 'welcomed rising prices for', 'expanded services to', 'studied the effects of', 'prepared for'],
+        'objects': ['the cyclone season', 'kava exports', 'new international flights', 'coral reef health', 'cruise ship arrivals', 'the sugar cane harvest'],
+        'places': ['Nadi International Airport', 'the Yasawa Islands', 'the Coral Coast', 'Taveuni', 'the Mamanuca Group']
+    }
+}
+
+SOURCES = ['Fiji Times', 'Fiji Sun', 'Fiji Village', 'FBC News', 'Islands Business']
+
+FILLER = [
+    'Residents said the news was welcome.',
+    'Further details are expected later this week.',
+    'The announcement was made on Monday.',
+    'Officials said more work was needed.',
+    'The issue has drawn concern from several groups.',
+    'Stakeholders have been invited to provide feedback.',
+    'The matter will be discussed again next month.',
+    'Many Fijians have followed the story closely.'
+]
+
+def _sentence(rng, topic):
+    """One news sentence about a topic"""
+    return f"{rng.choice(topic['subjects'])} {rng.choice(topic['actions'])} {rng.choice(topic['objects'])} at {rng.choice(topic['places'])}."
+
+def generate_article(rng, index, category, source, published_date, sentences=12):
+    """A single synthetic article in the scraper's output format"""
+    topic = TOPICS[category]
+    headline = _sentence(rng, topic).rstrip('.')
+    body = [f"SUVA, Fiji - {headline}."]
+    for _ in range(sentences - 1):
+        body.append(_sentence(rng, topic) if rng.random() < 0.7 else rng.choice(FILLER))
+    text = " ".join(body)
+    slug = "-".join(word.lower() for word in headline.replace("'", "").split()[:8])
+
+    return {
+        "title": headline,
+        "url": f"https://example.com/news/{published_date.replace('-', '/')}/{slug}-{index}/",
+        "source": source,
+        "published_date": published_date,
+        "text": text,
+        "summary": " ".join(body[:2]),
+        "keywords": sorted({word.lower() for word in headline.split() if len(word) > 4})[:10],
+        "category": category
+    }
+
+def generate_corpus(size, seed=0, days=30, duplicate_rate=0.1, end_date=None):
+    """Generate size articles spread over the given number of days
+
+    A duplicate_rate fraction are lightly edited copies of an earlier article
+    published by a different source, like syndicated stories.
+    """
+    rng = random.Random(seed)
+    end = end_date or datetime.date(2025, 1, 31)
+    categories = list(TOPICS)
+    articles = []
+
+    for index in range(size):
+        if articles and rng.random() < duplicate_rate:
+            original = rng.choice(articles)
+            copy = dict(original)
+            copy["source"] = rng.choice([s for s in SOURCES if s != original["source"]])
+            copy["url"] = original["url"].replace("/news/", f"/{copy['source'].lower().replace(' ', '-')}/news/")
+            copy["url"] = copy["url"].rstrip('/') + f"-{index}/"
+            copy["text"] = f"{original['text']} This story was first published by {original['source']}."
+            articles.append(copy)
+            continue
+
+        published = end - datetime.timedelta(days=rng.randrange(days))
+        articles.append(generate_article(
+            rng, index, rng.choice(categories), rng.choice(SOURCES), published.strftime("%Y-%m-%d")
+        ))
+
+    return articles
+
+def to_news_data(articles):
+    """Group articles by category, as the JSON snapshots are"""
+    news_data = {category: [] for category in TOPICS}
+    for article in articles:
+        news_data[article["category"]].append(article)
+    return news_data
\ No newline at end of file
@@ -0,0 +1,230 @@
+import time
+import random
+import hashlib
+import datetime
+import threading
+import email.utils
+from html import escape
+from urllib.parse import urlparse
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from benchmarks.corpus import TOPICS, SOURCES
+
+class MockNewsSite:
+    """The pages of one news source: a homepage, category pages and article pages
+
+    feed is 'rss' or 'atom' for a feed linked from the homepage, 'sitemap' for a
+    monthly sitemap index declared in robots.txt, or None for neither.
+    """
+    def __init__(self, name, articles, feed=None, feed_size=50):
+        self.name = name
+        self.feed = feed
+        self.feed_size = feed_size
+        self.articles = {}
+        self.categories = {category: [] for category in TOPICS}
+
+        for article in articles:
+            # Articles keep their path; the host is whichever port this site is served on
+            path = urlparse(article["url"]).path
+            self.articles[path] = article
+            self.categories[article["category"]].append(path)
+
+    def page(self, path, host):
+        """(content type, body) for a path, or None if there is no such page"""
+        if path in ('', '/'):
+            links = [f'<li><a href="/{category}/">{category.title()}</a></li>' for category in self.categories]
+            latest = [self._link(p) for paths in self.categories.values() for p in paths[:5]]
+            meta = ""
+            if self.feed in ('rss', 'atom'):
+                meta = f'<link rel="alternate" type="application/{self.feed}+xml" href="/{self.feed}.xml">'
+            return "text/html", self._layout(self.name, f"<nav><ul>{''.join(links)}</ul></nav><ul>{''.join(latest)}</ul>", meta)
+
+        feeds = {
+            '/rss.xml': self.feed == 'rss' and self._rss,
+            '/atom.xml': self.feed == 'atom' and self._atom,
+            '/sitemap.xml': self.feed == 'sitemap' and self._sitemap_index
+        }
+        if feeds.get(path):
+            return "application/xml", feeds[path](host)
+        if path == '/robots.txt':
+            sitemap = f"Sitemap: http://{host}/sitemap.xml\n" if self.feed == 'sitemap' else ""
+            return "text/plain", f"User-agent: *\nAllow: /\n{sitemap}"
+        if self.feed == 'sitemap' and path.startswith('/sitemap-') and path.endswith('.xml'):
+            month = path[len('/sitemap-'):-len('.xml')]
+            return "application/xml", self._sitemap(host, month)
+
+        category = path.strip('/')
+        if category in self.categories:
+            links = [self._link(p) for p in self.categories[category]]
+            return "text/html", self._layout(f"{category.title()} - {self.name}", f"<ul>{''.join(links)}</ul>")
+
+        article = self.articles.get(path)
+        if article is None:
+            return None
+
+        paragraphs = "".join(f"<p>{escape(sentence)}.</p>" for sentence in article["text"].split(". "))
+        return "text/html", self._layout(
+            f"{article['title']} - {self.name}",
+            f"<article><h1>{escape(article['title'])}</h1>"
+            f"<time datetime=\"{article['published_date']}\">{article['published_date']}</time>"
+            f"{paragraphs}</article>",
+            meta=f"<meta property=\"article:published_time\" content=\"{article['published_date']}T08:00:00+12:00\">"
+        )
+
+    def _newest(self):
+        """Article paths, newest first"""
+        return sorted(self.articles, key=lambda p: self.articles[p]["published_date"], reverse=True)
+
+    def _published(self, path):
+        date = datetime.datetime.strptime(self.articles[path]["published_date"], "%Y-%m-%d")
+        return date.replace(hour=8, tzinfo=datetime.timezone(datetime.timedelta(hours=12)))
+
+    def _rss(self, host):
+        items = "".join(
+            f"<item><title>{escape(self.articles[p]['title'])}</title><link>http://{host}{p}</link>"
+            f"<pubDate>{email.utils.format_datetime(self._published(p))}</pubDate></item>"
+            for p in self._newest()[:self.feed_size]
+        )
+        return f'<?xml version="1.0"?><rss version="2.0"><channel><title>{escape(self.name)}</title>{items}</channel></rss>'
+
+    def _atom(self, host):
+        entries = "".join(
+            f"<entry><title>{escape(self.articles[p]['title'])}</title><link href=\"http://{host}{p}\"/>"
+            f"<updated>{self._published(p).isoformat()}</updated></entry>"
+            for p in self._newest()[:self.feed_size]
+        )
+        return f'<?xml version="1.0"?><feed xmlns="http://www.w3.org/2005/Atom"><title>{escape(self.name)}</title>{entries}</feed>'
+
+    def _sitemap_index(self, host):
+        months = {}
+        for p in self.articles:
+            month = self.articles[p]["published_date"][:7]
+            months[month] = max(months.get(month, ""), self.articles[p]["published_date"])
+        sitemaps = "".join(
+            f"<sitemap><loc>http://{host}/sitemap-{month}.xml</loc><lastmod>{lastmod}</lastmod></sitemap>"
+            for month, lastmod in sorted(months.items())
+        )
+        return f'<?xml version="1.0"?><sitemapindex xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{sitemaps}</sitemapindex>'
+
+    def _sitemap(self, host, month):
+        urls = "".join(
+            f"<url><loc>http://{host}{p}</loc><lastmod>{self._published(p).isoformat()}</lastmod></url>"
+            for p in self.articles if self.articles[p]["published_date"].startswith(month)
+        )
+        return f'<?xml version="1.0"?><urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">{urls}</urlset>'
+
+    def _link(self, path):
+        return f'<li><a href="{path}">{escape(self.articles[path]["title"])}</a></li>'
+
+    def _layout(self, title, body, meta=""):
+        return f"<html><head><title>{escape(title)}</title>{meta}</head><body>{body}</body></html>"
+
+class MockNewsServer:
+    """Serves a synthetic corpus as five local news sites, one port per source
+
+    latency is added to every response (seconds, with jitter of half as much again)
+    and error_rate is the fraction of requests answered with a 503. With feeds,
+    the sites offer RSS, Atom, sitemaps or nothing, like the real sources do.
+    """
+    FEEDS = ['rss', 'rss', 'atom', 'sitemap', None]
+
+    def __init__(self, articles, latency=0.0, error_rate=0.0, seed=0, feeds=True):
+        self.latency = latency
+        self.error_rate = error_rate
+        self.random = random.Random(seed)
+        self.random_lock = threading.Lock()
+        self.requests = 0
+        self.errors = 0
+
+        by_source = {source: [] for source in SOURCES}
+        for article in articles:
+            by_source.setdefault(article["source"], []).append(article)
+        self.sites = [
+            MockNewsSite(name, site_articles, self.FEEDS[i % len(self.FEEDS)] if feeds else None)
+            for i, (name, site_articles) in enumerate(by_source.items())
+        ]
+        self.servers = []
+
+    def _handler(self, site):
+        """Request handler class bound to one site"""
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_GET(self):
+                with server.random_lock:
+                    server.requests += 1
+                    delay = server.latency * (1 + server.random.random() * 0.5)
+                    failed = server.random.random() < server.error_rate
+                    if failed:
+                        server.errors += 1
+                if delay:
+                    time.sleep(delay)
+
+                if failed:
+                    self._send(503, b"Service unavailable")
+                    return
+                page = site.page(urlparse(self.path).path, self.headers.get('Host'))
+                if page is None:
+                    self._send(404, b"Not found")
+                    return
+
+                content_type, text = page
+                body = text.encode('utf-8')
+                etag = '"' + hashlib.sha1(body).hexdigest() + '"'
+                if self.headers.get('If-None-Match') == etag:
+                    self._send(304, b"", {"ETag": etag})
+                    return
+                self._send(200, body, {"ETag": etag, "Content-Type": f"{content_type}; charset=utf-8"})
+
+            def _send(self, status, body, headers=None):
+                self.send_response(status)
+                for key, value in (headers or {}).items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        """Start one server thread per site and return the scraper source list"""
+        sources = []
+        for site in self.sites:
+            httpd = ThreadingHTTPServer(('127.0.0.1', 0), self._handler(site))
+            httpd.daemon_threads = True
+            thread = threading.Thread(target=httpd.serve_forever)
+            thread.daemon = True
+            thread.start()
+            self.servers.append(httpd)
+            sources.append({"name": site.name, "url": f"http://127.0.0.1:{httpd.server_address[1]}/"})
+        return sources
+
+    def stop(self):
+        """Shut every site down"""
+        for httpd in self.servers:
+            httpd.shutdown()
+            httpd.server_close()
+        self.servers = []
+
+if __name__ == '__main__':
+    import argparse
+    from benchmarks.corpus import generate_corpus
+
+    parser = argparse.ArgumentParser(description="Serve a synthetic corpus as local stand-ins for the Fiji news sites")
+    parser.add_argument('--articles', type=int, default=100)
+    parser.add_argument('--latency', type=float, default=0.05)
+    parser.add_argument('--error-rate', type=float, default=0.0)
+    args = parser.parse_args()
+
+    mock = MockNewsServer(generate_corpus(args.articles), args.latency, args.error_rate)
+    for source in mock.start():
+        print(f"{source['name']}: {source['url']}")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        mock.stop()
\ No newline at end of file
@@ -0,0 +1,188 @@
+import os
+import sys
+import json
+import time
+import copy
+import argparse
+import platform
+import datetime
+import tempfile
+import statistics
+
+# Components are imported from the repository root and write their data/ files
+# into a scratch directory, so benchmark runs never touch real snapshots
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.corpus import generate_corpus, to_news_data
+from benchmarks.mock_news_server import MockNewsServer
+
+THRESHOLDS_PATH = os.path.join(ROOT, 'benchmarks', 'thresholds.json')
+
+def measure(func, repeat=3):
+    """Run func repeat times and return timing statistics in seconds"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return {"seconds": min(timings), "median_seconds": statistics.median(timings), "repeat": repeat}
+
+def bench_harvest(size, latency, error_rate):
+    """Full harvest of a mock site holding size articles, then a re-harvest with a warm index"""
+    from http_client import PoliteSession
+    from news_harvester import NewsScraper
+
+    mock = MockNewsServer(generate_corpus(size, duplicate_rate=0), latency=latency, error_rate=error_rate)
+    sources = mock.start()
+    try:
+        scraper = NewsScraper(articles_per_source=size, index_path=os.path.join('data', f'bench_index_{size}.db'))
+        scraper.sources = sources
+        # Local servers need no politeness; this measures the pipeline rather than the rate limit
+        scraper.session = PoliteSession(headers=scraper.headers, rate=10000, burst=10000, max_per_host=8, pool_size=40)
+
+        articles = []
+        cold = measure(lambda: articles.extend(scraper.harvest()), repeat=1)
+        cold["articles"] = len(articles)
+        cold["requests"] = mock.requests
+        cold["errors"] = mock.errors
+
+        # Index entries are still fresh, so a second run skips every article download
+        warm = measure(scraper.harvest, repeat=1)
+        return {"harvest_cold": cold, "harvest_warm": warm}
+    finally:
+        mock.stop()
+
+def bench_components(articles):
+    """Classifier and analyzer on an in-memory corpus"""
+    from news_classifier import NewsClassifier
+    from news_analyzer import NewsAnalyzer
+
+    classifier = NewsClassifier()
+    analyzer = NewsAnalyzer()
+    news_data = to_news_data(articles)
+
+    return {
+        "categorize": measure(lambda: classifier.categorize(copy.deepcopy(articles))),
+        "generate_summary": measure(lambda: analyzer.generate_summary(news_data)),
+        "analyze_trends": measure(lambda: analyzer.analyze_trends(news_data))
+    }
+
+def bench_endpoints(articles):
+    """Flask endpoints through the test client, against a store holding the corpus"""
+    import app as web
+
+    client = web.app.test_client()
+    news_data = to_news_data(articles)
+    web.ingest_articles(articles)
+
+    def post(path, payload):
+        response = client.post(path, json=payload)
+        if response.status_code != 200:
+            raise RuntimeError(f"{path} returned {response.status_code}")
+
+    def get(path):
+        response = client.get(path)
+        if response.status_code != 200:
+            raise RuntimeError(f"{path} returned {response.status_code}")
+
+    # The first call computes the result, later calls are answered from the result cache
+    results = {
+        "endpoint_generate_summary_uncached": measure(lambda: post('/generate_summary', {"news_data": news_data}), repeat=1),
+        "endpoint_generate_summary_cached": measure(lambda: post('/generate_summary', {"news_data": news_data})),
+        "endpoint_analyze_trends_uncached": measure(lambda: post('/analyze_trends', {"news_data": news_data}), repeat=1),
+        "endpoint_analyze_period": measure(lambda: post('/analyze_trends', {"since": "2000-01-01"}), repeat=1),
+        "endpoint_articles_page": measure(lambda: get('/articles?per_page=50&category=politics')),
+        "endpoint_articles_search": measure(lambda: get('/articles?q=rugby&per_page=50'))
+    }
+    return results
+
+def run(sizes, harvest_max, latency, error_rate, include):
+    """Run every selected benchmark at every size; returns a flat name@size -> stats dict"""
+    results = {}
+    for size in sizes:
+        print(f"Benchmarking {size} articles...")
+        articles = generate_corpus(size)
+        groups = []
+        if 'harvest' in include and size <= harvest_max:
+            groups.append(lambda: bench_harvest(size, latency, error_rate))
+        if 'components' in include:
+            groups.append(lambda: bench_components(articles))
+        if 'endpoints' in include:
+            groups.append(lambda: bench_endpoints(articles))
+
+        for group in groups:
+            for name, stats in group().items():
+                stats["per_article_ms"] = stats["seconds"] * 1000 / size
+                results[f"{name}@{size}"] = stats
+                print(f"  {name}: {stats['seconds']:.3f}s ({stats['per_article_ms']:.3f} ms/article)")
+    return results
+
+def check_regressions(results, baseline, thresholds):
+    """Names of benchmarks slower than the baseline by more than their tolerance"""
+    regressions = []
+    default = thresholds.get("default_tolerance", 0.25)
+    for key, stats in results.items():
+        previous = baseline.get("results", {}).get(key)
+        if previous is None:
+            continue
+        name = key.split('@')[0]
+        tolerance = thresholds.get("benchmarks", {}).get(name, default)
+        # Very short timings are dominated by noise, so they get an absolute allowance too
+        allowed = previous["seconds"] * (1 + tolerance) + thresholds.get("min_seconds", 0.01)
+        if stats["seconds"] > allowed:
+            regressions.append(f"{key}: {stats['seconds']:.3f}s vs baseline {previous['seconds']:.3f}s (+{tolerance:.0%} allowed)")
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline performance benchmarks for the Fiji news agent")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[100, 10000, 100000])
+    parser.add_argument('--harvest-max', type=int, default=10000, help="largest size to harvest from the mock sites")
+    parser.add_argument('--latency', type=float, default=0.0, help="mock server latency per request in seconds")
+    parser.add_argument('--error-rate', type=float, default=0.0, help="fraction of mock requests that fail")
+    parser.add_argument('--only', nargs='+', choices=['harvest', 'components', 'endpoints'],
+                        default=['harvest', 'components', 'endpoints'])
+    parser.add_argument('--output', help="results file (default benchmarks/results/<timestamp>.json)")
+    parser.add_argument('--baseline', help="earlier results file to check for regressions against")
+    args = parser.parse_args()
+
+    timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
+    output = os.path.abspath(args.output or os.path.join(ROOT, 'benchmarks', 'results', f'{timestamp}.json'))
+    baseline_path = os.path.abspath(args.baseline) if args.baseline else None
+
+    with tempfile.TemporaryDirectory() as workdir:
+        os.chdir(workdir)
+        os.makedirs('data')
+        results = run(args.sizes, args.harvest_max, args.latency, args.error_rate, args.only)
+        os.chdir(ROOT)
+
+    report = {
+        "timestamp": timestamp,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "settings": {"latency": args.latency, "error_rate": args.error_rate},
+        "results": results
+    }
+
+    if not os.path.exists(os.path.dirname(output)):
+        os.makedirs(os.path.dirname(output))
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=4)
+    print(f"Results saved to {output}")
+
+    if baseline_path:
+        with open(baseline_path, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        with open(THRESHOLDS_PATH, 'r', encoding='utf-8') as f:
+            thresholds = json.load(f)
+
+        regressions = check_regressions(results, baseline, thresholds)
+        if regressions:
+            print("Performance regressions:")
+            for regression in regressions:
+                print(f"- {regression}")
+            sys.exit(1)
+        print("No regressions against the baseline")
+
+if __name__ == '__main__':
+    main()
\ No newline at end of file
@@ -0,0 +1,173 @@
+import os
+import math
+import sqlite3
+import threading
+from collections import Counter, defaultdict
+from document_model import document_cache
+
+class CorpusStats:
+    """Per-day, per-category term and bigram counts, updated as articles are ingested"""
+    def __init__(self, db_path='data/corpus_stats.db'):
+        # Create the data directory if it doesn't exist
+        directory = os.path.dirname(db_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS term_counts (
+                day TEXT, category TEXT, term TEXT, count INTEGER,
+                PRIMARY KEY (day, category, term)
+            );
+            CREATE TABLE IF NOT EXISTS bigram_counts (
+                day TEXT, category TEXT, first TEXT, second TEXT, count INTEGER,
+                PRIMARY KEY (day, category, first, second)
+            );
+            CREATE TABLE IF NOT EXISTS document_counts (
+                day TEXT, category TEXT, documents INTEGER, words INTEGER,
+                PRIMARY KEY (day, category)
+            );
+            CREATE TABLE IF NOT EXISTS source_counts (
+                day TEXT, source TEXT, documents INTEGER,
+                PRIMARY KEY (day, source)
+            );
+            -- Each article URL is counted once, however often it is harvested
+            CREATE TABLE IF NOT EXISTS ingested (url TEXT PRIMARY KEY);
+        """)
+        self.conn.commit()
+
+    def add(self, articles):
+        """Add the term and bigram counts of articles not seen before; returns how many were added"""
+        terms = defaultdict(Counter)
+        bigrams = defaultdict(Counter)
+        documents = Counter()
+        words = Counter()
+        sources = Counter()
+        added = []
+
+        with self.lock:
+            seen = set()
+            for article in articles:
+                if article["url"] in seen:
+                    continue
+                seen.add(article["url"])
+                if self.conn.execute("SELECT 1 FROM ingested WHERE url = ?", (article["url"],)).fetchone():
+                    continue
+
+                key = (article["published_date"], article.get("category") or "others")
+                tokens = document_cache.get(article["text"]).tokens
+                terms[key].update(tokens)
+                bigrams[key].update(zip(tokens, tokens[1:]))
+                documents[key] += 1
+                words[key] += len(tokens)
+                sources[(article["published_date"], article["source"])] += 1
+                added.append((article["url"],))
+
+            self.conn.executemany(
+                """INSERT INTO term_counts VALUES (?, ?, ?, ?)
+                   ON CONFLICT DO UPDATE SET count = count + excluded.count""",
+                [(day, category, term, count) for (day, category), counter in terms.items() for term, count in counter.items()]
+            )
+            self.conn.executemany(
+                """INSERT INTO bigram_counts VALUES (?, ?, ?, ?, ?)
+                   ON CONFLICT DO UPDATE SET count = count + excluded.count""",
+                [(day, category, first, second, count)
+                 for (day, category), counter in bigrams.items() for (first, second), count in counter.items()]
+            )
+            self.conn.executemany(
+                """INSERT INTO document_counts VALUES (?, ?, ?, ?)
+                   ON CONFLICT DO UPDATE SET documents = documents + excluded.documents, words = words + excluded.words""",
+                [(day, category, documents[(day, category)], words[(day, category)]) for day, category in documents]
+            )
+            self.conn.executemany(
+                """INSERT INTO source_counts VALUES (?, ?, ?)
+                   ON CONFLICT DO UPDATE SET documents = documents + excluded.documents""",
+                [(day, source, count) for (day, source), count in sources.items()]
+            )
+            self.conn.executemany("INSERT INTO ingested VALUES (?)", added)
+            self.conn.commit()
+
+        return len(added)
+
+    def ingested_count(self):
+        """Number of articles counted so far; changes whenever the statistics do"""
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM ingested").fetchone()[0]
+
+    def _range(self, since, until, category=None):
+        """WHERE clause and parameters for a date range and optional category"""
+        clause = "day >= ? AND day <= ?"
+        params = [since or "", until or "9999-99-99"]
+        if category:
+            clause += " AND category = ?"
+            params.append(category)
+        return clause, params
+
+    def document_counts(self, since=None, until=None):
+        """Number of articles per category in the date range"""
+        clause, params = self._range(since, until)
+        with self.lock:
+            rows = self.conn.execute(
+                f"SELECT category, SUM(documents) FROM document_counts WHERE {clause} GROUP BY category", params
+            ).fetchall()
+        return dict(rows)
+
+    def source_counts(self, since=None, until=None):
+        """Number of articles per source in the date range, most first"""
+        clause, params = self._range(since, until)
+        with self.lock:
+            rows = self.conn.execute(
+                f"""SELECT source, SUM(documents) AS total FROM source_counts WHERE {clause}
+                    GROUP BY source ORDER BY total DESC""", params
+            ).fetchall()
+        return dict(rows)
+
+    def top_terms(self, since=None, until=None, category=None, num_terms=10):
+        """Most frequent terms longer than three letters in the date range"""
+        clause, params = self._range(since, until, category)
+        with self.lock:
+            rows = self.conn.execute(
+                f"""SELECT term, SUM(count) AS total FROM term_counts
+                    WHERE {clause} AND length(term) > 3
+                    GROUP BY term ORDER BY total DESC, term LIMIT ?""",
+                params + [num_terms]
+            ).fetchall()
+        return [term for term, _ in rows]
+
+    def top_phrases(self, since=None, until=None, num_phrases=10, min_freq=3):
+        """Bigrams seen at least min_freq times, ranked by PMI like NLTK's collocation finder"""
+        clause, params = self._range(since, until)
+        with self.lock:
+            total_words = self.conn.execute(
+                f"SELECT SUM(words) FROM document_counts WHERE {clause}", params
+            ).fetchone()[0]
+            rows = self.conn.execute(
+                f"""WITH b AS (
+                        SELECT first, second, SUM(count) AS n FROM bigram_counts
+                        WHERE {clause} GROUP BY first, second HAVING n >= ?
+                    ), u AS (
+                        SELECT term, SUM(count) AS n FROM term_counts
+                        WHERE {clause} AND term IN (SELECT first FROM b UNION SELECT second FROM b)
+                        GROUP BY term
+                    )
+                    SELECT b.first, b.second, b.n, u1.n, u2.n
+                    FROM b JOIN u AS u1 ON u1.term = b.first JOIN u AS u2 ON u2.term = b.second""",
+                params + [min_freq] + params
+            ).fetchall()
+
+        if not rows:
+            return []
+
+        # PMI = log2(n(w1,w2) * N) - log2(n(w1) * n(w2))
+        scored = [
+            ((first, second), math.log2(n * total_words) - math.log2(n_first * n_second))
+            for first, second, n, n_first, n_second in rows
+        ]
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return [" ".join(bigram) for bigram, _ in scored[:num_phrases]]
+
+    def close(self):
+        """Close the database connection"""
+        with self.lock:
+            self.conn.close()
\ No newline at end of file
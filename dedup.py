@@ -0,0 +1,210 @@
+import os
+import json
+import sqlite3
+import hashlib
+import threading
+import numpy as np
+from document_model import document_cache
+
+class StoryIndex:
+    """Groups syndicated copies of a story using MinHash signatures and a persistent LSH index
+
+    Each signature is split into bands; articles that agree on every value of any
+    band land in the same bucket. Only bucket collisions are compared, so a lookup
+    costs the same however large the archive grows.
+    """
+    PRIME = 4294967311  # Smallest prime above 2**32
+
+    def __init__(self, db_path='data/stories.db', num_perm=128, bands=32, shingle_size=5, threshold=0.5, seed=1):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+
+        # Create the data directory if it doesn't exist
+        directory = os.path.dirname(db_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        self.num_perm = num_perm
+        self.bands = bands
+        self.shingle_size = shingle_size
+        self.threshold = threshold
+
+        # Random hash functions (a * x + b) mod PRIME, fixed by the seed so stored signatures stay comparable
+        rng = np.random.RandomState(seed)
+        self.a = rng.randint(1, 2 ** 32, size=num_perm, dtype=np.uint64)
+        self.b = rng.randint(0, 2 ** 32, size=num_perm, dtype=np.uint64)
+
+        self.lock = threading.Lock()
+        # Held for a whole classify_once, so concurrent calls can't both take a new story as theirs to classify
+        self.classify_lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS stories (
+                id INTEGER PRIMARY KEY,
+                url TEXT NOT NULL,  -- The first copy seen, which is the one classified
+                category TEXT,
+                summary TEXT,
+                keywords TEXT,
+                size INTEGER DEFAULT 0
+            );
+            CREATE TABLE IF NOT EXISTS members (
+                url TEXT PRIMARY KEY,
+                story_id INTEGER NOT NULL,
+                signature BLOB NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS buckets (band INTEGER, bucket BLOB, url TEXT);
+            CREATE INDEX IF NOT EXISTS idx_buckets ON buckets (band, bucket);
+        """)
+        self.conn.commit()
+
+    def signature(self, text):
+        """MinHash signature of a text's word shingles, or None if it has no words"""
+        tokens = document_cache.get(text).tokens
+        if not tokens:
+            return None
+
+        size = min(self.shingle_size, len(tokens))
+        shingles = {" ".join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)}
+        hashes = np.fromiter(
+            (int.from_bytes(hashlib.blake2b(shingle.encode('utf-8'), digest_size=4).digest(), 'little') for shingle in shingles),
+            dtype=np.uint64, count=len(shingles)
+        )
+
+        # a and the hashes are below 2**32, so a * x + b cannot overflow 64 bits
+        return ((self.a[:, None] * hashes[None, :] + self.b[:, None]) % np.uint64(self.PRIME)).min(axis=1)
+
+    def _buckets(self, signature):
+        """Bucket key of every band of a signature"""
+        return [
+            (band, hashlib.blake2b(rows.tobytes(), digest_size=8).digest())
+            for band, rows in enumerate(signature.reshape(self.bands, -1))
+        ]
+
+    def _find_story(self, signature):
+        """ID of the most similar stored story above the threshold, or None"""
+        candidates = set()
+        for band, bucket in self._buckets(signature):
+            candidates.update(row[0] for row in self.conn.execute(
+                "SELECT url FROM buckets WHERE band = ? AND bucket = ?", (band, bucket)
+            ))
+
+        best_story, best_similarity = None, self.threshold
+        for url in candidates:
+            story_id, stored = self.conn.execute(
+                "SELECT story_id, signature FROM members WHERE url = ?", (url,)
+            ).fetchone()
+            # The fraction of equal MinHash values estimates the Jaccard similarity
+            similarity = float(np.mean(np.frombuffer(stored, dtype=np.uint64) == signature))
+            if similarity >= best_similarity:
+                best_story, best_similarity = story_id, similarity
+        return best_story
+
+    def assign(self, article):
+        """Attach the article to a matching story, or start a new one; returns the story ID"""
+        row = self.conn.execute("SELECT story_id FROM members WHERE url = ?", (article["url"],)).fetchone()
+        if row:
+            return row[0]
+
+        signature = self.signature(article["title"] + "\n" + article["text"])
+        story_id = self._find_story(signature) if signature is not None else None
+        if story_id is None:
+            story_id = self.conn.execute("INSERT INTO stories (url) VALUES (?)", (article["url"],)).lastrowid
+
+        self.conn.execute("UPDATE stories SET size = size + 1 WHERE id = ?", (story_id,))
+        if signature is None:
+            # Articles without words are their own story and never match anything
+            signature = np.zeros(self.num_perm, dtype=np.uint64)
+        else:
+            self.conn.executemany(
+                "INSERT INTO buckets VALUES (?, ?, ?)",
+                [(band, bucket, article["url"]) for band, bucket in self._buckets(signature)]
+            )
+        self.conn.execute(
+            "INSERT INTO members VALUES (?, ?, ?)", (article["url"], story_id, signature.tobytes())
+        )
+        return story_id
+
+    def classify_once(self, articles, categorize, summarize=None):
+        """Classify one copy of each story with categorize(articles) and give the other copies its category
+
+        Every article gets a story_id; copies of a story first seen elsewhere also get duplicate_of.
+        When given, summarize(articles) runs before classification on the same first copies,
+        and the other copies take their summary and keywords instead of being summarized.
+        """
+        with self.classify_lock:
+            leaders = {}
+            copies = []
+            unsummarized = []  # Copies of stories stored without a summary
+            with self.lock:
+                for article in articles:
+                    story_id = self.assign(article)
+                    article["story_id"] = story_id
+                    url, category, summary, keywords = self.conn.execute(
+                        "SELECT url, category, summary, keywords FROM stories WHERE id = ?", (story_id,)
+                    ).fetchone()
+
+                    # The first copy is (re)classified; later copies reuse its category
+                    if story_id not in leaders and (url == article["url"] or category is None):
+                        leaders[story_id] = article
+                        continue
+
+                    article["duplicate_of"] = leaders[story_id]["url"] if story_id in leaders else url
+                    copies.append(article)
+                    if story_id not in leaders and not article.get("summary"):
+                        if summary:
+                            article["summary"] = summary
+                            article["keywords"] = json.loads(keywords)
+                        else:
+                            unsummarized.append(article)
+                self.conn.commit()
+
+            if summarize:
+                summarize(list(leaders.values()) + unsummarized)
+            categorize(list(leaders.values()))
+
+            with self.lock:
+                self.conn.executemany(
+                    "UPDATE stories SET category = ?, summary = ?, keywords = ? WHERE id = ?",
+                    [
+                        (article["category"], article.get("summary") or None, json.dumps(article.get("keywords") or []), story_id)
+                        for story_id, article in leaders.items()
+                    ]
+                )
+                self.conn.commit()
+                for article in copies:
+                    leader = leaders.get(article["story_id"])
+                    if leader is None:
+                        article["category"] = self.conn.execute(
+                            "SELECT category FROM stories WHERE id = ?", (article["story_id"],)
+                        ).fetchone()[0]
+                        continue
+
+                    article["category"] = leader["category"]
+                    if not article.get("summary"):
+                        article["summary"] = leader.get("summary", "")
+                        article["keywords"] = leader.get("keywords", [])
+
+        return articles
+
+    def story_count(self):
+        """Number of distinct stories seen so far"""
+        with self.lock:
+            return self.conn.execute("SELECT COUNT(*) FROM stories").fetchone()[0]
+
+    def close(self):
+        """Close the database connection"""
+        with self.lock:
+            self.conn.close()
+
+def unique_stories(articles):
+    """One article per story, keeping the first copy; articles without a story_id are all kept"""
+    seen = set()
+    unique = []
+    for article in articles:
+        story_id = article.get("story_id")
+        if story_id is not None:
+            if story_id in seen:
+                continue
+            seen.add(story_id)
+        unique.append(article)
+    return unique
\ No newline at end of file
@@ -0,0 +1,116 @@
+import hashlib
+import threading
+from collections import Counter, OrderedDict
+import resources
+
+class ProcessedDocument:
+    """Tokens of a single text, computed once and shared by the classifier and analyzer"""
+    __slots__ = ('content_hash', 'tokens', 'lemmas', 'term_counts')
+
+    def __init__(self, content_hash, tokens, lemmas):
+        self.content_hash = content_hash
+        self.tokens = tokens  # Lowercase alphabetic tokens without stop words, in text order
+        self.lemmas = lemmas  # Lemma of each token
+        self.term_counts = Counter(tokens)
+
+class DocumentCache:
+    """LRU cache of processed documents keyed by the hash of their text"""
+    def __init__(self, max_size=10000):
+        self.max_size = max_size
+        self.documents = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+        # NLTK resources are loaded on first use and then reused for every document
+        self._stop_words = None
+        self._lemmatizer = None
+        self._lemmas = None
+
+    def get(self, text):
+        """Return the processed document for a text, tokenizing it only on a cache miss"""
+        content_hash = hashlib.sha1(text.encode('utf-8')).hexdigest()
+
+        with self.lock:
+            document = self.documents.get(content_hash)
+            if document is not None:
+                self.documents.move_to_end(content_hash)
+                self.hits += 1
+                return document
+            self.misses += 1
+
+        document = self._process(content_hash, text)
+        self._store(document)
+        return document
+
+    def get_many(self, texts, pool=None, batch_size=50):
+        """Processed documents for a list of texts, tokenizing enough uncached ones on the process pool"""
+        hashes = [hashlib.sha1(text.encode('utf-8')).hexdigest() for text in texts]
+        with self.lock:
+            missing = {h: text for h, text in zip(hashes, texts) if h not in self.documents}
+
+        # Shipping texts to other processes only pays off for batches, not a handful of articles
+        if pool is not None and pool.enabled and len(missing) >= batch_size:
+            from extraction import process_documents
+
+            pending = list(missing.items())
+            batches = [[text for _, text in pending[i:i + batch_size]] for i in range(0, len(pending), batch_size)]
+            results = [result for batch in pool.map(process_documents, batches) for result in batch]
+            for (content_hash, _), (tokens, lemmas) in zip(pending, results):
+                self._store(ProcessedDocument(content_hash, tokens, lemmas))
+
+        # Anything not processed above (or evicted since) is tokenized here
+        return [self.get(text) for text in texts]
+
+    def _store(self, document):
+        with self.lock:
+            self.documents[document.content_hash] = document
+            if len(self.documents) > self.max_size:
+                self.documents.popitem(last=False)
+
+    def _process(self, content_hash, text):
+        """Tokenize, filter and lemmatize a text"""
+        if self._stop_words is None:
+            # With the prepared artifact nothing needs checking or downloading here;
+            # stop_words() falls back to NLTK itself when the artifact lacks them
+            resources.use_local_nltk_data()
+            self._stop_words = resources.stop_words()
+            # Lemmas from the prepared artifact mean WordNet is only loaded for unseen words
+            self._lemmas = dict(resources.lemmas())
+
+        from nltk.tokenize import word_tokenize
+
+        try:
+            words = word_tokenize(text.lower())
+        except LookupError:
+            # The tokenizer models have not been downloaded yet
+            resources.ensure_nltk_data()
+            words = word_tokenize(text.lower())
+
+        tokens = tuple(word for word in words if word.isalpha() and word not in self._stop_words)
+
+        # The vocabulary is far smaller than the corpus, so lemmas are memoized per word
+        lemmas = []
+        for word in tokens:
+            lemma = self._lemmas.get(word)
+            if lemma is None:
+                lemma = self._lemmatize(word)
+                self._lemmas[word] = lemma
+            lemmas.append(lemma)
+
+        return ProcessedDocument(content_hash, tokens, tuple(lemmas))
+
+    def _lemmatize(self, word):
+        """Lemmatize a single word, loading WordNet the first time it is needed"""
+        if self._lemmatizer is None:
+            resources.ensure_nltk_data()
+            from nltk.stem import WordNetLemmatizer
+            self._lemmatizer = WordNetLemmatizer()
+        return self._lemmatizer.lemmatize(word)
+
+    def lemma_table(self):
+        """Copy of every word -> lemma mapping computed so far"""
+        return dict(self._lemmas or {})
+
+# Shared by every component so an article is tokenized once per process
+document_cache = DocumentCache()
\ No newline at end of file
@@ -0,0 +1,109 @@
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+# Worker functions run in the pool's processes. They are top-level so they can be
+# pickled, take plain strings and return small dicts and tuples instead of Article objects.
+
+def parse_html(url, html):
+    """Parse downloaded article HTML into its title, text and publication date"""
+    from newspaper import Article
+
+    article = Article(url)
+    article.download(input_html=html)
+    article.parse()
+    return {
+        "title": article.title,
+        "text": article.text,
+        "published_date": article.publish_date.strftime("%Y-%m-%d") if article.publish_date else None
+    }
+
+def summarize(title, text):
+    """Keywords and summary of an article, computed the way newspaper's Article.nlp() does"""
+    from newspaper import nlp, Config
+
+    config = Config()
+    nlp.load_stopwords(config.get_language())
+    keywords = list(set(list(nlp.keywords(title).keys()) + list(nlp.keywords(text).keys())))
+    summary = '\n'.join(nlp.summarize(title=title, text=text, max_sents=config.MAX_SUMMARY_SENT))
+    return {"summary": summary, "keywords": keywords}
+
+def process_documents(texts):
+    """(tokens, lemmas) of each text, for the parent process to add to its document cache"""
+    from document_model import document_cache
+
+    documents = [document_cache.get(text) for text in texts]
+    return [(document.tokens, document.lemmas) for document in documents]
+
+class ExtractionPool:
+    """Runs CPU-bound parsing, NLP and tokenization on a pool of worker processes
+
+    Downloads stay on the harvester's threads, which hand HTML and text to the
+    workers and wait for the compact results, so extraction uses every core while
+    I/O keeps its own concurrency. With max_workers=0 the work runs in the
+    calling thread instead.
+    """
+    def __init__(self, max_workers=None):
+        self.max_workers = (os.cpu_count() or 1) if max_workers is None else max_workers
+        self.executor = None
+        self.lock = threading.Lock()
+
+    @property
+    def enabled(self):
+        return self.max_workers > 0
+
+    def _executor(self):
+        """The process pool, started on first use"""
+        with self.lock:
+            if self.executor is None:
+                # Forking a process that is running threads can copy held locks, so workers are spawned
+                self.executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers, mp_context=multiprocessing.get_context('spawn')
+                )
+            return self.executor
+
+    def run(self, func, *args):
+        """Call func(*args) on a worker process and wait for its result"""
+        if not self.enabled:
+            return func(*args)
+
+        executor = self._executor()
+        try:
+            return executor.submit(func, *args).result()
+        except BrokenProcessPool:
+            # A crashed worker breaks the whole pool; the next call starts a fresh one
+            self._discard(executor)
+            raise
+
+    def map(self, func, batches):
+        """func(batch) for every batch, spread over the workers, in order"""
+        if not self.enabled:
+            return [func(batch) for batch in batches]
+
+        executor = self._executor()
+        try:
+            return list(executor.map(func, batches))
+        except BrokenProcessPool:
+            self._discard(executor)
+            raise
+
+    def _discard(self, executor):
+        with self.lock:
+            if self.executor is executor:
+                self.executor = None
+        executor.shutdown(wait=False)
+
+    def shutdown(self):
+        """Stop the worker processes"""
+        with self.lock:
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown()
+
+# Shared by the harvester and the classifier. FIJI_NEWS_PROCESSES sets the number of
+# worker processes (default: one per core); 0 keeps extraction in-process.
+extraction_pool = ExtractionPool(
+    int(os.environ['FIJI_NEWS_PROCESSES']) if os.environ.get('FIJI_NEWS_PROCESSES') else None
+)
\ No newline at end of file
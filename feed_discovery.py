@@ -0,0 +1,264 @@
+import os
+import re
+import json
+import time
+import sqlite3
+import datetime
+import threading
+import email.utils
+import xml.etree.ElementTree as ET
+from urllib.parse import urljoin
+from bs4 import BeautifulSoup
+
+ATOM = '{http://www.w3.org/2005/Atom}'
+SITEMAP = '{http://www.sitemaps.org/schemas/sitemap/0.9}'
+NEWS = '{http://www.google.com/schemas/sitemap-news/0.9}'
+
+FEED_TYPES = ('application/rss+xml', 'application/atom+xml')
+
+def _parse_date(value):
+    """RFC 822 (RSS) or W3C/ISO 8601 (Atom, sitemaps) date as a naive UTC datetime, or None"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        parsed = email.utils.parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        try:
+            parsed = datetime.datetime.fromisoformat(value.replace('Z', '+00:00'))
+        except ValueError:
+            return None
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return parsed
+
+def _local(tag):
+    """Tag name without its namespace"""
+    return tag.rsplit('}', 1)[-1]
+
+class FeedDiscovery:
+    """Lists new article URLs from a source's RSS/Atom feed or XML sitemap
+
+    The feed of each source is located once (homepage <link rel="alternate">,
+    then robots.txt sitemaps) and remembered, so a normal cycle costs a single
+    conditional request. Sitemap indexes are followed only into child sitemaps
+    modified since the last poll. Sources without a feed are re-probed daily
+    and discover() returns None so the caller can fall back to crawling. A
+    remembered feed that fails max_failures polls in a row is forgotten, so the
+    next poll locates the source's feed again.
+    """
+    def __init__(self, get, db_path='data/feeds.db', reprobe_after=24 * 3600, max_child_sitemaps=2, max_failures=3):
+        # get(url, **kwargs) sends a GET request and returns a requests Response
+        self.get = get
+        self.reprobe_after = reprobe_after
+        self.max_child_sitemaps = max_child_sitemaps
+        self.max_failures = max_failures
+
+        # Create the data directory if it doesn't exist
+        directory = os.path.dirname(db_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        # Validators of feeds read but not yet committed, by source name
+        self.pending = {}
+
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS feeds (
+                source TEXT PRIMARY KEY,
+                feed_url TEXT,  -- NULL when the source has no feed or sitemap
+                etag TEXT,
+                last_modified TEXT,
+                since TEXT,  -- Entries up to this date have all been harvested
+                settled TEXT,  -- JSON url -> date of entries after since already harvested
+                failures INTEGER DEFAULT 0,  -- Failed reads of the feed in a row
+                probed_at REAL
+            )
+        """)
+        self.conn.commit()
+
+    def _state(self, source):
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT feed_url, etag, last_modified, since, settled, failures, probed_at FROM feeds WHERE source = ?",
+                (source['name'],)
+            ).fetchone()
+        if row is None:
+            return None
+        settled = {
+            url: datetime.datetime.fromisoformat(date) if date else None
+            for url, date in json.loads(row[4] or '{}').items()
+        }
+        return {
+            "feed_url": row[0], "etag": row[1], "last_modified": row[2],
+            "since": datetime.datetime.fromisoformat(row[3]) if row[3] else None,
+            "settled": settled, "failures": row[5] or 0, "probed_at": row[6]
+        }
+
+    def _save(self, source, **values):
+        with self.lock:
+            self.conn.execute("INSERT OR IGNORE INTO feeds (source) VALUES (?)", (source['name'],))
+            for column, value in values.items():
+                self.conn.execute(f"UPDATE feeds SET {column} = ? WHERE source = ?", (value, source['name']))
+            self.conn.commit()
+
+    def discover(self, source):
+        """Candidate (url, date) pairs not harvested by earlier polls, newest first; None if there is no feed"""
+        state = self._state(source)
+        if state is None or (state["feed_url"] is None and time.time() - state["probed_at"] > self.reprobe_after):
+            feed_url = self._locate(source)
+            self._save(source, feed_url=feed_url, probed_at=time.time(), etag=None, last_modified=None)
+            state = self._state(source)
+
+        if state["feed_url"] is None:
+            return None
+
+        since = state["since"]
+        try:
+            entries = self._read(source, state["feed_url"], since, state)
+        except Exception:
+            # A feed that keeps failing has probably moved; forget it so it is located again
+            if state["failures"] + 1 >= self.max_failures:
+                print(f"Feed of {source['name']} failed {self.max_failures} times; locating it again")
+                self._save(source, feed_url=None, probed_at=0, failures=0, etag=None, last_modified=None)
+            else:
+                self._save(source, failures=state["failures"] + 1)
+            raise
+        if state["failures"]:
+            self._save(source, failures=0)
+        entries = [
+            (url, date) for url, date in entries
+            if (since is None or date is None or date > since) and url not in state["settled"]
+        ]
+        entries.sort(key=lambda entry: entry[1] or datetime.datetime.max, reverse=True)
+        return entries
+
+    def commit(self, source, entries, settled):
+        """Record a poll so the next one lists only the entries whose URLs are not yet settled
+
+        When every entry was settled the feed's validators are stored and since
+        moves to the newest entry. Otherwise the validators are dropped, so the
+        unchanged feed is read again in full, since moves to just before the
+        oldest entry still pending, and the settled entries after it are
+        remembered so they are not listed (and counted against the limit) again.
+        """
+        state = self._state(source)
+        validators = self.pending.pop(source['name'], None)
+        known = dict(state["settled"])
+        known.update((url, date) for url, date in entries if url in settled)
+
+        since = state["since"]
+        values = {}
+        pending = [date for url, date in entries if url not in known]
+        if not pending:
+            if validators:
+                values["etag"], values["last_modified"] = validators
+            dates = [date for date in list(known.values()) + [date for _, date in entries] + [since] if date is not None]
+            if dates:
+                since = max(dates)
+        elif None not in pending:
+            # Undated entries give no bound, so since stays where it was for them
+            since = min(pending) - datetime.timedelta(microseconds=1)
+
+        # Undated entries are listed on every read, so they are remembered while the feed still has them
+        listed = {url for url, _ in entries}
+        values["since"] = since.isoformat() if since else None
+        values["settled"] = json.dumps({
+            url: date.isoformat() if date else None for url, date in known.items()
+            if (date is None and url in listed) or (date is not None and (since is None or date > since))
+        })
+        self._save(source, **values)
+
+    def _locate(self, source):
+        """Find the feed or sitemap of a source, or None"""
+        # Feeds advertised on the homepage are the most current listing
+        try:
+            response = self.get(source['url'])
+            response.raise_for_status()
+            soup = BeautifulSoup(response.text, 'html.parser')
+            for link in soup.find_all('link', href=True):
+                rel = link.get('rel') or []
+                if 'alternate' in rel and link.get('type') in FEED_TYPES:
+                    return urljoin(response.url, link['href'])
+        except Exception as e:
+            print(f"Could not read the homepage of {source['name']}: {str(e)}")
+
+        # Otherwise the sitemap declared in robots.txt
+        try:
+            response = self.get(urljoin(source['url'], '/robots.txt'))
+            if response.status_code == 200:
+                match = re.search(r'^\s*sitemap:\s*(\S+)', response.text, re.IGNORECASE | re.MULTILINE)
+                if match:
+                    return match.group(1)
+        except Exception as e:
+            print(f"Could not read robots.txt of {source['name']}: {str(e)}")
+
+        print(f"No feed or sitemap found for {source['name']}; falling back to crawling")
+        return None
+
+    def _read(self, source, feed_url, since, state):
+        """Fetch the remembered feed with a conditional request and parse its entries"""
+        headers = {}
+        if state["etag"]:
+            headers['If-None-Match'] = state["etag"]
+        if state["last_modified"]:
+            headers['If-Modified-Since'] = state["last_modified"]
+
+        response = self.get(feed_url, headers=headers, stream=True)
+        if response.status_code == 304:
+            return []
+        response.raise_for_status()
+
+        entries, children = self._parse(response)
+        # Validators are only stored by commit(), so a poll that fails is retried in full
+        self.pending[source['name']] = (response.headers.get('ETag'), response.headers.get('Last-Modified'))
+
+        # A sitemap index lists child sitemaps; only the newest changed ones are read
+        children = [(url, date) for url, date in children if since is None or date is None or date > since]
+        children.sort(key=lambda child: child[1] or datetime.datetime.max, reverse=True)
+        for child_url, _ in children[:self.max_child_sitemaps]:
+            child = self.get(child_url, stream=True)
+            child.raise_for_status()
+            entries.extend(self._parse(child)[0])
+        return entries
+
+    def _parse(self, response):
+        """Stream-parse an RSS, Atom or sitemap document into (entries, child sitemaps)"""
+        response.raw.decode_content = True
+        entries = []
+        children = []
+
+        # Elements are handled and cleared as soon as they close, so large sitemaps use little memory
+        for _, element in ET.iterparse(response.raw, events=('end',)):
+            tag = element.tag
+            if tag == 'item':
+                # RSS 2.0
+                link = element.findtext('link') or element.findtext('guid')
+                if link:
+                    entries.append((link.strip(), _parse_date(element.findtext('pubDate'))))
+            elif tag == f'{ATOM}entry':
+                link = None
+                for candidate in element.findall(f'{ATOM}link'):
+                    if candidate.get('rel', 'alternate') == 'alternate':
+                        link = candidate.get('href')
+                        break
+                date = element.findtext(f'{ATOM}published') or element.findtext(f'{ATOM}updated')
+                if link:
+                    entries.append((link.strip(), _parse_date(date)))
+            elif tag in (f'{SITEMAP}url', f'{SITEMAP}sitemap'):
+                loc = element.findtext(f'{SITEMAP}loc')
+                date = element.findtext(f'{SITEMAP}lastmod') or element.findtext(f'{NEWS}news/{NEWS}publication_date')
+                if loc:
+                    target = entries if _local(tag) == 'url' else children
+                    target.append((loc.strip(), _parse_date(date)))
+            else:
+                continue
+            element.clear()
+
+        return entries, children
+
+    def close(self):
+        """Close the database connection"""
+        with self.lock:
+            self.conn.close()
\ No newline at end of file
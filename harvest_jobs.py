@@ -0,0 +1,147 @@
+import uuid
+import json
+import threading
+import datetime
+from collections import OrderedDict
+
+class HarvestJob:
+    """A single background harvest and the ordered list of events it has produced"""
+    def __init__(self):
+        self.id = uuid.uuid4().hex
+        self.status = "running"
+        self.started_at = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        self.finished_at = None
+        self.sources = {}  # Source name -> progress
+        self.article_count = 0
+        self.result = None
+        self.events = []
+        self.articles = []  # Full articles; events only carry their list fields
+        self.condition = threading.Condition()
+
+    def emit(self, event, data):
+        """Record an event and wake up every listener"""
+        with self.condition:
+            if event == "source_started":
+                self.sources[data["source"]] = {"status": "running", "articles": 0}
+            elif event == "source_finished":
+                self.sources[data["source"]] = {"status": "finished", "articles": data["count"]}
+            elif event == "article":
+                self.article_count += 1
+            elif event in ("complete", "failed"):
+                self.status = "completed" if event == "complete" else "failed"
+                self.finished_at = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+                self.result = data
+
+            self.events.append((event, data))
+            self.condition.notify_all()
+
+    def add_article(self, article, fields):
+        """Keep an article and emit an "article" event with only the given fields and its position"""
+        with self.condition:
+            position = len(self.articles)
+            self.articles.append(article)
+        self.emit("article", dict({f: article[f] for f in fields if f in article}, job_position=position))
+
+    def article(self, position):
+        """A full article of the job by its position; IndexError if there is none"""
+        with self.condition:
+            if not 0 <= position < len(self.articles):
+                raise IndexError(f"No article {position} in harvest {self.id}")
+            return self.articles[position]
+
+    def news_data(self, categories):
+        """The job's articles so far, grouped by category"""
+        with self.condition:
+            articles = list(self.articles)
+        news_data = {category: [] for category in categories}
+        for article in articles:
+            news_data.setdefault(article["category"], []).append(article)
+        return news_data
+
+    @property
+    def finished(self):
+        return self.status != "running"
+
+    def wait_for_events(self, start, timeout=15):
+        """Return (events after index start, finished), waiting up to timeout seconds for new events
+
+        Both are read under the same lock, so when finished is True the events
+        include the last one the job will ever emit.
+        """
+        with self.condition:
+            if len(self.events) <= start and not self.finished:
+                self.condition.wait(timeout)
+            return self.events[start:], self.finished
+
+    def stream(self, start=0):
+        """Yield Server-Sent Events from index start until the job has finished"""
+        index = start
+        while True:
+            events, finished = self.wait_for_events(index)
+            if not events:
+                if finished:
+                    return
+                # Comment line to keep idle connections open
+                yield ": keep-alive\n\n"
+                continue
+
+            for event, data in events:
+                yield f"id: {index}\nevent: {event}\ndata: {json.dumps(data)}\n\n"
+                index += 1
+
+    def to_dict(self):
+        """Summary of the job for the status endpoint"""
+        with self.condition:
+            return {
+                "job_id": self.id,
+                "status": self.status,
+                "started_at": self.started_at,
+                "finished_at": self.finished_at,
+                "sources": dict(self.sources),
+                "articles": self.article_count,
+                "result": self.result
+            }
+
+class HarvestJobRunner:
+    """Runs harvests on a background thread, one at a time"""
+    def __init__(self, work, max_jobs=20):
+        # work(job) performs the harvest and reports progress through job.emit
+        self.work = work
+        self.max_jobs = max_jobs
+        self.jobs = OrderedDict()
+        self.current = None
+        self.lock = threading.Lock()
+
+    def start(self):
+        """Start a harvest, or join the one already running. Returns (job, created)"""
+        with self.lock:
+            if self.current is not None and not self.current.finished:
+                return self.current, False
+
+            job = HarvestJob()
+            self.jobs[job.id] = job
+            self.current = job
+
+            # Forget the oldest finished jobs
+            while len(self.jobs) > self.max_jobs:
+                self.jobs.popitem(last=False)
+
+        thread = threading.Thread(target=self._run, args=(job,))
+        thread.daemon = True
+        thread.start()
+        return job, True
+
+    def _run(self, job):
+        """Run the work function, turning an exception into a failed event"""
+        try:
+            self.work(job)
+            if not job.finished:
+                job.emit("complete", {"message": f"Harvested {job.article_count} articles"})
+        except Exception as e:
+            print(f"Harvest job {job.id} failed: {str(e)}")
+            job.emit("failed", {"message": str(e)})
+
+    def get(self, job_id):
+        """Look up a job by ID"""
+        with self.lock:
+            return self.jobs.get(job_id)
\ No newline at end of file
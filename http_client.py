@@ -0,0 +1,80 @@
+import threading
+import time
+from urllib.parse import urlparse
+import requests
+from requests.adapters import HTTPAdapter
+
+class TokenBucket:
+    """Token bucket rate limiter for a single host"""
+    def __init__(self, rate, capacity):
+        self.rate = rate  # Tokens added per second
+        self.capacity = capacity  # Maximum burst size
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        """Block until a token is available, then consume it"""
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+
+                wait = (1 - self.tokens) / self.rate
+
+            time.sleep(wait)
+
+class PoliteSession:
+    """Pooled keep-alive HTTP session with per-host concurrency and rate limits"""
+    def __init__(self, headers=None, rate=1.0, burst=2, max_per_host=2, pool_size=10, timeout=15):
+        self.rate = rate
+        self.burst = burst
+        self.max_per_host = max_per_host
+        self.timeout = timeout
+
+        # A single session shares keep-alive connections between all worker threads
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        if headers:
+            self.session.headers.update(headers)
+
+        # Per-host limits, created on first use
+        self._hosts = {}
+        self._hosts_lock = threading.Lock()
+
+    def _host_limits(self, url):
+        """Get the (semaphore, token bucket) pair for the host of a URL"""
+        host = urlparse(url).netloc.lower()
+        with self._hosts_lock:
+            if host not in self._hosts:
+                self._hosts[host] = (
+                    threading.BoundedSemaphore(self.max_per_host),
+                    TokenBucket(self.rate, self.burst)
+                )
+            return self._hosts[host]
+
+    def get(self, url, **kwargs):
+        """Send a GET request, waiting for the host's concurrency slot and rate limit"""
+        semaphore, bucket = self._host_limits(url)
+        kwargs.setdefault('timeout', self.timeout)
+
+        with semaphore:
+            bucket.acquire()
+            return self.session.get(url, **kwargs)
+
+    def get_text(self, url, **kwargs):
+        """Fetch a URL and return the response body as text"""
+        response = self.get(url, **kwargs)
+        response.raise_for_status()
+        return response.text
+
+    def close(self):
+        """Close all pooled connections"""
+        self.session.close()
\ No newline at end of file
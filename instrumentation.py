@@ -0,0 +1,221 @@
+import os
+import sys
+import time
+import threading
+import functools
+from collections import Counter as _Counter
+from contextlib import contextmanager
+
+# Histogram bucket upper bounds in seconds, from fast parses to slow crawls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+def _escape(value):
+    """Escape a label value for the Prometheus text format"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+class Metric:
+    """Base class for a named metric with a fixed set of label names"""
+    type = None
+
+    def __init__(self, name, help, labelnames=()):
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self.lock = threading.Lock()
+        self.values = {}
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} needs labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(labels[name] for name in self.labelnames)
+
+    def render(self):
+        """Lines of Prometheus text exposition for this metric"""
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        with self.lock:
+            for key, value in sorted(self.values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, key)} {value}")
+        return lines
+
+class Counter(Metric):
+    """A value that only goes up, such as articles fetched or bytes downloaded"""
+    type = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+class Gauge(Metric):
+    """A value that goes up and down, such as the number of requests in flight"""
+    type = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = value
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+    def dec(self, amount=1, **labels):
+        self.inc(-amount, **labels)
+
+    @contextmanager
+    def track_in_flight(self, **labels):
+        """Count the enclosed block as in flight while it runs"""
+        self.inc(**labels)
+        try:
+            yield
+        finally:
+            self.dec(**labels)
+
+class Histogram(Metric):
+    """Distribution of observed values, such as the latency of each pipeline stage"""
+    type = "histogram"
+
+    def __init__(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        with self.lock:
+            series = self.values.get(key)
+            if series is None:
+                series = self.values[key] = {"buckets": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series["buckets"][i] += 1
+            series["sum"] += value
+            series["count"] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe how long the enclosed block takes, whether or not it raises"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.type}"]
+        with self.lock:
+            for key, series in sorted(self.values.items()):
+                for bound, count in zip(self.buckets, series["buckets"]):
+                    labels = _format_labels(self.labelnames, key, f'le="{bound}"')
+                    lines.append(f"{self.name}_bucket{labels} {count}")
+                labels = _format_labels(self.labelnames, key, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{labels} {series['count']}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {series['sum']}")
+                lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {series['count']}")
+        return lines
+
+class MetricsRegistry:
+    """All metrics of the process, rendered together for the /metrics endpoint"""
+    def __init__(self):
+        self.metrics = {}
+        self.lock = threading.Lock()
+
+    def _register(self, cls, name, *args, **kwargs):
+        # Asking twice for the same name returns the existing metric
+        with self.lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                metric = self.metrics[name] = cls(name, *args, **kwargs)
+            return metric
+
+    def counter(self, name, help, labelnames=()):
+        return self._register(Counter, name, help, labelnames)
+
+    def gauge(self, name, help, labelnames=()):
+        return self._register(Gauge, name, help, labelnames)
+
+    def histogram(self, name, help, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._register(Histogram, name, help, labelnames, buckets)
+
+    def render(self):
+        """Every metric in the Prometheus text exposition format"""
+        with self.lock:
+            metrics = list(self.metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+class SamplingProfiler:
+    """Samples the stack of one thread at a fixed interval while running
+
+    The result is in the folded-stack format read by flame graph tools:
+    one line per distinct stack, frames separated by ";", then the sample count.
+    """
+    def __init__(self, thread_id=None, interval=0.005):
+        self.thread_id = thread_id or threading.get_ident()
+        self.interval = interval
+        self.samples = _Counter()
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def start(self):
+        self.thread = threading.Thread(target=self._sample)
+        self.thread.daemon = True
+        self.thread.start()
+        return self
+
+    def _sample(self):
+        while not self.stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                return
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                # Functions are named by where they start so samples from different lines aggregate
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            self.samples[";".join(reversed(stack))] += 1
+
+    def stop(self):
+        """Stop sampling and return the folded stacks, most frequent first"""
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+        return "\n".join(f"{stack} {count}" for stack, count in self.samples.most_common()) + "\n"
+
+# Shared by every component so /metrics sees the whole process
+registry = MetricsRegistry()
+
+STAGE_SECONDS = registry.histogram(
+    'fiji_stage_seconds', 'Time spent in each processing stage', ['stage']
+)
+ARTICLES = registry.counter(
+    'fiji_articles_total', 'Articles seen by the harvester, by source and outcome', ['source', 'outcome']
+)
+DOWNLOADED_BYTES = registry.counter(
+    'fiji_downloaded_bytes_total', 'Bytes of article and page HTML downloaded', ['source']
+)
+IN_FLIGHT = registry.gauge(
+    'fiji_in_flight', 'Operations currently in progress', ['operation']
+)
+REQUEST_SECONDS = registry.histogram(
+    'fiji_http_request_seconds', 'Latency of requests to the web application', ['endpoint', 'method', 'status']
+)
+
+def timed(stage):
+    """Decorator recording the duration of every call under a stage of STAGE_SECONDS"""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with STAGE_SECONDS.time(stage=stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
\ No newline at end of file
@@ -0,0 +1,85 @@
+import re
+from collections import Counter
+
+class KeywordMatcher:
+    """Finds every keyword from several keyword lists in a single pass over the text"""
+    # Endings accepted after a whole-word keyword, so "protest" also matches "protests"
+    SUFFIXES = ("'s", "s", "es", "ed", "ing")
+
+    def __init__(self, keyword_sets):
+        # keyword_sets maps a category name to its keywords. Matching is case-insensitive
+        # and starts at a word boundary; a trailing "*" marks a stem ("legislat*") that
+        # may be followed by any other letters.
+        self.categories = list(keyword_sets)
+        self.keyword_categories = {}
+        stems = set()
+
+        for category, keywords in keyword_sets.items():
+            for keyword in keywords:
+                keyword = keyword.lower()
+                if keyword.endswith('*'):
+                    keyword = keyword[:-1]
+                    stems.add(keyword)
+                self.keyword_categories.setdefault(keyword, [])
+                if category not in self.keyword_categories[keyword]:
+                    self.keyword_categories[keyword].append(category)
+
+        # The regex reports one keyword per starting position, preferring the longest.
+        # Shorter keywords that start at the same place are implied by the longer one.
+        self.implied = {
+            keyword: [other for other in self.keyword_categories if self._starts_with(keyword, other, other in stems)]
+            for keyword in self.keyword_categories
+        }
+
+        self.pattern = self._compile(
+            [k for k in self.keyword_categories if k not in stems],
+            [k for k in self.keyword_categories if k in stems]
+        )
+
+    def _starts_with(self, keyword, other, is_stem):
+        """Check whether a match of keyword also counts as a match of other"""
+        if other == keyword or not keyword.startswith(other):
+            return False
+        rest = keyword[len(other):]
+        return is_stem or rest.startswith(' ') or rest in self.SUFFIXES
+
+    def _compile(self, whole_words, stems):
+        """Combine all keywords into one alternation, longest first"""
+        def alternation(keywords):
+            keywords = sorted(keywords, key=len, reverse=True)
+            return "|".join(re.escape(k).replace(r'\ ', r'\s+') for k in keywords)
+
+        branches = []
+        if whole_words:
+            suffixes = "|".join(re.escape(s) for s in self.SUFFIXES)
+            branches.append(rf"(?P<word>{alternation(whole_words)})(?:{suffixes})?\b")
+        if stems:
+            branches.append(rf"(?P<stem>{alternation(stems)})")
+
+        if not branches:
+            return None
+
+        # The lookahead keeps matches zero-width, so keywords that overlap are all found
+        return re.compile(rf"\b(?=(?:{'|'.join(branches)}))", re.IGNORECASE)
+
+    def scan(self, text):
+        """Return a Counter of keyword hits for each category"""
+        hits = {category: Counter() for category in self.categories}
+        if self.pattern is None or not text:
+            return hits
+
+        for match in self.pattern.finditer(text):
+            keyword = " ".join(match.group(match.lastgroup).lower().split())
+            for found in [keyword] + self.implied[keyword]:
+                for category in self.keyword_categories[found]:
+                    hits[category][found] += 1
+
+        return hits
+
+    def counts(self, text):
+        """Return the total number of keyword hits for each category"""
+        return {category: sum(counter.values()) for category, counter in self.scan(text).items()}
+
+    def search(self, text):
+        """Check whether any keyword occurs in the text"""
+        return bool(text) and self.pattern is not None and self.pattern.search(text) is not None
\ No newline at end of file
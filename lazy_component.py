@@ -0,0 +1,42 @@
+import threading
+import importlib
+
+class LazyComponent:
+    """Stands in for an application component and builds it on first use
+
+    Attribute access is forwarded to the component, so callers use the proxy
+    exactly like the component itself. The factory, and any heavy imports inside
+    it, only run when a request first needs the component.
+    """
+    def __init__(self, factory):
+        object.__setattr__(self, '_factory', factory)
+        object.__setattr__(self, '_instance', None)
+        object.__setattr__(self, '_lock', threading.Lock())
+
+    def _load(self):
+        """Return the component, building it once even when several threads ask at the same time"""
+        instance = self._instance
+        if instance is None:
+            with self._lock:
+                instance = self._instance
+                if instance is None:
+                    instance = self._factory()
+                    object.__setattr__(self, '_instance', instance)
+        return instance
+
+    @property
+    def loaded(self):
+        return self._instance is not None
+
+    def __getattr__(self, name):
+        return getattr(self._load(), name)
+
+    def __setattr__(self, name, value):
+        setattr(self._load(), name, value)
+
+def lazy(module_name, class_name, *args, **kwargs):
+    """A LazyComponent that imports module_name and builds class_name(*args, **kwargs) on first use"""
+    def factory():
+        module = importlib.import_module(module_name)
+        return getattr(module, class_name)(*args, **kwargs)
+    return LazyComponent(factory)
\ No newline at end of file
@@ -1,32 +1,104 @@
-import nltk
 import re
 import datetime
 from collections import Counter, defaultdict
-from nltk.tokenize import sent_tokenize, word_tokenize
-from nltk.corpus import stopwords
-from nltk.probability import FreqDist
-from nltk.collocations import BigramAssocMeasures, BigramCollocationFinder
+import resources
+from keyword_matcher import KeywordMatcher
+from document_model import document_cache
+from sketches import StreamingPhraseCounter
+from dedup import unique_stories
+from instrumentation import timed
+from threat_monitor import THREAT_KEYWORDS
+
+# Sentence ends: ., ! or ? (maybe closing a quote or bracket) followed by space and a capital or digit,
+# except after initials and titles such as "Mr." that usually precede a name
+SENTENCE_END = re.compile(
+    r'(?:(?<=[.!?])|(?<=[.!?][\"\')\]]))'
+    r'(?<!\b[A-Z]\.)(?<!\bMr\.)(?<!\bMs\.)(?<!\bDr\.)(?<!\bSt\.)(?<!\bMrs\.)(?<!\bHon\.)(?<!\bGen\.)(?<!\bProf\.)'
+    r'\s+(?=[\"\'(]?[A-Z0-9])'
+)
+WORD = re.compile(r"[a-z][a-z']+")
+
+def split_sentences(text):
+    """Sentences of a text, treating line breaks as paragraph ends"""
+    sentences = []
+    for paragraph in text.split('\n'):
+        sentences.extend(sentence.strip() for sentence in SENTENCE_END.split(paragraph) if sentence.strip())
+    return sentences
+
+def _row_similarity(rows, owners, targets):
+    """Dot product of each sparse row with the target row of its owner, rows[i] . targets[owners[i]]
+
+    The matching target weights are looked up by (owner, term) in one sorted-key
+    search instead of materializing a target row per sentence.
+    """
+    import numpy as np
+
+    rows = rows.tocoo()
+    if not targets.nnz:
+        return np.zeros(rows.shape[0])
+    targets = targets.tocsr()
+    targets.sort_indices()
+    width = targets.shape[1]
+    target_rows = np.repeat(np.arange(targets.shape[0]), np.diff(targets.indptr))
+    target_keys = target_rows.astype(np.int64) * width + targets.indices
+    keys = np.asarray(owners, dtype=np.int64)[rows.row] * width + rows.col
+
+    positions = np.minimum(np.searchsorted(target_keys, keys), len(target_keys) - 1)
+    products = np.where(target_keys[positions] == keys, rows.data * targets.data[positions], 0.0)
+    return np.bincount(rows.row, weights=products, minlength=rows.shape[0])
+
+def _normalize(matrix):
+    """Rows of a sparse matrix scaled to unit length; empty rows stay zero"""
+    import numpy as np
+    from scipy import sparse
+
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    return (sparse.diags(1 / np.where(norms > 0, norms, 1)) @ matrix).tocsr()
+
+class SentenceScores:
+    """Sentences of a batch of articles with their TF-IDF vectors and scores"""
+    def __init__(self, sentences, owners, vectors, article_vectors, importance, terms, vocabulary):
+        self.sentences = sentences
+        self.owners = owners  # Index of the article each sentence comes from, in ascending order
+        self.vectors = vectors  # L2-normalized TF-IDF row of each sentence
+        self.article_vectors = article_vectors  # L2-normalized TF-IDF row of each article
+        self.importance = importance  # Centrality in its article plus title and lead bonuses
+        self.terms = terms  # Raw TF-IDF weights of each article, for keywords
+        self.vocabulary = vocabulary  # Term of each column
+
+    def summary(self, article, max_sentences):
+        """The most important sentences of an article, by its index in the batch, in text order"""
+        # Sentences are stored article by article, so an article's are one contiguous range
+        start, end = self.owners.searchsorted([article, article + 1])
+        best = sorted(range(start, end), key=lambda i: self.importance[i], reverse=True)[:max_sentences]
+        return "\n".join(self.sentences[i] for i in sorted(best))
 
 class NewsAnalyzer:
+    # Bump whenever the output changes so cached results are recomputed
+    VERSION = "4"
+    
     def __init__(self):
-        # Download necessary NLTK data
-        try:
-            nltk.data.find('corpora/stopwords')
-        except LookupError:
-            nltk.download('stopwords')
-            nltk.download('punkt')
-        
-        self.stop_words = set(stopwords.words('english'))
-        
-        # Keywords to monitor for potential threats
-        self.threat_keywords = [
-            'protest', 'riot', 'unrest', 'violence', 'conflict', 'strike', 'coup',
-            'demonstration', 'crisis', 'tension', 'opposition', 'controversial',
-            'disaster', 'emergency', 'threat', 'attack', 'warning', 'security',
-            'concern', 'issue', 'problem', 'critical', 'serious', 'dispute',
-            'political instability', 'economic crisis', 'corruption', 'scandal'
-        ]
+        # Stop words come from the prepared artifact, or from NLTK (downloaded if missing)
+        self.stop_words = set(resources.stop_words())
+        
+        # Error bounds for the streaming topic counters; epsilon 0.001 keeps
+        # each sketch near 100 KB (0.0001 took about 1 MB)
+        self.sketch_epsilon = 0.001
+        self.sketch_delta = 0.01
+        
+        # Keywords to monitor for potential threats (the same list the threat monitor streams)
+        self.threat_keywords = list(THREAT_KEYWORDS)
+        self.threat_matcher = KeywordMatcher({"threat": self.threat_keywords})
+        
+        # Sentence scoring for summaries and digests: similarity to the title and
+        # a bonus for early sentences are added to centrality, and digest sentences
+        # more similar than redundancy to one already chosen are skipped
+        self.title_weight = 0.5
+        self.lead_weight = 0.2
+        self.redundancy = 0.5
+        self.min_sentence_terms = 4
     
+    @timed("summary")
     def generate_summary(self, news_data):
         """Generate a comprehensive summary of the news articles"""
         summary = []
@@ -35,6 +107,9 @@ class NewsAnalyzer:
         now = datetime.datetime.now().strftime("%Y-%m-%d %H:%M")
         summary.append(f"FIJI NEWS SUMMARY - Generated on {now}\n")
         
+        # Every category's digest comes from one scoring pass over all stories
+        digests = self.digest(news_data)
+        
         # Summary by category
         for category, articles in news_data.items():
             if articles:
@@ -47,8 +122,7 @@ class NewsAnalyzer:
                 summary.append("Sources: " + ", ".join([f"{source} ({count})" for source, count in top_sources]))
                 
                 # Extract key topics using frequent words
-                all_text = " ".join([article['text'] for article in articles])
-                topics = self._extract_key_topics(all_text, 5)
+                topics = self._count_phrases(articles).top_topics(5)
                 summary.append("Key topics: " + ", ".join(topics))
                 
                 # Recent headlines
@@ -56,14 +130,20 @@ class NewsAnalyzer:
                 for article in articles[:5]:  # Top 5 articles
                     summary.append(f"- {article['title']} ({article['source']})")
                 
-                # Most important article summary
-                if articles:
-                    longest_article = max(articles, key=lambda x: len(x['text']))
+                # Digest of the category, picked across all of its stories at once
+                digest = digests.get(category)
+                if digest:
+                    summary.append("\nDigest:")
+                    for entry in digest["sentences"]:
+                        summary.append(f"- {entry['sentence']} ({entry['source']})")
+                    
+                    # The story closest to the category as a whole
+                    featured = digest["featured"]
                     summary.append("\nFeatured article:")
-                    summary.append(f"Title: {longest_article['title']}")
-                    summary.append(f"Source: {longest_article['source']}")
-                    summary.append(f"Date: {longest_article['published_date']}")
-                    summary.append(f"Summary: {longest_article['summary']}")
+                    summary.append(f"Title: {featured['title']}")
+                    summary.append(f"Source: {featured['source']}")
+                    summary.append(f"Date: {featured['published_date']}")
+                    summary.append(f"Summary: {featured['summary']}")
         
         # Overall statistics
         total_articles = sum(len(articles) for articles in news_data.values())
@@ -80,6 +160,7 @@ class NewsAnalyzer:
         
         return "\n".join(summary)
     
+    @timed("trends")
     def analyze_trends(self, news_data):
         """Analyze trends, identify emerging threats, and suggest mitigation strategies"""
         analysis = {
@@ -100,53 +181,260 @@ class NewsAnalyzer:
         analysis["overview"]["articles_by_category"] = {cat: len(arts) for cat, arts in news_data.items()}
         analysis["overview"]["articles_by_source"] = dict(Counter([a["source"] for a in all_articles]).most_common())
         
+        # Syndicated copies of a story are analyzed once
+        stories = unique_stories(all_articles)
+        analysis["overview"]["total_stories"] = len(stories)
+        
         # Find trends
+        # Each story is counted once into its category's counter; the overall
+        # counts are the merge of the category counters
+        category_counters = {
+            category: self._count_phrases(unique_stories(articles)) for category, articles in news_data.items() if articles
+        }
+        overall = self._new_phrase_counter()
+        for counter in category_counters.values():
+            overall.merge(counter)
+        
         # 1. Common topics
-        all_text = " ".join([a["text"] for a in all_articles])
-        analysis["trends"]["top_topics"] = self._extract_key_topics(all_text, 10)
+        analysis["trends"]["top_topics"] = overall.top_topics(10)
         
         # 2. Common phrases
-        analysis["trends"]["common_phrases"] = self._extract_common_phrases(all_text, 10)
+        analysis["trends"]["common_phrases"] = overall.top_phrases(10)
         
         # 3. Trends by category
-        analysis["trends"]["category_topics"] = {}
-        for category, articles in news_data.items():
-            if articles:
-                category_text = " ".join([a["text"] for a in articles])
-                analysis["trends"]["category_topics"][category] = self._extract_key_topics(category_text, 5)
+        analysis["trends"]["category_topics"] = {
+            category: counter.top_topics(5) for category, counter in category_counters.items()
+        }
         
         # Identify potential emerging threats
-        analysis["emerging_threats"] = self._identify_threats(all_articles)
+        analysis["emerging_threats"] = self._identify_threats(stories)
         
         # Generate mitigation strategies based on threats
         analysis["mitigation_strategies"] = self._generate_mitigation_strategies(analysis["emerging_threats"])
         
         return analysis
     
-    def _extract_key_topics(self, text, num_topics=5):
-        """Extract key topics from text using word frequency"""
-        # Tokenize and filter stop words
-        words = word_tokenize(text.lower())
-        words = [word for word in words if word.isalpha() and word not in self.stop_words and len(word) > 3]
-        
-        # Get most common words
-        fdist = FreqDist(words)
-        return [word for word, _ in fdist.most_common(num_topics)]
+    @timed("trends_period")
+    def analyze_period(self, corpus_stats, article_store, since=None, until=None):
+        """Analyze trends for a date range from stored counts instead of re-scanning article text"""
+        analysis = {
+            "timestamp": datetime.datetime.now().strftime("%Y-%m-%d %H:%M"),
+            "period": {"since": since, "until": until},
+            "overview": {},
+            "trends": {},
+            "emerging_threats": [],
+            "mitigation_strategies": []
+        }
+        
+        # Overall statistics, all counted over the same originals (syndicated copies excluded)
+        articles_by_category = corpus_stats.document_counts(since, until)
+        analysis["overview"]["total_articles"] = sum(articles_by_category.values())
+        analysis["overview"]["articles_by_category"] = articles_by_category
+        analysis["overview"]["articles_by_source"] = corpus_stats.source_counts(since, until)
+        
+        # Trends come from merging the per-day count tables
+        analysis["trends"]["top_topics"] = corpus_stats.top_terms(since, until, num_terms=10)
+        analysis["trends"]["common_phrases"] = corpus_stats.top_phrases(since, until, num_phrases=10)
+        analysis["trends"]["category_topics"] = {
+            category: corpus_stats.top_terms(since, until, category=category, num_terms=5)
+            for category, count in articles_by_category.items() if count
+        }
+        
+        # Threat detection still needs the articles themselves
+        articles = article_store.query(
+            since=since, until=until, limit=None,
+            fields=['title', 'source', 'published_date', 'url', 'text', 'summary', 'story_id']
+        )["articles"]
+        analysis["emerging_threats"] = self._identify_threats(unique_stories(articles))
+        analysis["mitigation_strategies"] = self._generate_mitigation_strategies(analysis["emerging_threats"])
+        
+        return analysis
+    
+    @timed("batch_summaries")
+    def summarize_articles(self, articles, max_sentences=5, num_keywords=10, document_frequencies=None):
+        """Fill in the summary and keywords of articles that have none, all in one TF-IDF pass
+
+        This replaces running newspaper's nlp() on every article: a summary is the
+        max_sentences most important sentences of the article in text order, and
+        the keywords are its highest-weighted TF-IDF terms. A batch of a dozen
+        articles says little about which terms are rare, so document_frequencies
+        (like ArticleStore.document_frequencies) can supply the counts of a larger
+        corpus to compute IDF over together with the batch.
+        """
+        import numpy as np
+        
+        pending = [article for article in articles if not article.get("summary") or not article.get("keywords")]
+        if not pending:
+            return articles
+        
+        scored = self._score_sentences(pending, document_frequencies)
+        for position, article in enumerate(pending):
+            if not article.get("summary"):
+                article["summary"] = scored.summary(position, max_sentences)
+            
+            if not article.get("keywords"):
+                start, end = scored.terms.indptr[position:position + 2]
+                weights = scored.terms.data[start:end]
+                top = scored.terms.indices[start:end][np.argsort(-weights, kind='stable')[:num_keywords]]
+                article["keywords"] = [scored.vocabulary[i] for i in top]
+        
+        return articles
     
-    def _extract_common_phrases(self, text, num_phrases=5):
-        """Extract common phrases (bigrams) from text"""
-        # Tokenize and filter stop words
-        words = word_tokenize(text.lower())
-        words = [word for word in words if word.isalpha() and word not in self.stop_words]
-        
-        # Find bigrams
-        bigram_measures = BigramAssocMeasures()
-        finder = BigramCollocationFinder.from_words(words)
-        finder.apply_freq_filter(3)  # Filter out bigrams that appear less than 3 times
-        
-        # Get top bigrams by PMI (Pointwise Mutual Information)
-        bigrams = finder.nbest(bigram_measures.pmi, num_phrases)
-        return [" ".join(bigram) for bigram in bigrams]
+    @timed("digest")
+    def digest(self, news_data, num_sentences=5):
+        """Digest of each category: its most central sentences across stories, without repeats
+
+        All stories of all categories are scored together. Within a category,
+        sentences are ranked by their similarity to the category's centroid plus
+        the title and lead bonuses, and taken greedily, one per story, skipping any
+        too similar to a sentence already chosen. The story closest to the centroid
+        is returned as the featured article.
+        """
+        import numpy as np
+        
+        categories = [category for category, articles in news_data.items() if articles]
+        stories = []
+        story_categories = []
+        for index, category in enumerate(categories):
+            category_stories = unique_stories(news_data[category])
+            stories.extend(category_stories)
+            story_categories.extend([index] * len(category_stories))
+        if not stories:
+            return {}
+        
+        scored = self._score_sentences(stories)
+        story_categories = np.array(story_categories)
+        
+        # Category centroids are the normalized sums of their story vectors
+        membership = self._membership(story_categories, len(categories))
+        centroids = _normalize(membership @ scored.article_vectors)
+        closeness = _row_similarity(scored.article_vectors, story_categories, centroids)
+        sentence_categories = story_categories[scored.owners]
+        centrality = _row_similarity(scored.vectors, sentence_categories, centroids)
+        scores = centrality + scored.importance
+        long_enough = np.diff(scored.vectors.indptr) >= self.min_sentence_terms
+        
+        digests = {}
+        for index, category in enumerate(categories):
+            in_category = np.flatnonzero(story_categories == index)
+            featured = in_category[np.argmax(closeness[in_category])]
+            
+            candidates = np.flatnonzero((sentence_categories == index) & long_enough)
+            candidates = candidates[np.argsort(-scores[candidates], kind='stable')]
+            chosen = []
+            used_stories = set()
+            for candidate in candidates:
+                if len(chosen) >= num_sentences:
+                    break
+                owner = scored.owners[candidate]
+                if owner in used_stories:
+                    continue
+                if chosen:
+                    similarity = (scored.vectors[chosen] @ scored.vectors[candidate].T).toarray()
+                    if similarity.max() > self.redundancy:
+                        continue
+                chosen.append(candidate)
+                used_stories.add(owner)
+            
+            digests[category] = {
+                "featured": dict(stories[featured], summary=stories[featured].get("summary") or scored.summary(featured, 3)),
+                "sentences": [
+                    {
+                        "sentence": scored.sentences[i],
+                        "title": stories[scored.owners[i]]["title"],
+                        "source": stories[scored.owners[i]]["source"],
+                        "url": stories[scored.owners[i]]["url"]
+                    }
+                    for i in chosen
+                ]
+            }
+        
+        return digests
+    
+    def _score_sentences(self, articles, document_frequencies=None):
+        """Split a batch of articles into sentences and score them all in one sparse computation
+
+        Each sentence's importance is its cosine similarity to its own article
+        (centrality), plus title_weight times its similarity to the title and a
+        lead_weight bonus falling from the first sentence to the last. IDF weights
+        are computed over the articles of the batch, plus those counted by
+        document_frequencies when given.
+        """
+        import numpy as np
+        from scipy import sparse
+        
+        sentences, owners, leads = [], [], []
+        for index, article in enumerate(articles):
+            article_sentences = split_sentences(article.get('text') or '')
+            for position, sentence in enumerate(article_sentences):
+                sentences.append(sentence)
+                owners.append(index)
+                leads.append(1.0 - position / len(article_sentences))
+        
+        # Term counts of every sentence and title; titles are counted as part of
+        # their article but are not candidate sentences
+        vocabulary = defaultdict()
+        vocabulary.default_factory = vocabulary.__len__  # An unseen term gets the next column
+        stop_words = self.stop_words
+        columns, indptr = [], [0]
+        for text in sentences + [article.get('title') or '' for article in articles]:
+            columns.extend(map(vocabulary.__getitem__, [word for word in WORD.findall(text.lower()) if word not in stop_words]))
+            indptr.append(len(columns))
+        counts = sparse.csr_matrix(
+            (np.ones(len(columns)), columns, indptr), shape=(len(indptr) - 1, len(vocabulary))
+        )
+        counts.sum_duplicates()
+        sentence_counts = counts[:len(sentences)]
+        title_counts = counts[len(sentences):]
+        owners = np.array(owners, dtype=np.int64)
+        
+        article_counts = self._membership(owners, len(articles)) @ sentence_counts + title_counts
+        document_frequency = np.bincount(article_counts.tocoo().col, minlength=counts.shape[1])
+        article_count = len(articles)
+        if document_frequencies:
+            stored, stored_count = document_frequencies(list(vocabulary))
+            document_frequency = document_frequency + np.array(stored, dtype=np.int64)
+            article_count += stored_count
+        idf = np.log((1 + article_count) / (1 + document_frequency)) + 1
+        weights = sparse.diags(idf)
+        
+        vectors = _normalize(sentence_counts @ weights)
+        terms = (article_counts @ weights).tocsr()
+        article_vectors = _normalize(terms)
+        titles = _normalize(title_counts @ weights)
+        
+        importance = (
+            _row_similarity(vectors, owners, article_vectors)
+            + self.title_weight * _row_similarity(vectors, owners, titles)
+            + self.lead_weight * np.array(leads)
+        )
+        # Fragments like datelines and captions make poor summary sentences
+        too_short = np.diff(sentence_counts.indptr) < self.min_sentence_terms
+        importance[too_short] -= 1.0
+        
+        return SentenceScores(
+            sentences, owners, vectors, article_vectors, importance, terms, list(vocabulary)
+        )
+    
+    def _membership(self, groups, group_count):
+        """Sparse group x item matrix with a 1 where an item belongs to a group"""
+        import numpy as np
+        from scipy import sparse
+        
+        return sparse.csr_matrix(
+            (np.ones(len(groups)), (groups, np.arange(len(groups)))), shape=(group_count, len(groups))
+        )
+    
+    def _new_phrase_counter(self):
+        """Create an empty streaming topic and phrase counter"""
+        return StreamingPhraseCounter(self.sketch_epsilon, self.sketch_delta)
+    
+    def _count_phrases(self, articles):
+        """Feed articles one at a time into a topic and phrase counter"""
+        counter = self._new_phrase_counter()
+        for article in articles:
+            counter.add_document(document_cache.get(article['text']).tokens)
+        return counter
     
     def _identify_threats(self, articles):
         """Identify potential emerging threats from news articles"""
@@ -154,10 +442,9 @@ class NewsAnalyzer:
         
         # Scan all articles for threat keywords
         for article in articles:
-            threat_matches = []
-            for keyword in self.threat_keywords:
-                if keyword in article['text'].lower() or keyword in article['title'].lower():
-                    threat_matches.append(keyword)
+            found = set(self.threat_matcher.scan(article['text'])["threat"])
+            found.update(self.threat_matcher.scan(article['title'])["threat"])
+            threat_matches = [keyword for keyword in self.threat_keywords if keyword in found]
             
             if threat_matches:
                 threats.append({
@@ -1,35 +1,30 @@
-import nltk
-import re
-import os
+import sys
 import pickle
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.naive_bayes import MultinomialNB
-from sklearn.pipeline import Pipeline
-from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer
+import resources
+from keyword_matcher import KeywordMatcher
+from document_model import document_cache
+from extraction import extraction_pool
+from snapshots import list_snapshots, load_snapshot
+from instrumentation import timed
 
 class NewsClassifier:
     def __init__(self):
-        # Download necessary NLTK data
-        try:
-            nltk.data.find('corpora/stopwords')
-            nltk.data.find('corpora/wordnet')
-        except LookupError:
-            nltk.download('stopwords')
-            nltk.download('wordnet')
-            nltk.download('punkt')
-        
+        # NLTK data is checked (and downloaded if missing) when the first text is processed
         self.categories = ['politics', 'community', 'sports', 'crime', 'others']
         self.model_path = 'data/classifier_model.pkl'
         
+        # Model predictions below this probability fall back to the keyword rules
+        self.confidence_threshold = 0.5
+        
         # Initialize or load model
         self.classifier = self._initialize_model()
         
-        # Keywords for each category to help with classification
+        # Keywords for each category to help with classification.
+        # A trailing "*" matches any word starting with the stem.
         self.category_keywords = {
             'politics': [
                 'government', 'parliament', 'election', 'minister', 'policy', 'political', 
-                'prime minister', 'opposition', 'vote', 'legislat', 'party', 'MP', 'democracy',
+                'prime minister', 'opposition', 'vote', 'legislat*', 'party', 'MP', 'democracy',
                 'constitutional', 'cabinet', 'president', 'diplomatic', 'international relations'
             ],
             'community': [
@@ -49,17 +44,29 @@ class NewsClassifier:
             ],
             'others': []  # Default category
         }
+        
+        # All category keywords compiled into a single matcher
+        self.keyword_matcher = KeywordMatcher(self.category_keywords)
     
     def _initialize_model(self):
         """Initialize or load the classifier model"""
-        # If a saved model exists, load it
-        if os.path.exists(self.model_path):
-            with open(self.model_path, 'rb') as f:
-                return pickle.load(f)
+        # If a saved model exists, load it (from the prepared artifact when it is current)
+        model = resources.load_model(self.model_path)
+        if model is not None:
+            return model
         
         # Otherwise, create a new model
-        # This is a basic pipeline - in a real application, 
-        # you would train this with labeled data
+        # This is a basic pipeline - train it with labeled snapshots
+        # using `python news_classifier.py train`
+        return self._new_model()
+    
+    def _new_model(self):
+        """Create an untrained TF-IDF + Naive Bayes pipeline"""
+        # scikit-learn is only imported when a model is actually built
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from sklearn.naive_bayes import MultinomialNB
+        from sklearn.pipeline import Pipeline
+        
         return Pipeline([
             ('vectorizer', TfidfVectorizer(stop_words='english')),
             ('classifier', MultinomialNB())
@@ -67,31 +74,32 @@ class NewsClassifier:
     
     def _preprocess_text(self, text):
         """Preprocess text for classification"""
-        # Convert to lowercase
-        text = text.lower()
-        
-        # Remove special characters
-        text = re.sub(r'[^\w\s]', '', text)
-        
-        # Tokenize
-        tokens = nltk.word_tokenize(text)
-        
-        # Remove stop words and lemmatize
-        lemmatizer = WordNetLemmatizer()
-        stop_words = set(stopwords.words('english'))
-        tokens = [lemmatizer.lemmatize(word) for word in tokens if word not in stop_words]
-        
-        return ' '.join(tokens)
+        # Tokens, stop word removal and lemmas come from the shared document cache
+        return ' '.join(document_cache.get(text).lemmas)
+    
+    def _article_text(self, article):
+        """Preprocessed text and title of an article"""
+        return self._preprocess_text(article["text"]) + " " + self._preprocess_text(article["title"])
     
-    def _rule_based_classification(self, article):
+    def _article_texts(self, articles):
+        """Preprocessed text and title of many articles, tokenized on the process pool when there are enough"""
+        documents = document_cache.get_many(
+            [article["text"] for article in articles] + [article["title"] for article in articles], extraction_pool
+        )
+        count = len(articles)
+        return [
+            ' '.join(documents[i].lemmas) + " " + ' '.join(documents[count + i].lemmas)
+            for i in range(count)
+        ]
+    
+    def _rule_based_classification(self, article, processed_text=None):
         """Use keyword matching to classify the article"""
-        processed_text = self._preprocess_text(article["text"] + " " + article["title"])
+        if processed_text is None:
+            processed_text = self._article_text(article)
         
-        # Calculate scores for each category
-        scores = {}
-        for category, keywords in self.category_keywords.items():
-            score = sum(1 for keyword in keywords if keyword in processed_text)
-            scores[category] = score
+        # Score each category by the number of its distinct keywords found
+        hits = self.keyword_matcher.scan(processed_text)
+        scores = {category: len(found) for category, found in hits.items()}
         
         # Check if any category has a clear signal
         if max(scores.values()) > 0:
@@ -99,14 +107,87 @@ class NewsClassifier:
         else:
             return "others"
     
+    def is_trained(self):
+        """Check whether the model has been fitted"""
+        return hasattr(self.classifier.steps[-1][1], 'classes_')
+    
+    def _classify_batch(self, articles):
+        """Classify all articles with one vectorized model call, using the rules for uncertain ones"""
+        texts = self._article_texts(articles)
+        
+        if not self.is_trained():
+            return [self._rule_based_classification(a, t) for a, t in zip(articles, texts)]
+        
+        # One sparse TF-IDF transform and one predict_proba for the whole batch
+        probabilities = self.classifier.predict_proba(texts)
+        classes = self.classifier.classes_
+        best = probabilities.argmax(axis=1)
+        confidence = probabilities.max(axis=1)
+        
+        categories = []
+        for i, article in enumerate(articles):
+            if confidence[i] >= self.confidence_threshold and classes[best[i]] in self.categories:
+                categories.append(classes[best[i]])
+            else:
+                categories.append(self._rule_based_classification(article, texts[i]))
+        return categories
+    
+    @timed("classify")
     def categorize(self, articles):
         """Categorize a list of articles into defined categories"""
         categorized = {cat: [] for cat in self.categories}
+        if not articles:
+            return categorized
         
-        for article in articles:
-            # Use rule-based classification for now
-            category = self._rule_based_classification(article)
+        for article, category in zip(articles, self._classify_batch(articles)):
             article["category"] = category
             categorized[category].append(article)
         
-        return categorized 
\ No newline at end of file
+        return categorized
+    
+    def train(self, snapshot_paths):
+        """Train the model on categorized news snapshots and save it"""
+        training_articles = []
+        labels = []
+        seen_urls = set()
+        
+        # Snapshots map each category to its articles; that category is the label
+        for path in snapshot_paths:
+            news_data = load_snapshot(path)
+            
+            for category, articles in news_data.items():
+                if category not in self.categories:
+                    continue
+                for article in articles:
+                    # The same article often appears in several snapshots
+                    if article["url"] in seen_urls:
+                        continue
+                    seen_urls.add(article["url"])
+                    training_articles.append(article)
+                    labels.append(category)
+        
+        if len(set(labels)) < 2:
+            raise ValueError("Training needs labeled articles from at least two categories")
+        
+        model = self._new_model()
+        model.fit(self._article_texts(training_articles), labels)
+        
+        with open(self.model_path, 'wb') as f:
+            pickle.dump(model, f)
+        
+        self.classifier = model
+        return {category: labels.count(category) for category in self.categories}
+
+if __name__ == '__main__':
+    # Usage: python news_classifier.py train [snapshot ...]
+    if len(sys.argv) < 2 or sys.argv[1] != 'train':
+        print("Usage: python news_classifier.py train [snapshot ...]")
+        sys.exit(1)
+    
+    paths = sys.argv[2:] or list_snapshots('data')
+    if not paths:
+        print("No snapshots found in data/")
+        sys.exit(1)
+    
+    counts = NewsClassifier().train(paths)
+    print(f"Trained on {sum(counts.values())} articles from {len(paths)} snapshots: {counts}")
\ No newline at end of file
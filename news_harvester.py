@@ -1,14 +1,68 @@
-import requests
-from bs4 import BeautifulSoup
 import newspaper
-from newspaper import Article
 import datetime
-import re
-import time
-import random
+import hashlib
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from http_client import PoliteSession
+from article_index import ArticleIndex
+from feed_discovery import FeedDiscovery
+from keyword_matcher import KeywordMatcher
+from extraction import extraction_pool, parse_html, summarize
+from instrumentation import STAGE_SECONDS, ARTICLES, DOWNLOADED_BYTES, IN_FLIGHT
 
-class NewsScraper:
+class SourceUnavailable(Exception):
+    """A source could not be harvested at all, as opposed to having nothing new"""
+
+class PipelineStats:
+    """Counts the items going into and coming out of each extraction stage"""
     def __init__(self):
+        self.counts = {}
+    
+    def stage(self, name, func, items, pool=None, window=1):
+        """Lazily apply func to each item, dropping items for which it returns None"""
+        # Register the stage up front so the counts keep pipeline order
+        counts = self.counts.setdefault(name, {"in": 0, "out": 0})
+        return self._run(counts, func, items, pool, window)
+    
+    def _run(self, counts, func, items, pool, window):
+        """Generator behind stage()"""
+        if pool is None:
+            for item in items:
+                counts["in"] += 1
+                result = func(item)
+                if result is not None:
+                    counts["out"] += 1
+                    yield result
+            return
+        
+        # Keep a bounded window of calls in flight on the pool, yielding results in order
+        pending = []
+        try:
+            for item in items:
+                counts["in"] += 1
+                pending.append(pool.submit(func, item))
+                if len(pending) >= window:
+                    result = pending.pop(0).result()
+                    if result is not None:
+                        counts["out"] += 1
+                        yield result
+            
+            while pending:
+                result = pending.pop(0).result()
+                if result is not None:
+                    counts["out"] += 1
+                    yield result
+        finally:
+            for future in pending:
+                future.cancel()
+    
+    def describe(self):
+        """Summarise the stage counts on one line"""
+        return ", ".join(f"{name} {c['in']}->{c['out']}" for name, c in self.counts.items())
+
+class NewsScraper:
+    def __init__(self, max_workers=8, articles_per_source=10, index_path='data/article_index.db',
+                 feeds_path='data/feeds.db', per_article_nlp=False):
         # List of Fiji news sources
         self.sources = [
             {"name": "Fiji Times", "url": "https://www.fijitimes.com"},
@@ -22,97 +76,345 @@ class NewsScraper:
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
+        
+        # Total number of article downloads in flight across all sources
+        self.max_workers = max_workers
+        
+        # Limit to avoid too many requests during development
+        self.articles_per_source = articles_per_source
+        
+        # Summaries and keywords normally come from NewsAnalyzer.summarize_articles for a
+        # whole batch at once; per_article_nlp runs newspaper's NLP on each article instead
+        self.per_article_nlp = per_article_nlp
+        
+        # Pooled keep-alive session; per-host token buckets replace the old fixed sleeps
+        self.session = PoliteSession(headers=self.headers, rate=1.0, burst=2, max_per_host=2)
+        
+        # Articles seen in earlier harvests, so re-harvests only pay for what changed
+        self.index = ArticleIndex(index_path)
+        
+        # RSS/Atom feeds and sitemaps list new articles in one request instead of a crawl
+        self.discovery = FeedDiscovery(lambda url, **kwargs: self.session.get(url, **kwargs), feeds_path)
+        
+        # Items in/out of each pipeline stage for the most recent scrape of every source
+        self.pipeline_stats = {}
+        
+        # Terms that mark an article as being about Fiji
+        self.fiji_matcher = KeywordMatcher({
+            "fiji": ["fiji", "fijian", "suva", "nadi", "pacific island", "viti levu", "vanua levu"]
+        })
     
-    def harvest(self):
+    def harvest(self, concurrent=True, on_source_start=None, on_source_done=None):
         """Harvest news articles from all sources"""
+        # on_source_start(name) and on_source_done(name, articles) report progress per source
+        with IN_FLIGHT.track_in_flight(operation="harvest"), STAGE_SECONDS.time(stage="harvest"):
+            return self._harvest_all(concurrent, on_source_start, on_source_done)
+    
+    def _harvest_all(self, concurrent, on_source_start, on_source_done):
+        """Harvest every source, sequentially or in parallel"""
         all_articles = []
         
-        for source in self.sources:
-            try:
-                print(f"Scraping {source['name']}...")
-                articles = self._scrape_source(source)
-                all_articles.extend(articles)
-                # Sleep to avoid overloading the servers
-                time.sleep(random.uniform(1, 3))
-            except Exception as e:
-                print(f"Error scraping {source['name']}: {str(e)}")
+        if not concurrent:
+            for source in self.sources:
+                all_articles.extend(self._harvest_source(source, None, on_source_start, on_source_done))
+            return all_articles
+        
+        # Crawl every source in parallel so the total time follows the slowest source
+        with ThreadPoolExecutor(max_workers=self.max_workers) as article_pool:
+            with ThreadPoolExecutor(max_workers=len(self.sources)) as source_pool:
+                futures = [
+                    source_pool.submit(self._harvest_source, source, article_pool, on_source_start, on_source_done)
+                    for source in self.sources
+                ]
+                for future in futures:
+                    all_articles.extend(future.result())
                 
         return all_articles
     
-    def _scrape_source(self, source):
-        """Scrape articles from a single source"""
+    def harvest_source(self, source):
+        """Harvest a single source, e.g. when it is polled on its own schedule
+
+        Raises SourceUnavailable when errors kept the source from yielding
+        anything, so the caller can tell a dead site from one without news.
+        """
+        with IN_FLIGHT.track_in_flight(operation="harvest"), ThreadPoolExecutor(max_workers=self.max_workers) as article_pool:
+            return self._harvest_source(source, article_pool, strict=True)
+    
+    def _harvest_source(self, source, article_pool, on_source_start=None, on_source_done=None, strict=False):
+        """Scrape a single source, logging instead of raising on failure unless strict"""
+        if on_source_start:
+            on_source_start(source['name'])
+        
+        try:
+            print(f"Scraping {source['name']}...")
+            articles = self._scrape_source(source, article_pool, strict)
+        except Exception as e:
+            print(f"Error scraping {source['name']}: {str(e)}")
+            if strict:
+                raise
+            articles = []
+        
+        if on_source_done:
+            on_source_done(source['name'], articles)
+        return articles
+    
+    def _scrape_source(self, source, article_pool=None, strict=False):
+        """Scrape articles from a single source through the staged extraction pipeline"""
         articles = []
+        stats = PipelineStats()
+        # URLs the pipeline reached a verdict on (returned, or rejected for good), and ones lost to errors
+        settled = set()
+        failed = set()
+        error = None
+        entries = None
         try:
-            # Build a newspaper source
-            news_source = newspaper.build(
-                source['url'], 
-                memoize_articles=False,
-                fetch_images=False,
-                headers=self.headers
-            )
+            # Each stage is lazy, so an article rejected early never pays for the later stages
+            window = self.session.max_per_host * 2
+            # Parsing and NLP run on worker processes; threads from the article pool wait for them
+            cpu_pool = article_pool if extraction_pool.enabled else None
+            cpu_window = extraction_pool.max_workers
+            entries = self._feed_entries(source)
+            urls = iter([url for url, _ in entries]) if entries is not None else self._discover(source)
+            new_item = self._new_item(source, settled, failed)
             
-            # Get all article URLs
-            for article in news_source.articles:
-                try:
-                    article_data = self._extract_article(article.url, source['name'])
-                    if article_data and self._is_fiji_related(article_data):
-                        articles.append(article_data)
-                        
-                        # Limit to avoid too many requests during development
-                        if len(articles) >= 10:  # Adjustable limit
-                            break
-                            
-                except Exception as article_e:
-                    print(f"Error extracting article {article.url}: {str(article_e)}")
+            # URLs enter the pipeline in rounds of as many as could still be used, so no
+            # article is downloaded beyond the limit and thrown away; rejected ones make room
+            while len(articles) < self.articles_per_source:
+                batch = list(itertools.islice(urls, self.articles_per_source - len(articles)))
+                if not batch:
+                    break
+                
+                items = stats.stage("discover", new_item, batch)
+                items = stats.stage("fetch", self._fetch, items, pool=article_pool, window=window)
+                items = stats.stage("parse", self._parse, items, pool=cpu_pool, window=cpu_window)
+                items = stats.stage("relevance", self._check_relevance, items)
+                items = stats.stage("length", self._check_length, items)
+                items = stats.stage("nlp", self._run_nlp, items, pool=cpu_pool, window=cpu_window)
                 
-                # Be gentle with the servers
-                time.sleep(random.uniform(0.5, 1.5))
+                for item in items:
+                    articles.append(item["record"])
+                    settled.add(item["url"])
+            
+            # Entries cut off by the limit or lost to errors are listed again next time
+            if entries is not None:
+                self.discovery.commit(source, entries, settled)
                 
         except Exception as e:
             print(f"Error in _scrape_source for {source['name']}: {str(e)}")
+            error = str(e)
+        
+        self.pipeline_stats[source['name']] = stats.counts
+        print(f"{source['name']} pipeline: {stats.describe()}")
+        
+        # Getting nothing because of errors is a failed poll, not an empty one
+        if strict and not articles and not settled:
+            if error:
+                raise SourceUnavailable(error)
+            if failed:
+                raise SourceUnavailable(f"All {len(failed)} articles of {source['name']} failed")
+            if entries is None and not stats.counts.get("discover", {}).get("in"):
+                # A crawl that found no links at all may mean the site is down
+                self._check_reachable(source)
             
         return articles
     
-    def _extract_article(self, url, source_name):
-        """Extract data from a single article"""
+    def _check_reachable(self, source):
+        """Raise SourceUnavailable if the source's homepage can't be fetched"""
         try:
-            article = Article(url)
-            article.download()
-            article.parse()
-            article.nlp()  # This will generate keywords and summary
-            
-            # Skip if article has no content
-            if not article.text or len(article.text) < 100:
+            self.session.get(source['url']).raise_for_status()
+        except Exception as e:
+            raise SourceUnavailable(f"{source['name']} is unreachable: {str(e)}")
+    
+    def _feed_entries(self, source):
+        """New (url, date) entries from the source's feed or sitemap, or None to crawl instead"""
+        try:
+            with STAGE_SECONDS.time(stage="discover_feed"):
+                return self.discovery.discover(source)
+        except Exception as e:
+            print(f"Feed discovery failed for {source['name']}: {str(e)}")
+            return None
+    
+    def _discover(self, source):
+        """Yield candidate article URLs for a source by crawling it with newspaper"""
+        # Build a newspaper source
+        with STAGE_SECONDS.time(stage="discover"):
+            news_source = newspaper.build(
+                source['url'], 
+                memoize_articles=False,
+                fetch_images=False,
+                headers=self.headers
+            )
+        
+        for article in news_source.articles:
+            yield article.url
+    
+    def _new_item(self, source, settled, failed):
+        """Return a stage function that turns discovered URLs into pipeline items"""
+        seen = set()
+        
+        def new_item(url):
+            # The same article is often linked from several category pages
+            if url in seen:
                 return None
-                
-            return {
-                "title": article.title,
-                "url": url,
-                "source": source_name,
-                "published_date": article.publish_date.strftime("%Y-%m-%d") if article.publish_date else datetime.datetime.now().strftime("%Y-%m-%d"),
-                "text": article.text,
-                "summary": article.summary,
-                "keywords": article.keywords,
-                "category": None  # Will be filled by the classifier
-            }
+            seen.add(url)
+            return {"url": url, "source": source['name'], "record": None, "settled": settled, "failed": failed}
+        
+        return new_item
+    
+    def _fetch(self, item):
+        """Download an article, or reuse the indexed record when it hasn't changed"""
+        url = item["url"]
+        try:
+            entry = self.index.get(url)
+            
+            # Recently verified entries are answered straight from the index
+            if entry and self.index.is_fresh(entry):
+                return self._from_index(item, entry)
+            
+            # Otherwise ask the server whether the page changed since we last saw it
+            headers = {}
+            if entry and entry["etag"]:
+                headers['If-None-Match'] = entry["etag"]
+            if entry and entry["last_modified"]:
+                headers['If-Modified-Since'] = entry["last_modified"]
+            
+            with IN_FLIGHT.track_in_flight(operation="download"), STAGE_SECONDS.time(stage="download"):
+                response = self.session.get(url, headers=headers)
+            DOWNLOADED_BYTES.inc(len(response.content), source=item["source"])
+            etag = response.headers.get('ETag')
+            last_modified = response.headers.get('Last-Modified')
+            
+            if entry and response.status_code == 304:
+                self.index.touch(url, etag, last_modified)
+                return self._from_index(item, entry)
+            
+            response.raise_for_status()
+            
+            # Servers without validators still let us skip unchanged bodies by hash
+            content_hash = hashlib.sha1(response.content).hexdigest()
+            if entry and entry["content_hash"] == content_hash:
+                self.index.touch(url, etag, last_modified)
+                return self._from_index(item, entry)
+            
+            item["html"] = response.text
+            item["validators"] = (content_hash, etag, last_modified)
+            ARTICLES.inc(source=item["source"], outcome="fetched")
+            return item
         except Exception as e:
-            print(f"Error in _extract_article for {url}: {str(e)}")
+            print(f"Error fetching article {url}: {str(e)}")
+            self._fail(item)
             return None
     
-    def _is_fiji_related(self, article):
-        """Check if the article is related to Fiji"""
-        fiji_keywords = ["fiji", "fijian", "suva", "nadi", "pacific island", "viti levu", "vanua levu"]
+    def _from_index(self, item, entry):
+        """Carry an indexed record through the pipeline; pages that yielded nothing are dropped"""
+        ARTICLES.inc(source=item["source"], outcome="unchanged")
+        if entry["record"] is None:
+            item["settled"].add(item["url"])
+            return None
+        item["record"] = entry["record"]
+        return item
+    
+    def _parse(self, item):
+        """Parse the downloaded HTML into a record without running NLP"""
+        if item["record"]:
+            return item
         
+        url = item["url"]
+        try:
+            with STAGE_SECONDS.time(stage="parse"):
+                parsed = extraction_pool.run(parse_html, url, item.pop("html"))
+        except Exception as e:
+            print(f"Error parsing article {url}: {str(e)}")
+            self._fail(item)
+            return None
+        
+        item["needs_nlp"] = True
+        item["record"] = {
+            "title": parsed["title"],
+            "url": url,
+            "source": item["source"],
+            "published_date": parsed["published_date"] or datetime.datetime.now().strftime("%Y-%m-%d"),
+            "text": parsed["text"],
+            "summary": "",
+            "keywords": [],
+            "category": None  # Will be filled by the classifier
+        }
+        return item
+    
+    def _check_relevance(self, item):
+        """Drop articles that are not about Fiji"""
+        if self._is_fiji_related(item["record"]):
+            return item
+        self._reject(item)
+        return None
+    
+    def _check_length(self, item):
+        """Drop articles without enough content"""
+        text = item["record"]["text"]
+        if text and len(text) >= 100:
+            return item
+        self._reject(item)
+        return None
+    
+    def _fail(self, item):
+        """Record that an article was lost to an error; it is tried again next time"""
+        ARTICLES.inc(source=item["source"], outcome="failed")
+        item["failed"].add(item["url"])
+    
+    def _reject(self, item):
+        """Record that an article was filtered out, so it isn't processed again"""
+        ARTICLES.inc(source=item["source"], outcome="rejected")
+        self._remember(item, None)
+        item["settled"].add(item["url"])
+    
+    def _run_nlp(self, item):
+        """Generate keywords and summary for articles that made it through the filters"""
+        if not item.pop("needs_nlp", False):
+            # Indexed records already carry their NLP output
+            return item
+        
+        record = item["record"]
+        if not self.per_article_nlp:
+            # Left empty for the batch summarizer, which stores its output with store_summaries
+            self._remember(item, record)
+            return item
+        
+        try:
+            with STAGE_SECONDS.time(stage="nlp"):
+                # This will generate keywords and summary
+                result = extraction_pool.run(summarize, record["title"], record["text"])
+        except Exception as e:
+            print(f"Error in NLP for {item['url']}: {str(e)}")
+            self._fail(item)
+            return None
+        
+        record["summary"] = result["summary"]
+        record["keywords"] = result["keywords"]
+        self._remember(item, record)
+        return item
+    
+    def _remember(self, item, record):
+        """Store the outcome for a freshly downloaded article in the index"""
+        validators = item.pop("validators", None)
+        if validators:
+            content_hash, etag, last_modified = validators
+            self.index.put(item["url"], content_hash, etag, last_modified, record)
+    
+    def store_summaries(self, articles):
+        """Keep batch summaries and keywords in the index, so unchanged articles aren't summarized again"""
+        self.index.update_summaries(articles)
+    
+    def _is_fiji_related(self, article):
+        """Check if the article is related to Fiji from its title and first paragraph"""
         # Check title
-        if any(keyword in article["title"].lower() for keyword in fiji_keywords):
+        if self.fiji_matcher.search(article["title"]):
             return True
-            
-        # Check text
-        if any(keyword in article["text"].lower() for keyword in fiji_keywords):
-            return True
-            
-        # Check keywords
-        if any(keyword in " ".join(article["keywords"]).lower() for keyword in fiji_keywords):
+        
+        # Check the lead; a story about Fiji says so in its first paragraph. Extracted text
+        # often opens with the headline again and a date or byline, which are skipped
+        paragraphs = (paragraph.strip() for paragraph in article["text"].split("\n"))
+        lead = next((p for p in paragraphs if len(p) >= 40 and p != article["title"].strip()), "")
+        if self.fiji_matcher.search(lead):
             return True
-            
+        
         return False 
\ No newline at end of file
@@ -0,0 +1,140 @@
+import os
+import sys
+import pickle
+import threading
+
+# Everything the app needs from NLTK and training, prepared once by `python resources.py prepare`
+ARTIFACT_PATH = 'data/prepared/resources.pkl'
+NLTK_DATA_DIR = 'data/nltk_data'
+NLTK_RESOURCES = {
+    'corpora/stopwords': 'stopwords',
+    'corpora/wordnet': 'wordnet',
+    'tokenizers/punkt': 'punkt'
+}
+
+_lock = threading.Lock()
+_artifact = None
+_nltk_ready = False
+
+def _file_signature(path):
+    """Size and modification time of a file, or None if it doesn't exist"""
+    if not os.path.exists(path):
+        return None
+    stat = os.stat(path)
+    return (stat.st_size, stat.st_mtime_ns)
+
+def use_local_nltk_data():
+    """Let NLTK find resources downloaded into the project's data directory"""
+    import nltk
+
+    path = os.path.abspath(NLTK_DATA_DIR)
+    if os.path.isdir(path) and path not in nltk.data.path:
+        nltk.data.path.insert(0, path)
+
+def ensure_nltk_data():
+    """Make sure the NLTK resources are available, downloading any that are missing"""
+    global _nltk_ready
+    if _nltk_ready:
+        return
+
+    import nltk
+
+    with _lock:
+        if _nltk_ready:
+            return
+        use_local_nltk_data()
+        for resource, package in NLTK_RESOURCES.items():
+            try:
+                nltk.data.find(resource)
+            except LookupError:
+                print(f"Downloading NLTK resource {package}...")
+                nltk.download(package, download_dir=NLTK_DATA_DIR, quiet=True)
+                use_local_nltk_data()
+        _nltk_ready = True
+
+def load_artifact():
+    """The prepared artifact, loaded once per process; empty if prepare has not been run"""
+    global _artifact
+    if _artifact is not None:
+        return _artifact
+
+    with _lock:
+        if _artifact is None:
+            artifact = {}
+            if os.path.exists(ARTIFACT_PATH):
+                try:
+                    with open(ARTIFACT_PATH, 'rb') as f:
+                        artifact = pickle.load(f)
+                except Exception as e:
+                    print(f"Ignoring unreadable prepared artifact {ARTIFACT_PATH}: {str(e)}")
+            _artifact = artifact
+    return _artifact
+
+def stop_words():
+    """English stop words, from the prepared artifact when available"""
+    words = load_artifact().get('stop_words')
+    if words is not None:
+        return words
+
+    ensure_nltk_data()
+    from nltk.corpus import stopwords
+    return frozenset(stopwords.words('english'))
+
+def lemmas():
+    """Lemmas of the words seen in the saved snapshots, so WordNet only loads for new words"""
+    return load_artifact().get('lemmas', {})
+
+def load_model(model_path):
+    """The trained classifier, preferring the artifact copy while it matches the model file"""
+    artifact = load_artifact()
+    if 'model' in artifact and artifact.get('model_signature') == _file_signature(model_path):
+        return artifact['model']
+
+    if os.path.exists(model_path):
+        with open(model_path, 'rb') as f:
+            return pickle.load(f)
+    return None
+
+def prepare(model_path='data/classifier_model.pkl', snapshot_dir='data'):
+    """Download the NLTK resources and bundle stop words, lemmas and the model into one artifact"""
+    ensure_nltk_data()
+
+    from nltk.corpus import stopwords
+    from document_model import DocumentCache
+    from snapshots import list_snapshots, load_snapshot
+
+    artifact = {'stop_words': frozenset(stopwords.words('english'))}
+
+    # Lemmatizing the vocabulary of past harvests now spares workers loading WordNet later
+    cache = DocumentCache(max_size=1)
+    for path in list_snapshots(snapshot_dir):
+        news_data = load_snapshot(path)
+        for articles in news_data.values():
+            for article in articles:
+                cache.get(article.get('title', '') + "\n" + article.get('text', ''))
+    artifact['lemmas'] = cache.lemma_table()
+
+    if os.path.exists(model_path):
+        with open(model_path, 'rb') as f:
+            artifact['model'] = pickle.load(f)
+        artifact['model_signature'] = _file_signature(model_path)
+
+    directory = os.path.dirname(ARTIFACT_PATH)
+    if not os.path.exists(directory):
+        os.makedirs(directory)
+
+    temp_path = f"{ARTIFACT_PATH}.tmp"
+    with open(temp_path, 'wb') as f:
+        pickle.dump(artifact, f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(temp_path, ARTIFACT_PATH)
+    return artifact
+
+if __name__ == '__main__':
+    # Usage: python resources.py prepare
+    if len(sys.argv) < 2 or sys.argv[1] != 'prepare':
+        print("Usage: python resources.py prepare")
+        sys.exit(1)
+
+    artifact = prepare()
+    print(f"Prepared {ARTIFACT_PATH}: {len(artifact['stop_words'])} stop words, "
+          f"{len(artifact['lemmas'])} lemmas, model {'included' if 'model' in artifact else 'not trained yet'}")
\ No newline at end of file
@@ -0,0 +1,87 @@
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+
+class ResultCache:
+    """Two-tier cache of analysis results: LRU in memory, JSON files on disk"""
+    def __init__(self, directory='data/cache', max_entries=64):
+        # Create the cache directory if it doesn't exist
+        if not os.path.exists(directory):
+            os.makedirs(directory)
+
+        self.directory = directory
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+
+        # Content hashes of snapshot files, reused while the file is unchanged
+        self._file_hashes = {}
+
+    def key(self, kind, content_hash, version):
+        """Cache key for one kind of result over some content, computed by a given code version"""
+        return hashlib.sha256(f"{kind}:{version}:{content_hash}".encode('utf-8')).hexdigest()
+
+    def get(self, key):
+        """Return the cached value, looking in memory first and then on disk"""
+        with self.lock:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+                return self.entries[key]
+
+        path = os.path.join(self.directory, f"{key}.json")
+        if not os.path.exists(path):
+            return None
+
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                value = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Ignoring unreadable cache entry {path}: {str(e)}")
+            return None
+
+        self._remember(key, value)
+        return value
+
+    def put(self, key, value):
+        """Store a JSON-serializable value in both tiers"""
+        self._remember(key, value)
+
+        # Write to a temporary file first so readers never see a partial entry
+        path = os.path.join(self.directory, f"{key}.json")
+        temp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(temp_path, 'w', encoding='utf-8') as f:
+            json.dump(value, f)
+        os.replace(temp_path, path)
+
+    def _remember(self, key, value):
+        """Add a value to the in-memory tier, evicting the least recently used entry"""
+        with self.lock:
+            self.entries[key] = value
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+
+    def file_hash(self, path):
+        """SHA-256 of a file's contents, recomputed only when its size or mtime changes"""
+        stat = os.stat(path)
+        signature = (stat.st_size, stat.st_mtime_ns)
+
+        with self.lock:
+            cached = self._file_hashes.get(path)
+        if cached and cached[0] == signature:
+            return cached[1]
+
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(1 << 20), b''):
+                digest.update(block)
+
+        with self.lock:
+            self._file_hashes[path] = (signature, digest.hexdigest())
+        return digest.hexdigest()
+
+def news_data_hash(news_data):
+    """Content hash of a categorized news payload"""
+    return hashlib.sha256(json.dumps(news_data, sort_keys=True).encode('utf-8')).hexdigest()
\ No newline at end of file
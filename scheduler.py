@@ -0,0 +1,211 @@
+import os
+import time
+import random
+import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from instrumentation import registry
+
+POLLS = registry.counter(
+    'fiji_source_polls_total', 'Scheduled source polls by outcome', ['source', 'outcome']
+)
+POLL_INTERVAL = registry.gauge(
+    'fiji_source_poll_interval_seconds', 'Current polling interval of each source', ['source']
+)
+
+def _try_lock(f):
+    """Take an exclusive lock on an open file without waiting; False if another process holds it"""
+    try:
+        if os.name == 'nt':
+            import msvcrt
+            msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            import fcntl
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except OSError:
+        return False
+
+class SourceSchedule:
+    """Polling state of a single source"""
+    def __init__(self, source, interval, next_poll):
+        self.source = source
+        self.interval = interval
+        self.next_poll = next_poll  # time.monotonic() deadline
+        self.rate = None  # Smoothed new articles per second
+        self.failures = 0
+        self.polling = False
+        self.last_poll = None  # time.monotonic() of the last finished poll
+        self.last_polled_at = None
+        self.last_new = None
+        self.last_error = None
+
+class SourceScheduler:
+    """Polls every source on its own interval, adapted to how often it publishes
+
+    After a poll that found new articles the interval moves towards the time the
+    source takes to publish target_new articles. Empty and failed polls back off
+    exponentially up to max_interval. Every delay gets random jitter so sources
+    drift apart instead of being polled in bursts.
+
+    With a lock_path, only one process at a time can run the scheduler: it holds
+    a lock on that file while running, so several server workers sharing the
+    data directory poll each source once.
+    """
+    def __init__(self, poll, sources, min_interval=120, max_interval=3600, initial_interval=600,
+                 target_new=1, backoff=2.0, smoothing=0.3, jitter=0.2, max_concurrent=2, lock_path=None):
+        # poll(source) harvests one source and returns the number of new articles
+        self.poll = poll
+        self.sources = sources
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.initial_interval = initial_interval
+        self.target_new = target_new
+        self.backoff = backoff
+        self.smoothing = smoothing
+        self.jitter = jitter
+        self.max_concurrent = max_concurrent
+        self.lock_path = lock_path
+        self.lock_file = None
+
+        self.schedules = {}
+        self.condition = threading.Condition()
+        self.thread = None
+        self.pool = None
+        self.stopped = True
+
+    def _jittered(self, interval):
+        return interval * random.uniform(1 - self.jitter, 1 + self.jitter)
+
+    def start(self):
+        """Start polling on a background thread; False if another process is already running the scheduler"""
+        with self.condition:
+            if not self.stopped:
+                return True
+            if self.lock_path and not self._lock():
+                return False
+            self.stopped = False
+
+            # First polls are staggered so the sources aren't all crawled at once
+            now = time.monotonic()
+            for source in self.sources:
+                if source['name'] not in self.schedules:
+                    self.schedules[source['name']] = SourceSchedule(
+                        source, self.initial_interval, now + random.uniform(0, self.min_interval * self.jitter)
+                    )
+                    POLL_INTERVAL.set(self.initial_interval, source=source['name'])
+
+            self.pool = ThreadPoolExecutor(max_workers=self.max_concurrent)
+            self.thread = threading.Thread(target=self._run)
+            self.thread.daemon = True
+            self.thread.start()
+            return True
+
+    def _lock(self):
+        """Take the scheduler lock file; the lock is released when the file is closed or the process exits"""
+        directory = os.path.dirname(self.lock_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        lock_file = open(self.lock_path, 'a')
+        if not _try_lock(lock_file):
+            lock_file.close()
+            return False
+        self.lock_file = lock_file
+        return True
+
+    def stop(self):
+        """Stop scheduling new polls; polls already running are allowed to finish"""
+        with self.condition:
+            if self.stopped:
+                return
+            self.stopped = True
+            self.condition.notify_all()
+        self.thread.join()
+        self.pool.shutdown(wait=False)
+        if self.lock_file is not None:
+            self.lock_file.close()
+            self.lock_file = None
+
+    @property
+    def running(self):
+        return not self.stopped
+
+    def _run(self):
+        """Start polls as they fall due, sleeping until the next deadline"""
+        with self.condition:
+            while not self.stopped:
+                now = time.monotonic()
+                waiting = [s for s in self.schedules.values() if not s.polling]
+                for schedule in waiting:
+                    if schedule.next_poll <= now:
+                        schedule.polling = True
+                        self.pool.submit(self._poll, schedule)
+
+                deadlines = [s.next_poll for s in self.schedules.values() if not s.polling]
+                timeout = max(min(deadlines) - now, 0.1) if deadlines else None
+                self.condition.wait(timeout)
+
+    def _poll(self, schedule):
+        """Poll one source and work out when to poll it next"""
+        name = schedule.source['name']
+        try:
+            new_count = self.poll(schedule.source)
+            error = None
+        except Exception as e:
+            print(f"Scheduled poll of {name} failed: {str(e)}")
+            new_count = None
+            error = str(e)
+
+        with self.condition:
+            now = time.monotonic()
+            if error is not None:
+                schedule.failures += 1
+                schedule.interval = min(schedule.interval * self.backoff, self.max_interval)
+                POLLS.inc(source=name, outcome="failed")
+            elif new_count == 0:
+                schedule.failures = 0
+                schedule.interval = min(schedule.interval * self.backoff, self.max_interval)
+                POLLS.inc(source=name, outcome="empty")
+            else:
+                schedule.failures = 0
+                # The first poll only establishes a baseline; later ones measure the publishing rate
+                if schedule.last_poll is not None:
+                    observed = new_count / max(now - schedule.last_poll, 1.0)
+                    schedule.rate = observed if schedule.rate is None else (
+                        self.smoothing * observed + (1 - self.smoothing) * schedule.rate
+                    )
+                    schedule.interval = self.target_new / schedule.rate
+                schedule.interval = min(max(schedule.interval, self.min_interval), self.max_interval)
+                POLLS.inc(source=name, outcome="new")
+
+            schedule.last_poll = now
+            schedule.last_polled_at = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            schedule.last_new = new_count
+            schedule.last_error = error
+            schedule.next_poll = now + self._jittered(schedule.interval)
+            schedule.polling = False
+            POLL_INTERVAL.set(schedule.interval, source=name)
+            self.condition.notify_all()
+
+    def status(self):
+        """Polling state of every source, for the status endpoint"""
+        with self.condition:
+            now = time.monotonic()
+            return {
+                "running": not self.stopped,
+                "sources": [
+                    {
+                        "source": name,
+                        "interval_seconds": round(s.interval),
+                        "next_poll_in_seconds": None if s.polling else max(round(s.next_poll - now), 0),
+                        "polling": s.polling,
+                        "new_articles_per_hour": None if s.rate is None else round(s.rate * 3600, 2),
+                        "failures": s.failures,
+                        "last_polled_at": s.last_polled_at,
+                        "last_new": s.last_new,
+                        "last_error": s.last_error
+                    }
+                    for name, s in self.schedules.items()
+                ]
+            }
\ No newline at end of file
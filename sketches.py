@@ -0,0 +1,152 @@
+import math
+import heapq
+import hashlib
+from collections import Counter
+import numpy as np
+
+class CountMinSketch:
+    """Approximate item counts in fixed memory
+
+    Estimates never undercount, and overcount by more than epsilon * total
+    with probability at most delta. Sketches with the same shape can be merged.
+    """
+    def __init__(self, epsilon=0.001, delta=0.01):
+        self.width = int(math.ceil(math.e / epsilon))
+        self.depth = int(math.ceil(math.log(1 / delta)))
+        self.table = np.zeros((self.depth, self.width), dtype=np.int64)
+        self.total = 0
+
+    def indices(self, items):
+        """Column of every item in every row, as a depth x len(items) array"""
+        hashes = np.fromiter(
+            (int.from_bytes(hashlib.blake2b(item.encode('utf-8'), digest_size=8).digest(), 'little') for item in items),
+            dtype=np.uint64, count=len(items)
+        )
+        # Double hashing derives one independent-enough hash per row from a single digest
+        first = hashes & np.uint64(0xFFFFFFFF)
+        second = (hashes >> np.uint64(32)) | np.uint64(1)
+        rows = np.arange(self.depth, dtype=np.uint64)[:, None]
+        return ((first + rows * second) % np.uint64(self.width)).astype(np.int64)
+
+    def add(self, items, counts, indices=None):
+        """Add counts for a batch of items"""
+        if not items:
+            return
+        if indices is None:
+            indices = self.indices(items)
+        counts = np.asarray(counts, dtype=np.int64)
+        for row in range(self.depth):
+            np.add.at(self.table[row], indices[row], counts)
+        self.total += int(counts.sum())
+
+    def estimate(self, items, indices=None):
+        """Estimated counts for a batch of items"""
+        if not items:
+            return np.zeros(0, dtype=np.int64)
+        if indices is None:
+            indices = self.indices(items)
+        return self.table[np.arange(self.depth)[:, None], indices].min(axis=0)
+
+    def merge(self, other):
+        """Add another sketch of the same shape into this one"""
+        if self.table.shape != other.table.shape:
+            raise ValueError("Cannot merge count-min sketches of different sizes")
+        self.table += other.table
+        self.total += other.total
+
+class TopK:
+    """Keeps the k items with the highest estimates from a count-min sketch"""
+    def __init__(self, k, sketch):
+        self.k = k
+        self.sketch = sketch
+        self.candidates = {}
+        self.threshold = 0  # Smallest estimate kept by the last prune
+
+    def offer(self, items, estimates):
+        """Consider items with their current estimates"""
+        for item, estimate in zip(items, estimates):
+            if item in self.candidates or len(self.candidates) < self.k or estimate > self.threshold:
+                self.candidates[item] = int(estimate)
+
+        # Pruning only when the candidate set doubles keeps the amortized cost low
+        if len(self.candidates) > 2 * self.k:
+            self._prune()
+
+    def _prune(self):
+        """Drop everything outside the current top k"""
+        top = heapq.nlargest(self.k, self.candidates.items(), key=lambda item: item[1])
+        self.candidates = dict(top)
+        self.threshold = top[-1][1] if top else 0
+
+    def items(self):
+        """Top items with refreshed estimates, highest first"""
+        candidates = list(self.candidates)
+        estimates = self.sketch.estimate(candidates)
+        ranked = sorted(zip(candidates, estimates.tolist()), key=lambda item: (-item[1], item[0]))
+        return ranked[:self.k]
+
+    def merge(self, other):
+        """Merge candidates from another tracker whose sketch was merged into ours"""
+        self.candidates.update(other.candidates)
+        candidates = list(self.candidates)
+        self.candidates = dict(zip(candidates, self.sketch.estimate(candidates).tolist()))
+        if len(self.candidates) > self.k:
+            self._prune()
+
+class StreamingPhraseCounter:
+    """Mergeable topic and phrase counts fed one document at a time
+
+    Topics are the most frequent terms, tracked in bounded memory by a sketch;
+    rankings match exact counting as long as at most top_k distinct terms compete
+    for the top places, up to the sketch error. Phrases are ranked by PMI, which
+    favours pairs of rare words that no frequency sketch keeps, so words and
+    pairs are also counted exactly; that costs no more than the tokens of the
+    documents, which the document cache already holds.
+    """
+    def __init__(self, epsilon=0.001, delta=0.01, top_k=2000, min_topic_length=4):
+        self.min_topic_length = min_topic_length
+        self.unigrams = CountMinSketch(epsilon, delta)
+        self.top_terms = TopK(top_k, self.unigrams)
+        self.word_counts = Counter()
+        self.pair_counts = Counter()
+
+    def add_document(self, tokens):
+        """Count the terms and adjacent pairs of one document's tokens"""
+        terms = Counter(tokens)
+        self.word_counts.update(terms)
+        self.pair_counts.update(zip(tokens, tokens[1:]))
+
+        items = list(terms)
+        if not items:
+            return
+        indices = self.unigrams.indices(items)
+        self.unigrams.add(items, [terms[item] for item in items], indices)
+        estimates = self.unigrams.estimate(items, indices)
+        eligible = [len(item) >= self.min_topic_length for item in items]
+        self.top_terms.offer(
+            [item for item, keep in zip(items, eligible) if keep],
+            [estimate for estimate, keep in zip(estimates, eligible) if keep]
+        )
+
+    def merge(self, other):
+        """Fold another counter built with the same settings into this one"""
+        self.unigrams.merge(other.unigrams)
+        self.top_terms.merge(other.top_terms)
+        self.word_counts.update(other.word_counts)
+        self.pair_counts.update(other.pair_counts)
+
+    def top_topics(self, num_topics=5):
+        """Most frequent terms"""
+        return [term for term, _ in self.top_terms.items()[:num_topics]]
+
+    def top_phrases(self, num_phrases=5, min_freq=3):
+        """Frequent bigrams ranked by PMI, as NLTK's BigramCollocationFinder would"""
+        total_words = self.unigrams.total
+
+        # PMI = log2(n(w1,w2) * N) - log2(n(w1) * n(w2))
+        scored = [
+            ((first, second), math.log2(count * total_words) - math.log2(self.word_counts[first] * self.word_counts[second]))
+            for (first, second), count in self.pair_counts.items() if count >= min_freq
+        ]
+        scored.sort(key=lambda item: (-item[1], item[0]))
+        return [" ".join(pair) for pair, _ in scored[:num_phrases]]
\ No newline at end of file
@@ -0,0 +1,152 @@
+import os
+import re
+import glob
+import gzip
+import json
+import threading
+from collections import OrderedDict
+
+# Short article fields copied into the index, enough for the article lists without reading any bodies
+INDEX_FIELDS = ['url', 'title', 'source', 'published_date', 'category', 'story_id', 'duplicate_of']
+
+# Articles compressed together in one gzip member; larger blocks compress better but cost more to read one article
+BLOCK_SIZE = 64
+
+SNAPSHOT_NAME = re.compile(r'^fiji_news_\d{8}_\d{6}\.(json|jsonl\.gz)$')
+
+_index_lock = threading.Lock()
+_index_cache = OrderedDict()  # path -> (modification time, index), most recently used last
+
+def is_snapshot(filename):
+    """Check whether a file name is a news snapshot, old (.json) or compact (.jsonl.gz)"""
+    return bool(SNAPSHOT_NAME.match(filename))
+
+def list_snapshots(directory='data'):
+    """Paths of every snapshot in a directory, oldest first"""
+    return sorted(
+        path for path in glob.glob(os.path.join(directory, 'fiji_news_*'))
+        if is_snapshot(os.path.basename(path))
+    )
+
+def index_path(path):
+    return path[:-len('.jsonl.gz')] + '.idx'
+
+def save_snapshot(path, news_data):
+    """Write categorized news as gzip JSON Lines plus a gzip index of short fields and byte offsets
+
+    Every BLOCK_SIZE articles form one gzip member, so the file as a whole is
+    ordinary JSON Lines to gzip tools while one article can be read by seeking
+    to its block and decompressing only that.
+    """
+    entries = []
+    block = []
+    temp_path = f"{path}.tmp"
+
+    def write_block(f):
+        offset = f.tell()
+        f.write(gzip.compress(''.join(block).encode('utf-8'), mtime=0))
+        for entry in entries[-len(block):]:
+            entry["offset"] = offset
+            entry["length"] = f.tell() - offset
+        block.clear()
+
+    with open(temp_path, 'wb') as f:
+        for category, articles in news_data.items():
+            for article in articles:
+                entry = {field: article[field] for field in INDEX_FIELDS if field in article}
+                entry["category"] = category
+                entry["line"] = len(block)
+                entries.append(entry)
+                block.append(json.dumps(dict(article, category=article.get("category") or category), ensure_ascii=False) + "\n")
+                if len(block) == BLOCK_SIZE:
+                    write_block(f)
+        if block:
+            write_block(f)
+
+    index = {"version": 2, "categories": list(news_data), "articles": entries}
+    with gzip.open(f"{index_path(path)}.tmp", 'wt', encoding='utf-8') as f:
+        json.dump(index, f, ensure_ascii=False, separators=(',', ':'))
+
+    # The index goes last, so a reader never sees one without its data
+    os.replace(temp_path, path)
+    os.replace(f"{index_path(path)}.tmp", index_path(path))
+
+def _read_index(path):
+    """The index of a compact snapshot, cached while the file is unchanged; None if it has none"""
+    location = index_path(path)
+    if not os.path.exists(location):
+        return None
+
+    mtime = os.stat(location).st_mtime_ns
+    with _index_lock:
+        cached = _index_cache.get(path)
+        if cached and cached[0] == mtime:
+            _index_cache.move_to_end(path)
+            return cached[1]
+
+    with gzip.open(location, 'rt', encoding='utf-8') as f:
+        index = json.load(f)
+
+    with _index_lock:
+        _index_cache[path] = (mtime, index)
+        if len(_index_cache) > 16:
+            _index_cache.popitem(last=False)
+    return index
+
+def _read_all(path):
+    """Every article of a snapshot in file order, with the category names"""
+    if path.endswith('.json'):
+        with open(path, 'r', encoding='utf-8') as f:
+            news_data = json.load(f)
+        articles = [
+            dict(article, category=article.get("category") or category)
+            for category, category_articles in news_data.items() for article in category_articles
+        ]
+        return list(news_data), articles
+
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        articles = [json.loads(line) for line in f if line.strip()]
+    index = _read_index(path)
+    categories = index["categories"] if index else list(OrderedDict.fromkeys(a["category"] for a in articles))
+    return categories, articles
+
+def load_snapshot(path, fields=None):
+    """Categorized news from a snapshot, optionally with only some fields of each article
+
+    With fields, every article also gets its position in the snapshot, which
+    read_article() takes to fetch the rest. Fields that are all in the index are
+    answered without decompressing any article.
+    """
+    index = _read_index(path) if path.endswith('.jsonl.gz') else None
+    if fields and index is not None and set(fields) <= set(INDEX_FIELDS):
+        categories, articles = index["categories"], index["articles"]
+    else:
+        categories, articles = _read_all(path)
+
+    news_data = {category: [] for category in categories}
+    for position, article in enumerate(articles):
+        category = article.get("category") or "others"
+        if fields:
+            article = {field: article[field] for field in fields if field in article}
+            article["position"] = position
+        news_data.setdefault(category, []).append(article)
+    return news_data
+
+def read_article(path, position):
+    """A single article of a snapshot by its position, reading only that article when indexed"""
+    index = _read_index(path) if path.endswith('.jsonl.gz') else None
+    if index is not None:
+        entries = index["articles"]
+        if not 0 <= position < len(entries):
+            raise IndexError(f"No article {position} in {os.path.basename(path)}")
+        entry = entries[position]
+        with open(path, 'rb') as f:
+            f.seek(entry["offset"])
+            member = f.read(entry["length"])
+        lines = gzip.decompress(member).decode('utf-8').splitlines()
+        return json.loads(lines[entry["line"]])
+
+    _, articles = _read_all(path)
+    if not 0 <= position < len(articles):
+        raise IndexError(f"No article {position} in {os.path.basename(path)}")
+    return articles[position]
\ No newline at end of file
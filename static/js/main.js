@@ -2,9 +2,15 @@
 
 // Global state
 let currentNewsData = null;
+let currentSnapshot = null;  // File name of the saved snapshot currently shown, if any
+let currentJobId = null;  // Harvest job whose articles are shown, until its snapshot is saved
 let currentSummary = null;
 let categoryChart = null;
 let sourceChart = null;
+let searchCursor = null;  // Cursor of the next page of search results
+
+// Article fields requested when loading a snapshot for the article lists
+const LIST_FIELDS = ['url', 'title', 'source', 'published_date', 'category'];
 
 // DOM elements
 const harvestNewsBtn = document.getElementById('harvestNewsBtn');
@@ -19,6 +25,10 @@ const summaryContent = document.getElementById('summaryContent');
 const analysisContent = document.getElementById('analysisContent');
 const audioPlayerContainer = document.getElementById('audioPlayerContainer');
 const audioPlayer = document.getElementById('audioPlayer');
+const searchForm = document.getElementById('searchForm');
+const searchSourceSelect = document.getElementById('searchSource');
+const searchResultsList = document.getElementById('searchResultsList');
+const searchMoreBtn = document.getElementById('searchMoreBtn');
 
 // Initialize the application
 document.addEventListener('DOMContentLoaded', function() {
@@ -134,6 +144,17 @@ function attachEventListeners() {
         }
     });
 
+    // Search the article archive
+    searchForm.addEventListener('submit', function(e) {
+        e.preventDefault();
+        searchArchive(false);
+    });
+
+    // Next page of search results
+    searchMoreBtn.addEventListener('click', function() {
+        searchArchive(true);
+    });
+
     // Article click handler - delegate to parent
     document.addEventListener('click', function(e) {
         if (e.target.closest('.news-item')) {
@@ -215,15 +236,9 @@ function harvestNews() {
     .then(data => {
         hideLoading();
         
-        if (data.status === 'success') {
-            addStatusMessage(`Successfully harvested ${data.message}`);
-            currentNewsData = data.data;
-            displayNewsData(currentNewsData);
-            loadNewsFiles();  // Refresh the file list
-            
-            // Enable buttons
-            generateSummaryBtn.disabled = false;
-            analyzeTrendsBtn.disabled = false;
+        if (data.status === 'accepted') {
+            addStatusMessage(data.message);
+            followHarvestJob(data.job_id);
         } else {
             addStatusMessage('Error harvesting news: ' + data.message, 'error');
         }
@@ -235,6 +250,62 @@ function harvestNews() {
     });
 }
 
+// Render a background harvest as its articles arrive
+function followHarvestJob(jobId) {
+    harvestNewsBtn.disabled = true;
+    currentSnapshot = null;
+    currentJobId = jobId;
+    currentNewsData = {politics: [], community: [], sports: [], crime: [], others: []};
+    displayNewsData(currentNewsData);
+    
+    const events = new EventSource(`/harvest_jobs/${jobId}/events`);
+    
+    events.addEventListener('source_started', function(e) {
+        const data = JSON.parse(e.data);
+        addStatusMessage(`Scraping ${data.source}...`);
+    });
+    
+    events.addEventListener('article', function(e) {
+        const article = JSON.parse(e.data);
+        if (!currentNewsData[article.category]) {
+            currentNewsData[article.category] = [];
+        }
+        currentNewsData[article.category].push(article);
+    });
+    
+    events.addEventListener('threat_alert', function(e) {
+        const alert = JSON.parse(e.data);
+        addStatusMessage(`Threat alert: ${alert.count} articles mention "${alert.keyword}" (${alert.source}, ${alert.day}); about ${alert.expected} expected`, 'error');
+    });
+    
+    events.addEventListener('source_finished', function(e) {
+        const data = JSON.parse(e.data);
+        addStatusMessage(`Finished ${data.source}: ${data.count} articles`);
+        displayNewsData(currentNewsData);
+        
+        // Enable buttons
+        generateSummaryBtn.disabled = false;
+        analyzeTrendsBtn.disabled = false;
+    });
+    
+    events.addEventListener('complete', function(e) {
+        const data = JSON.parse(e.data);
+        events.close();
+        harvestNewsBtn.disabled = false;
+        addStatusMessage(`Successfully harvested ${data.message}`);
+        currentSnapshot = data.filename;
+        displayNewsData(currentNewsData);
+        loadNewsFiles();  // Refresh the file list
+    });
+    
+    events.addEventListener('failed', function(e) {
+        const data = JSON.parse(e.data);
+        events.close();
+        harvestNewsBtn.disabled = false;
+        addStatusMessage('Error harvesting news: ' + data.message, 'error');
+    });
+}
+
 // Load news from a file
 function loadNews(filename) {
     showLoading();
@@ -245,7 +316,8 @@ function loadNews(filename) {
         headers: {
             'Content-Type': 'application/json'
         },
-        body: JSON.stringify({ filename: filename })
+        // Only the fields the article lists show; article bodies are fetched when opened
+        body: JSON.stringify({ filename: filename, fields: LIST_FIELDS })
     })
     .then(response => response.json())
     .then(data => {
@@ -254,6 +326,8 @@ function loadNews(filename) {
         if (data.status === 'success') {
             addStatusMessage(`Successfully loaded news file: ${filename}`);
             currentNewsData = data.data;
+            currentSnapshot = filename;
+            currentJobId = null;
             displayNewsData(currentNewsData);
             
             // Enable buttons
@@ -325,7 +399,7 @@ function displayNewsData(newsData) {
                         </div>
                     </div>
                     <h5 class="news-title">${article.title}</h5>
-                    <p class="news-summary">${article.summary}</p>
+                    ${article.summary ? `<p class="news-summary">${article.summary}</p>` : ''}
                 </div>
             `).join('');
         }
@@ -364,6 +438,108 @@ function updateSourceChart(labels, data) {
     sourceChart.update();
 }
 
+// Search stored articles; with more=true the next page is appended to the current results
+function searchArchive(more) {
+    const params = new URLSearchParams();
+    const filters = {
+        q: document.getElementById('searchQuery').value.trim(),
+        source: searchSourceSelect.value,
+        category: document.getElementById('searchCategory').value,
+        since: document.getElementById('searchSince').value,
+        until: document.getElementById('searchUntil').value
+    };
+    for (const name in filters) {
+        if (filters[name]) {
+            params.set(name, filters[name]);
+        }
+    }
+    if (more) {
+        // Facets are the same for every page of a search
+        params.set('cursor', searchCursor);
+        params.set('facets', '0');
+    }
+    
+    searchMoreBtn.disabled = true;
+    fetch('/search?' + params.toString())
+        .then(response => response.json())
+        .then(data => {
+            searchMoreBtn.disabled = false;
+            
+            if (data.status === 'success') {
+                displaySearchResults(data, more);
+            } else {
+                addStatusMessage('Error searching articles: ' + data.message, 'error');
+            }
+        })
+        .catch(error => {
+            searchMoreBtn.disabled = false;
+            console.error('Error searching articles:', error);
+            addStatusMessage('Error searching articles: ' + error.message, 'error');
+        });
+}
+
+// Show a page of search results and, for a new search, its facet counts in the charts
+function displaySearchResults(data, append) {
+    searchCursor = data.next_cursor;
+    searchMoreBtn.classList.toggle('d-none', !searchCursor);
+    
+    const items = data.articles.map(article => `
+        <div class="news-item" data-article='${JSON.stringify(article)}'>
+            <div class="d-flex justify-content-between align-items-start">
+                <span class="category-badge category-${article.category}">${article.category}</span>
+                <div>
+                    <span class="news-source">${article.source}</span>
+                    <span class="news-date ms-2">${article.published_date}</span>
+                </div>
+            </div>
+            <h5 class="news-title">${article.title}</h5>
+            <p class="news-summary">${article.snippet ? highlightSnippet(article.snippet) : article.summary}</p>
+        </div>
+    `).join('');
+    
+    if (append) {
+        searchResultsList.insertAdjacentHTML('beforeend', items);
+        return;
+    }
+    
+    document.getElementById('searchSummary').textContent = `${data.total} matching articles`;
+    searchResultsList.innerHTML = items || '<div class="placeholder-text">No articles match this search.</div>';
+    
+    // Offer every source seen in the archive as a filter
+    Object.keys(data.facets.source).forEach(source => {
+        if (![...searchSourceSelect.options].some(option => option.value === source)) {
+            const option = document.createElement('option');
+            option.value = source;
+            option.textContent = source;
+            searchSourceSelect.appendChild(option);
+        }
+    });
+    
+    const categories = Object.entries(data.facets.category);
+    updateCategoryChart(
+        categories.map(item => item[0].charAt(0).toUpperCase() + item[0].slice(1)),
+        categories.map(item => item[1])
+    );
+    const sources = Object.entries(data.facets.source).slice(0, 5);
+    updateSourceChart(sources.map(item => item[0]), sources.map(item => item[1]));
+}
+
+// Escape a search snippet, keeping only the <mark> tags around matched terms
+function highlightSnippet(snippet) {
+    const div = document.createElement('div');
+    div.textContent = snippet;
+    return div.innerHTML.replace(/&lt;(\/?)mark&gt;/g, '<$1mark>');
+}
+
+// Identify the current news for the server: a saved snapshot by name, a running harvest by its job,
+// otherwise the articles themselves
+function newsRequestBody() {
+    if (currentSnapshot) {
+        return JSON.stringify({ snapshot: currentSnapshot });
+    }
+    return JSON.stringify(currentJobId ? { harvest_job: currentJobId } : { news_data: currentNewsData });
+}
+
 // Generate a summary of the news
 function generateSummary() {
     showLoading();
@@ -374,7 +550,7 @@ function generateSummary() {
         headers: {
             'Content-Type': 'application/json'
         },
-        body: JSON.stringify({ news_data: currentNewsData })
+        body: newsRequestBody()
     })
     .then(response => response.json())
     .then(data => {
@@ -408,7 +584,7 @@ function analyzeTrends() {
         headers: {
             'Content-Type': 'application/json'
         },
-        body: JSON.stringify({ news_data: currentNewsData })
+        body: newsRequestBody()
     })
     .then(response => response.json())
     .then(data => {
@@ -486,7 +662,6 @@ function displayAnalysis(analysis) {
 
 // Convert summary to speech
 function convertToSpeech(text) {
-    showLoading();
     addStatusMessage('Converting summary to speech...');
     
     fetch('/text_to_speech', {
@@ -494,23 +669,81 @@ function convertToSpeech(text) {
         headers: {
             'Content-Type': 'application/json'
         },
-        body: JSON.stringify({ text: text })
+        body: JSON.stringify({ text: text, stream: true })
     })
     .then(response => response.json())
     .then(data => {
-        hideLoading();
-        
         if (data.status === 'success') {
+            // Playback starts with the first sentence while the rest is still being synthesized
+            audioPlayer.onerror = function() {
+                audioPlayer.onerror = null;
+                addStatusMessage('Streaming speech failed, converting in the background instead...');
+                convertToSpeechInBackground(text);
+            };
+            audioPlayer.src = data.audio_url;
+            audioPlayerContainer.classList.remove('d-none');
+            audioPlayer.play();
+            addStatusMessage('Speech playback started.');
+        } else {
+            addStatusMessage('Error converting to speech: ' + data.message, 'error');
+        }
+    })
+    .catch(error => {
+        console.error('Error converting to speech:', error);
+        addStatusMessage('Error converting to speech: ' + error.message, 'error');
+    });
+}
+
+// Convert summary to speech as a background job (also covers the offline engine)
+function convertToSpeechInBackground(text) {
+    showLoading();
+    
+    fetch('/text_to_speech', {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json'
+        },
+        body: JSON.stringify({ text: text, async: true })
+    })
+    .then(response => response.json())
+    .then(data => {
+        if (data.status === 'accepted') {
+            pollSpeechJob(data.job_id);
+        } else {
+            hideLoading();
+            addStatusMessage('Error converting to speech: ' + data.message, 'error');
+        }
+    })
+    .catch(error => {
+        hideLoading();
+        console.error('Error converting to speech:', error);
+        addStatusMessage('Error converting to speech: ' + error.message, 'error');
+    });
+}
+
+// Poll a background speech job until its audio is ready
+function pollSpeechJob(jobId) {
+    fetch(`/speech_jobs/${jobId}`)
+    .then(response => response.json())
+    .then(data => {
+        if (data.status !== 'success') {
+            hideLoading();
+            addStatusMessage('Error converting to speech: ' + data.message, 'error');
+        } else if (data.job.status === 'running') {
+            setTimeout(() => pollSpeechJob(jobId), 1000);
+        } else if (data.job.status === 'done') {
+            hideLoading();
             addStatusMessage('Speech conversion completed successfully.');
             
             // Set the audio source and show the player
-            audioPlayer.src = `/audio/${data.audio_file.split('/').pop()}`;
+            audioPlayer.src = `/audio/${data.job.audio_file.split('/').pop()}`;
             audioPlayerContainer.classList.remove('d-none');
             
             // Play the audio
             audioPlayer.play();
         } else {
-            addStatusMessage('Error converting to speech: ' + data.message, 'error');
+            hideLoading();
+            addStatusMessage('Error converting to speech: ' + data.job.error, 'error');
         }
     })
     .catch(error => {
@@ -522,6 +755,33 @@ function convertToSpeech(text) {
 
 // Show article modal
 function showArticleModal(article) {
+    // Articles from a snapshot or a harvest carry only the list fields; fetch the rest first
+    let articleUrl = null;
+    if (article.text === undefined && article.position !== undefined && currentSnapshot) {
+        articleUrl = `/snapshots/${encodeURIComponent(currentSnapshot)}/articles/${article.position}`;
+    } else if (article.text === undefined && article.job_position !== undefined && currentJobId) {
+        articleUrl = `/harvest_jobs/${currentJobId}/articles/${article.job_position}`;
+    }
+    if (articleUrl) {
+        fetch(articleUrl)
+        .then(response => response.json())
+        .then(data => {
+            if (data.status === 'success') {
+                renderArticleModal(data.article);
+            } else {
+                addStatusMessage('Error loading article: ' + data.message, 'error');
+            }
+        })
+        .catch(error => {
+            console.error('Error loading article:', error);
+            addStatusMessage('Error loading article: ' + error.message, 'error');
+        });
+        return;
+    }
+    renderArticleModal(article);
+}
+
+function renderArticleModal(article) {
     document.getElementById('articleModalLabel').textContent = article.title;
     
     let modalContent = `
@@ -531,10 +791,10 @@ function showArticleModal(article) {
             <span class="badge bg-primary ms-2">${article.category}</span>
         </div>
         <div class="article-text mb-4">
-            ${article.text.replace(/\n/g, '<br>')}
+            ${(article.text || article.summary || '').replace(/\n/g, '<br>')}
         </div>
         <div class="article-keywords">
-            <strong>Keywords:</strong> ${article.keywords.join(', ')}
+            <strong>Keywords:</strong> ${(article.keywords || []).join(', ')}
         </div>
     `;
     
@@ -0,0 +1,8 @@
+import os
+import sys
+
+# The modules live at the top of the repository rather than in a package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Parsing and tokenization run in-process unless a test starts its own pool
+os.environ.setdefault('FIJI_NEWS_PROCESSES', '0')
\ No newline at end of file
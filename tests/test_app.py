@@ -0,0 +1,101 @@
+import os
+import pytest
+from scheduler import SourceScheduler
+from text_to_speech import TextToSpeech
+
+class LocalSynthesizer:
+    """Stand-in for gTTS that returns the text itself as audio"""
+    name = 'local'
+    extension = 'mp3'
+    concatenable = True
+    voice = 'en'
+    rate = 'normal'
+
+    def __init__(self):
+        self.calls = 0
+
+    def synthesize(self, text):
+        self.calls += 1
+        return f"[{text}]".encode('utf-8')
+
+@pytest.fixture
+def app_module(tmp_path, monkeypatch):
+    # The app keeps its data in data/ of the working directory
+    monkeypatch.chdir(tmp_path)
+    import app
+    os.makedirs("data", exist_ok=True)
+    monkeypatch.setattr(app, "text_to_speech", TextToSpeech(LocalSynthesizer(), chunk_chars=40))
+    return app
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
+
+def write_audio(name, data):
+    with open(os.path.join("data", name), "wb") as f:
+        f.write(data)
+
+def test_audio_is_served_in_ranges(client):
+    write_audio("audio_test.mp3", bytes(range(100)))
+
+    response = client.get("/audio/audio_test.mp3", headers={"Range": "bytes=10-19"})
+    assert response.status_code == 206
+    assert response.data == bytes(range(10, 20))
+    assert response.headers["Content-Range"] == "bytes 10-19/100"
+    assert response.mimetype == "audio/mpeg"
+
+def test_replays_are_conditional_requests(client):
+    write_audio("audio_test.mp3", b"ID3" + bytes(50))
+
+    first = client.get("/audio/audio_test.mp3")
+    assert first.status_code == 200
+    etag = first.headers["ETag"]
+
+    replay = client.get("/audio/audio_test.mp3", headers={"If-None-Match": etag})
+    assert replay.status_code == 304
+    assert replay.data == b""
+
+def test_wav_data_is_labelled_as_wav(client):
+    write_audio("audio_old.mp3", b"RIFF" + bytes(40))
+    assert client.get("/audio/audio_old.mp3").mimetype == "audio/wav"
+
+def test_only_audio_files_are_served(client):
+    write_audio("articles.db", b"")
+    assert client.get("/audio/articles.db").status_code == 404
+    assert client.get("/audio/audio_missing.mp3").status_code == 404
+
+def test_streamed_audio_arrives_chunk_by_chunk_then_replays_from_the_file(client, app_module):
+    text = "Heavy rain is expected in the west. Roads near Ba may flood overnight."
+    response = client.post("/text_to_speech", json={"text": text, "stream": True})
+    audio_url = response.get_json()["audio_url"]
+
+    streamed = client.get(audio_url)
+    assert streamed.status_code == 200
+    assert streamed.mimetype == "audio/mpeg"
+    assert streamed.data == b"[Heavy rain is expected in the west.][Roads near Ba may flood overnight.]"
+
+    calls = app_module.text_to_speech.online_backend.calls
+    replay = client.get(audio_url)
+    assert replay.status_code == 302
+    assert client.get(replay.headers["Location"]).data == streamed.data
+    assert app_module.text_to_speech.online_backend.calls == calls
+
+def test_unknown_stream(client):
+    assert client.get("/audio_stream/missing").status_code == 404
+
+def test_metrics_report_request_latency(client):
+    client.get("/audio/audio_missing.mp3")
+    response = client.get("/metrics")
+    assert response.mimetype == "text/plain"
+    assert 'fiji_http_request_seconds_count{endpoint="/audio/<filename>",method="GET",status="404"}' in response.get_data(as_text=True)
+
+def test_scheduler_runs_in_one_server_process(client):
+    # Another worker of the same server already holds the scheduler lock
+    other = SourceScheduler(lambda source: 0, [], lock_path="data/scheduler.lock")
+    assert other.start()
+    try:
+        response = client.post("/scheduler", json={"action": "start"})
+        assert response.status_code == 409
+        assert client.get("/scheduler").get_json()["scheduler"]["running"] is False
+    finally:
+        other.stop()
\ No newline at end of file
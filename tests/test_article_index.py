@@ -0,0 +1,61 @@
+import time
+import pytest
+from article_index import ArticleIndex
+
+@pytest.fixture
+def index(tmp_path):
+    index = ArticleIndex(str(tmp_path / "data" / "article_index.db"))
+    yield index
+    index.close()
+
+def test_unknown_url_has_no_entry(index):
+    assert index.get("https://example.com/missing") is None
+
+def test_put_and_get_round_trip(index):
+    record = {"title": "Suva market reopens", "url": "https://example.com/a", "keywords": []}
+    index.put("https://example.com/a", "abc", '"v1"', "Mon, 01 Jan 2024 00:00:00 GMT", record)
+
+    entry = index.get("https://example.com/a")
+    assert entry["content_hash"] == "abc"
+    assert entry["etag"] == '"v1"'
+    assert entry["last_modified"] == "Mon, 01 Jan 2024 00:00:00 GMT"
+    assert entry["record"] == record
+    assert index.is_fresh(entry)
+
+def test_pages_without_an_article_are_remembered(index):
+    index.put("https://example.com/about", "abc", None, None, None)
+    entry = index.get("https://example.com/about")
+    assert entry is not None
+    assert entry["record"] is None
+
+def test_entries_go_stale_after_recheck_interval(tmp_path):
+    index = ArticleIndex(str(tmp_path / "article_index.db"), recheck_after=0.05)
+    index.put("https://example.com/a", "abc", None, None, {"title": "A"})
+    assert index.is_fresh(index.get("https://example.com/a"))
+    time.sleep(0.06)
+    assert not index.is_fresh(index.get("https://example.com/a"))
+    index.close()
+
+def test_touch_refreshes_checked_time_and_keeps_missing_validators(index):
+    index.put("https://example.com/a", "abc", '"v1"', "Mon, 01 Jan 2024 00:00:00 GMT", {"title": "A"})
+    before = index.get("https://example.com/a")["checked_at"]
+
+    index.touch("https://example.com/a", etag='"v2"')
+    entry = index.get("https://example.com/a")
+    assert entry["checked_at"] >= before
+    assert entry["etag"] == '"v2"'
+    assert entry["last_modified"] == "Mon, 01 Jan 2024 00:00:00 GMT"
+
+def test_update_summaries_fills_stored_records(index):
+    index.put("https://example.com/a", "abc", None, None, {"title": "A", "summary": "", "keywords": []})
+    index.put("https://example.com/b", "def", None, None, None)
+
+    index.update_summaries([
+        {"url": "https://example.com/a", "summary": "Short summary.", "keywords": ["suva", "market"]},
+        {"url": "https://example.com/b", "summary": "Ignored.", "keywords": ["ignored"]}
+    ])
+
+    assert index.get("https://example.com/a")["record"] == {
+        "title": "A", "summary": "Short summary.", "keywords": ["suva", "market"]
+    }
+    assert index.get("https://example.com/b")["record"] is None
\ No newline at end of file
@@ -0,0 +1,149 @@
+import pytest
+from article_store import ArticleStore
+from snapshots import save_snapshot
+
+@pytest.fixture
+def store(tmp_path):
+    store = ArticleStore(str(tmp_path / "articles.db"))
+    yield store
+    store.close()
+
+def make_article(i, **fields):
+    article = {
+        "url": f"https://news.test/{i}",
+        "title": f"Story {i}",
+        "source": "Fiji Sun" if i % 2 else "Fiji Times",
+        "category": "Politics",
+        # Several articles share each date, so paging has to break ties by id
+        "published_date": f"2025-01-{1 + i % 5:02d}",
+        "text": f"Parliament sat in Suva for story {i}.",
+        "summary": "",
+        "keywords": []
+    }
+    article.update(fields)
+    return article
+
+def test_save_counts_new_articles_and_updates_existing(store):
+    assert store.save([make_article(i) for i in range(3)]) == 3
+    assert store.save([make_article(2, title="Story 2, updated"), make_article(3)]) == 1
+    assert store.get("https://news.test/2")["title"] == "Story 2, updated"
+    assert store.get("https://news.test/missing") is None
+
+def test_import_snapshot_uses_its_timestamp(store, tmp_path):
+    path = str(tmp_path / "fiji_news_20250102_030405.jsonl.gz")
+    save_snapshot(path, {"Politics": [make_article(1)], "Sports": [make_article(2, category=None)]})
+
+    assert store.import_snapshot(path) == 2
+    article = store.get("https://news.test/2")
+    assert article["category"] == "Sports"
+    assert article["harvested_at"] == "2025-01-02 03:04:05"
+
+def test_query_pages_newest_first_with_total(store):
+    store.save([make_article(i) for i in range(12)])
+
+    first = store.query(limit=5, fields=["url", "published_date"])
+    second = store.query(limit=5, offset=5, fields=["url", "published_date"])
+    assert first["total"] == second["total"] == 12
+    dates = [article["published_date"] for article in first["articles"] + second["articles"]]
+    assert dates == sorted(dates, reverse=True)
+    assert len({article["url"] for article in first["articles"] + second["articles"]}) == 10
+    assert set(first["articles"][0]) == {"url", "published_date"}
+
+    assert len(store.query(limit=None)["articles"]) == 12
+
+def test_query_filters(store):
+    store.save([make_article(i) for i in range(10)] + [make_article(10, text="Cyclone Winston anniversary")])
+
+    assert store.query(source="Fiji Sun")["total"] == 5
+    assert store.query(since="2025-01-04", until="2025-01-05")["total"] == 4
+    assert [a["url"] for a in store.query(search="winston")["articles"]] == ["https://news.test/10"]
+    assert store.query(search="cyclo*")["total"] == 1
+    assert store.query(category="Sports")["total"] == 0
+
+def test_query_reads_free_text_literally(store):
+    store.save([make_article(i) for i in range(3)])
+
+    # FTS5 operators and stray quotes in the search box are plain words
+    assert store.query(search='parliament "suva')["total"] == 3
+    assert store.query(search="(parliament) sat:suva")["total"] == 3
+    assert store.query(search="-story")["total"] == 3
+    assert store.query(search="?!")["total"] == 3
+
+def test_invalid_input(store):
+    with pytest.raises(ValueError):
+        store.query(fields=["url", "password"])
+    with pytest.raises(ValueError):
+        store.query(fields=["url", "id FROM articles; --"])
+
+def test_revision_changes_with_the_stored_articles(store):
+    start = store.revision()
+    store.save([make_article(1), make_article(2)])
+    saved = store.revision()
+    assert saved > start
+
+    # Harvesting the same articles again only moves harvested_at
+    store.save([make_article(1), make_article(2)], harvested_at="2030-01-01 00:00:00")
+    assert store.revision() == saved
+
+    store.save([make_article(1, summary="A new summary.")])
+    assert store.revision() > saved
+
+def all_pages(store, per_page, **criteria):
+    pages = []
+    cursor = None
+    while True:
+        page = store.search(limit=per_page, cursor=cursor, facets=False, fields=["url", "published_date"], **criteria)
+        pages.append(page["articles"])
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return pages
+
+def test_paging_without_text_visits_every_article_once_newest_first(store):
+    store.save([make_article(i) for i in range(23)])
+
+    pages = all_pages(store, 5)
+    assert [len(page) for page in pages] == [5, 5, 5, 5, 3]
+    articles = [article for page in pages for article in page]
+    assert len({article["url"] for article in articles}) == 23
+    dates = [article["published_date"] for article in articles]
+    assert dates == sorted(dates, reverse=True)
+
+def test_undated_articles_come_last(store):
+    store.save([make_article(i) for i in range(6)] + [make_article(i, published_date=None) for i in range(6, 9)])
+
+    articles = [article for page in all_pages(store, 4) for article in page]
+    assert len({article["url"] for article in articles}) == 9
+    assert [article["published_date"] for article in articles[-3:]] == [None, None, None]
+
+def test_paging_by_relevance(store):
+    # Articles mentioning the query more often rank higher
+    store.save([make_article(i, text="cyclone " * (1 + i % 4) + "warning for the west") for i in range(12)])
+    store.save([make_article(i, text="budget day") for i in range(12, 15)])
+
+    pages = all_pages(store, 5, text="cyclone")
+    articles = [article for page in pages for article in page]
+    assert len(articles) == 12
+    assert len({article["url"] for article in articles}) == 12
+
+    first = store.search("cyclone", limit=5)
+    assert first["total"] == 12
+    assert all("<mark>" in article["snippet"] for article in first["articles"])
+
+def test_filters_apply_to_every_page(store):
+    store.save([make_article(i) for i in range(20)])
+
+    articles = [article for page in all_pages(store, 3, source="Fiji Sun", since="2025-01-02") for article in page]
+    assert len(articles) == len([i for i in range(20) if i % 2 and 1 + i % 5 >= 2])
+
+def test_last_page_has_no_cursor(store):
+    store.save([make_article(i) for i in range(4)])
+
+    page = store.search(limit=4)
+    assert len(page["articles"]) == 4
+    assert page["next_cursor"] is None
+
+def test_invalid_search_input(store):
+    with pytest.raises(ValueError):
+        store.search(cursor="not a cursor")
+    with pytest.raises(ValueError):
+        store.search(fields=["url", "password"])
\ No newline at end of file
@@ -0,0 +1,65 @@
+import pytest
+from article_store import ArticleStore
+from corpus_stats import CorpusStats
+from news_analyzer import NewsAnalyzer
+
+@pytest.fixture
+def stats(tmp_path):
+    stats = CorpusStats(str(tmp_path / "corpus_stats.db"))
+    yield stats
+    stats.close()
+
+def make_article(i, text, day="2025-01-10", category="politics", source="Fiji Times", **fields):
+    article = {
+        "url": f"https://news.test/{i}", "title": f"Story {i}", "source": source, "category": category,
+        "published_date": day, "text": text, "summary": "", "keywords": []
+    }
+    article.update(fields)
+    return article
+
+def test_each_url_is_counted_once(stats):
+    article = make_article(1, "Parliament passed the budget.")
+    assert stats.add([article, article]) == 1
+    assert stats.add([article]) == 0
+    assert stats.ingested_count() == 1
+    assert stats.document_counts() == {"politics": 1}
+
+def test_counts_by_category_and_source_in_a_date_range(stats):
+    stats.add([
+        make_article(1, "Parliament passed the budget.", day="2025-01-01"),
+        make_article(2, "The rugby team won.", day="2025-01-02", category="sports", source="Fiji Sun"),
+        make_article(3, "Rugby fans celebrated.", day="2025-01-03", category="sports", source="Fiji Sun"),
+        make_article(4, "Police made an arrest.", day="2025-01-03", category=None),
+    ])
+
+    assert stats.document_counts() == {"politics": 1, "sports": 2, "others": 1}
+    assert stats.document_counts(since="2025-01-02", until="2025-01-02") == {"sports": 1}
+    assert stats.source_counts() == {"Fiji Sun": 2, "Fiji Times": 2}
+    assert stats.source_counts(since="2025-01-03") == {"Fiji Sun": 1, "Fiji Times": 1}
+
+def test_top_terms_and_phrases(stats):
+    stats.add([
+        make_article(i, "Cyclone warning issued for the western division. Farmers prepare crops.", category="community")
+        for i in range(4)
+    ] + [make_article(9, "Farmers sold crops at the market.")])
+
+    assert stats.top_terms(num_terms=2) == ["crops", "farmers"]
+    assert stats.top_terms(category="politics", num_terms=1) == ["crops"]
+    assert "cyclone warning" in stats.top_phrases(num_phrases=10)
+    assert stats.top_phrases(since="2025-02-01") == []
+
+def test_period_overview_counts_one_population(stats, tmp_path):
+    store = ArticleStore(str(tmp_path / "articles.db"))
+    original = make_article(1, "Cyclone Ana made landfall near Nadi on Sunday night.", story_id=1)
+    copy = make_article(2, original["text"], source="Fiji Sun", story_id=1, duplicate_of=original["url"])
+    other = make_article(3, "The rugby team won the sevens final in Suva.", category="sports", source="Fiji Sun", story_id=2)
+
+    # Like app.ingest_articles: the store keeps every copy, the statistics only originals
+    store.save([original, copy, other])
+    stats.add([original, other])
+
+    overview = NewsAnalyzer().analyze_period(stats, store)["overview"]
+    assert overview["total_articles"] == 2
+    assert sum(overview["articles_by_category"].values()) == 2
+    assert overview["articles_by_source"] == {"Fiji Times": 1, "Fiji Sun": 1}
+    store.close()
\ No newline at end of file
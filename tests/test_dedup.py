@@ -0,0 +1,103 @@
+import numpy as np
+import pytest
+from dedup import StoryIndex, unique_stories
+
+CYCLONE = (
+    "Cyclone Ana made landfall near Nadi on Sunday night, bringing heavy rain and strong winds "
+    "to the western division. Residents of Lautoka were moved to evacuation centres before the "
+    "storm, and officials said damage to roads and crops was still being assessed on Monday."
+)
+BUDGET = (
+    "The Minister for Finance presented the national budget in Parliament on Friday. Spending on "
+    "health and education rises by ten percent, while sugar cane farmers will receive a new "
+    "fertiliser subsidy. Opposition members questioned how the deficit would be reduced."
+)
+
+@pytest.fixture
+def index(tmp_path):
+    index = StoryIndex(str(tmp_path / "data" / "stories.db"))
+    yield index
+    index.close()
+
+def make_article(i, text, title="News", source="Fiji Times"):
+    return {"url": f"https://news.test/{i}", "title": title, "text": text, "source": source, "summary": "", "keywords": []}
+
+def syndicated(text):
+    """A copy of a story with a sentence of its own, as another outlet would run it"""
+    return text + " The outlet will publish updates as they come in."
+
+def categorize_counting(calls):
+    def categorize(articles):
+        calls.append([article["url"] for article in articles])
+        for article in articles:
+            article["category"] = "community" if "Cyclone" in article["text"] else "politics"
+    return categorize
+
+def test_signatures_estimate_jaccard_similarity(index):
+    same = index.signature(CYCLONE)
+    assert (same == index.signature(CYCLONE)).all()
+    assert np.mean(same == index.signature(syndicated(CYCLONE))) > 0.5
+    assert np.mean(same == index.signature(BUDGET)) < 0.1
+    assert index.signature("...") is None
+
+def test_copies_join_the_story_of_the_first(index):
+    with index.lock:
+        first = index.assign(make_article(1, CYCLONE))
+        copy = index.assign(make_article(2, syndicated(CYCLONE), source="Fiji Sun"))
+        other = index.assign(make_article(3, BUDGET))
+        assert index.assign(make_article(1, CYCLONE)) == first
+    assert copy == first
+    assert other != first
+    assert index.story_count() == 2
+
+def test_classify_once_handles_one_copy_per_story(index):
+    calls = []
+    summarized = []
+    articles = [make_article(1, CYCLONE), make_article(2, syndicated(CYCLONE)), make_article(3, BUDGET)]
+
+    def summarize(batch):
+        summarized.extend(article["url"] for article in batch)
+        for article in batch:
+            article["summary"] = "Summary of " + article["url"]
+            article["keywords"] = ["fiji"]
+
+    index.classify_once(articles, categorize_counting(calls), summarize)
+    assert calls == [["https://news.test/1", "https://news.test/3"]]
+    assert summarized == ["https://news.test/1", "https://news.test/3"]
+
+    copy = articles[1]
+    assert copy["duplicate_of"] == "https://news.test/1"
+    assert copy["category"] == "community"
+    assert copy["summary"] == "Summary of https://news.test/1"
+    assert copy["story_id"] == articles[0]["story_id"]
+    assert "duplicate_of" not in articles[0] and "duplicate_of" not in articles[2]
+
+def test_later_copies_reuse_the_stored_story(tmp_path):
+    path = str(tmp_path / "stories.db")
+    index = StoryIndex(path)
+    index.classify_once([make_article(1, CYCLONE)], categorize_counting([]), lambda batch: [
+        article.update(summary="Cyclone summary.", keywords=["cyclone"]) for article in batch
+    ])
+    index.close()
+
+    # A copy harvested later, after a restart, is neither classified nor summarized again
+    calls = []
+    summarized = []
+    index = StoryIndex(path)
+    copy = make_article(2, syndicated(CYCLONE))
+    index.classify_once([copy], categorize_counting(calls), summarized.extend)
+    assert calls == [[]]
+    assert summarized == []
+    assert copy["category"] == "community"
+    assert copy["summary"] == "Cyclone summary."
+    assert copy["keywords"] == ["cyclone"]
+    assert copy["duplicate_of"] == "https://news.test/1"
+    index.close()
+
+def test_bands_must_divide_the_signature(tmp_path):
+    with pytest.raises(ValueError):
+        StoryIndex(str(tmp_path / "stories.db"), num_perm=100, bands=32)
+
+def test_unique_stories_keeps_the_first_copy():
+    articles = [{"url": "a", "story_id": 1}, {"url": "b", "story_id": 1}, {"url": "c"}, {"url": "d", "story_id": 2}]
+    assert [article["url"] for article in unique_stories(articles)] == ["a", "c", "d"]
\ No newline at end of file
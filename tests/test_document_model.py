@@ -0,0 +1,41 @@
+from document_model import DocumentCache
+
+TEXT = "The ministers were meeting in Suva, and 3 of them voted against the budgets."
+
+def test_tokens_drop_stop_words_and_non_words():
+    document = DocumentCache().get(TEXT)
+    assert "the" not in document.tokens
+    assert "3" not in document.tokens
+    assert "," not in document.tokens
+    assert document.tokens[:3] == ("ministers", "meeting", "suva")
+
+def test_lemmas_follow_the_tokens():
+    document = DocumentCache().get(TEXT)
+    assert len(document.lemmas) == len(document.tokens)
+    assert document.lemmas[0] == "minister"
+    assert document.term_counts["suva"] == 1
+
+def test_each_text_is_processed_once():
+    cache = DocumentCache()
+    first = cache.get(TEXT)
+    assert cache.get(TEXT) is first
+    assert (cache.hits, cache.misses) == (1, 1)
+
+def test_least_recently_used_document_is_evicted():
+    cache = DocumentCache(max_size=2)
+    first = cache.get("Suva market")
+    cache.get("Nadi airport")
+    cache.get("Suva market")
+    cache.get("Lautoka mill")
+
+    assert cache.get("Suva market") is first
+    assert cache.misses == 3
+    cache.get("Nadi airport")
+    assert cache.misses == 4
+
+def test_get_many_matches_get():
+    cache = DocumentCache()
+    texts = ["Suva market reopens", TEXT, "Suva market reopens"]
+    documents = cache.get_many(texts)
+    assert [d.tokens for d in documents] == [DocumentCache().get(t).tokens for t in texts]
+    assert documents[0] is documents[2]
\ No newline at end of file
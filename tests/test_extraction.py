@@ -0,0 +1,59 @@
+import os
+import pytest
+from concurrent.futures.process import BrokenProcessPool
+from document_model import DocumentCache
+from extraction import ExtractionPool, parse_html, process_documents
+
+ARTICLE_HTML = """<html><head><title>Flooding closes roads in Nadi</title>
+<meta property="article:published_time" content="2025-01-10T08:00:00+12:00"></head>
+<body><article><h1>Flooding closes roads in Nadi</h1>
+<p>Heavy overnight rain has closed several roads in Nadi, and the Fiji Roads Authority has asked motorists to avoid the Queens Road near Sabeto until the water recedes.</p>
+<p>The weather office says more rain is expected across the western division over the next two days, and residents of low-lying areas have been told to prepare to move.</p>
+</article></body></html>"""
+
+TEXTS = [
+    "Heavy overnight rain has closed several roads in Nadi.",
+    "The Minister for Finance presented the national budget in Parliament.",
+    "Police arrested two suspects after a robbery in Lautoka.",
+]
+
+@pytest.fixture(scope="module")
+def pool():
+    pool = ExtractionPool(max_workers=2)
+    yield pool
+    pool.shutdown()
+
+def test_disabled_pool_runs_in_the_calling_process():
+    pool = ExtractionPool(max_workers=0)
+    assert not pool.enabled
+    assert pool.run(os.getpid) == os.getpid()
+    assert pool.map(len, [[1], [1, 2]]) == [1, 2]
+    assert pool.executor is None
+
+def test_parsing_runs_on_worker_processes(pool):
+    assert pool.run(os.getpid) != os.getpid()
+
+    parsed = pool.run(parse_html, "https://news.test/flooding", ARTICLE_HTML)
+    assert parsed == parse_html("https://news.test/flooding", ARTICLE_HTML)
+    assert parsed["title"] == "Flooding closes roads in Nadi"
+    assert "Queens Road" in parsed["text"]
+
+def test_tokens_from_workers_match_local_tokenization(pool):
+    batches = [TEXTS[:2], TEXTS[2:]]
+    results = [result for batch in pool.map(process_documents, batches) for result in batch]
+    cache = DocumentCache()
+    assert results == [(cache.get(text).tokens, cache.get(text).lemmas) for text in TEXTS]
+
+def test_large_batches_fill_the_document_cache_from_the_pool(pool):
+    cache = DocumentCache()
+    texts = [f"{text} Story {i}." for i, text in enumerate(TEXTS * 10)]
+    documents = cache.get_many(texts, pool, batch_size=10)
+
+    # Every text was tokenized by the workers, so the local lookups were all hits
+    assert cache.misses == 0
+    assert [d.tokens for d in documents] == [DocumentCache().get(text).tokens for text in texts]
+
+def test_a_crashed_worker_only_fails_its_own_call(pool):
+    with pytest.raises(BrokenProcessPool):
+        pool.run(os._exit, 1)
+    assert pool.run(len, "Suva") == 4
\ No newline at end of file
@@ -0,0 +1,140 @@
+import io
+import datetime
+import requests
+from requests.structures import CaseInsensitiveDict
+from feed_discovery import FeedDiscovery
+
+SOURCE = {"name": "Test News", "url": "https://news.test/"}
+HOMEPAGE = b'<html><head><link rel="alternate" type="application/rss+xml" href="/feed.xml"></head></html>'
+
+class FakeSite:
+    """Serves a homepage and an RSS feed, answering conditional requests like a real server"""
+    def __init__(self):
+        self.items = []  # (url, pubDate or None), as listed in the feed
+        self.etag = '"1"'
+        self.requests = []
+
+    def publish(self, url, date=None):
+        self.items.insert(0, (url, date))
+        self.etag = f'"{len(self.items) + 1}"'
+
+    def get(self, url, headers=None, **kwargs):
+        self.requests.append((url, dict(headers or {})))
+        if url == SOURCE["url"]:
+            return self._response(url, HOMEPAGE)
+        if url.endswith('/feed.xml'):
+            if (headers or {}).get('If-None-Match') == self.etag:
+                return self._response(url, b'', status=304)
+            items = "".join(
+                f"<item><link>{link}</link>"
+                + (f"<pubDate>{date.strftime('%a, %d %b %Y %H:%M:%S GMT')}</pubDate>" if date else "")
+                + "</item>"
+                for link, date in self.items
+            )
+            return self._response(url, f"<rss><channel>{items}</channel></rss>".encode(), headers={'ETag': self.etag})
+        return self._response(url, b'', status=404)
+
+    def _response(self, url, body, status=200, headers=None):
+        response = requests.Response()
+        response.url = url
+        response.status_code = status
+        response.headers = CaseInsensitiveDict(headers or {})
+        response._content = body
+        response.raw = io.BytesIO(body)
+        return response
+
+def day(n):
+    return datetime.datetime(2025, 1, n, 8, 0)
+
+def urls(entries):
+    return [url for url, _ in entries]
+
+def make_discovery(tmp_path, site):
+    return FeedDiscovery(site.get, db_path=str(tmp_path / "feeds.db"))
+
+def test_lists_entries_newest_first(tmp_path):
+    site = FakeSite()
+    site.publish("https://news.test/a", day(1))
+    site.publish("https://news.test/c", day(3))
+    site.publish("https://news.test/b", day(2))
+    discovery = make_discovery(tmp_path, site)
+
+    assert urls(discovery.discover(SOURCE)) == ["https://news.test/c", "https://news.test/b", "https://news.test/a"]
+
+def test_since_moves_to_the_newest_settled_entry(tmp_path):
+    site = FakeSite()
+    site.publish("https://news.test/a", day(1))
+    site.publish("https://news.test/b", day(2))
+    discovery = make_discovery(tmp_path, site)
+
+    entries = discovery.discover(SOURCE)
+    discovery.commit(SOURCE, entries, set(urls(entries)))
+    assert discovery._state(SOURCE)["since"] == day(2)
+
+    # The unchanged feed is answered with 304 and lists nothing
+    assert discovery.discover(SOURCE) == []
+    assert site.requests[-1][1].get('If-None-Match') == site.etag
+
+    # Only entries newer than since are listed after the feed changes
+    site.publish("https://news.test/c", day(3))
+    assert urls(discovery.discover(SOURCE)) == ["https://news.test/c"]
+
+def test_unsettled_entries_are_listed_again(tmp_path):
+    site = FakeSite()
+    for n in range(1, 5):
+        site.publish(f"https://news.test/{n}", day(n))
+    discovery = make_discovery(tmp_path, site)
+
+    # Only the two newest were harvested, e.g. because of the per-source limit
+    entries = discovery.discover(SOURCE)
+    discovery.commit(SOURCE, entries, {"https://news.test/4", "https://news.test/3"})
+    state = discovery._state(SOURCE)
+    assert state["since"] < day(1)
+    assert state["etag"] is None  # The feed must be read in full next time
+
+    # The settled entries are not listed again, so they don't count against the limit
+    entries = discovery.discover(SOURCE)
+    assert urls(entries) == ["https://news.test/2", "https://news.test/1"]
+
+    discovery.commit(SOURCE, entries, set(urls(entries)))
+    state = discovery._state(SOURCE)
+    assert state["since"] == day(4)
+    assert state["settled"] == {}
+    assert state["etag"] == site.etag
+
+def test_failed_entries_keep_since_before_them(tmp_path):
+    site = FakeSite()
+    for n in range(1, 4):
+        site.publish(f"https://news.test/{n}", day(n))
+    discovery = make_discovery(tmp_path, site)
+
+    # The middle entry failed to download
+    entries = discovery.discover(SOURCE)
+    discovery.commit(SOURCE, entries, {"https://news.test/3", "https://news.test/1"})
+    assert urls(discovery.discover(SOURCE)) == ["https://news.test/2"]
+
+def test_undated_entries_are_listed_until_settled(tmp_path):
+    site = FakeSite()
+    site.publish("https://news.test/dated", day(2))
+    site.publish("https://news.test/undated")
+    discovery = make_discovery(tmp_path, site)
+
+    entries = discovery.discover(SOURCE)
+    assert urls(entries) == ["https://news.test/undated", "https://news.test/dated"]
+    discovery.commit(SOURCE, entries, {"https://news.test/dated"})
+    assert urls(discovery.discover(SOURCE)) == ["https://news.test/undated"]
+
+    entries = discovery.discover(SOURCE)
+    discovery.commit(SOURCE, entries, {"https://news.test/undated"})
+    assert discovery.discover(SOURCE) == []
+
+def test_source_without_feed(tmp_path):
+    def get(url, **kwargs):
+        response = requests.Response()
+        response.url = url
+        response.status_code = 404
+        response._content = b''
+        return response
+
+    discovery = FeedDiscovery(get, db_path=str(tmp_path / "feeds.db"))
+    assert discovery.discover(SOURCE) is None
\ No newline at end of file
@@ -0,0 +1,82 @@
+import json
+import threading
+from harvest_jobs import HarvestJob, HarvestJobRunner
+
+def parse(stream):
+    """(id, event, data) of every Server-Sent Event, skipping keep-alive comments"""
+    events = []
+    for message in stream:
+        if message.startswith(":"):
+            continue
+        lines = dict(line.split(": ", 1) for line in message.strip().split("\n"))
+        events.append((int(lines["id"]), lines["event"], json.loads(lines["data"])))
+    return events
+
+def test_progress_is_tracked_per_source():
+    job = HarvestJob()
+    job.emit("source_started", {"source": "Fiji Sun"})
+    job.add_article({"url": "a", "title": "A", "text": "long", "category": "sports"}, ["url", "title"])
+    job.emit("source_finished", {"source": "Fiji Sun", "count": 1})
+    job.emit("complete", {"message": "done"})
+
+    status = job.to_dict()
+    assert status["status"] == "completed"
+    assert status["sources"] == {"Fiji Sun": {"status": "finished", "articles": 1}}
+    assert status["articles"] == 1
+    assert status["finished_at"] is not None
+
+def test_article_events_carry_only_list_fields():
+    job = HarvestJob()
+    article = {"url": "a", "title": "A", "text": "long body", "category": "sports"}
+    job.add_article(article, ["url", "title"])
+
+    assert job.events == [("article", {"url": "a", "title": "A", "job_position": 0})]
+    assert job.article(0) is article
+    assert job.news_data(["politics", "sports"]) == {"politics": [], "sports": [article]}
+
+def test_stream_replays_from_an_event_id():
+    job = HarvestJob()
+    for i in range(3):
+        job.emit("source_started", {"source": f"S{i}"})
+    job.emit("complete", {"message": "done"})
+
+    assert [e[0] for e in parse(job.stream())] == [0, 1, 2, 3]
+    assert parse(job.stream(start=2)) == [(2, "source_started", {"source": "S2"}), (3, "complete", {"message": "done"})]
+
+def test_stream_ends_with_the_last_event_of_a_running_job():
+    job = HarvestJob()
+    received = []
+    listener = threading.Thread(target=lambda: received.extend(parse(job.stream())))
+    listener.start()
+
+    for i in range(50):
+        job.emit("source_started", {"source": f"S{i}"})
+    job.emit("failed", {"message": "boom"})
+    listener.join(5)
+
+    assert not listener.is_alive()
+    assert len(received) == 51
+    assert received[-1] == (50, "failed", {"message": "boom"})
+
+def test_runner_joins_the_running_job():
+    release = threading.Event()
+    runner = HarvestJobRunner(lambda job: release.wait(5))
+
+    job, created = runner.start()
+    again, created_again = runner.start()
+    assert created and not created_again
+    assert again is job
+
+    release.set()
+    list(job.stream())
+    assert job.status == "completed"
+    assert runner.get(job.id) is job
+    assert runner.start()[1]
+
+def test_runner_reports_exceptions_as_failed_events():
+    def work(job):
+        raise RuntimeError("source unreachable")
+
+    job, _ = HarvestJobRunner(work).start()
+    assert parse(job.stream())[-1][1:] == ("failed", {"message": "source unreachable"})
+    assert job.status == "failed"
\ No newline at end of file
@@ -0,0 +1,73 @@
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import pytest
+from http_client import TokenBucket, PoliteSession
+
+def test_token_bucket_allows_a_burst_then_keeps_the_rate():
+    bucket = TokenBucket(rate=20, capacity=3)
+    start = time.monotonic()
+    for _ in range(3):
+        bucket.acquire()
+    assert time.monotonic() - start < 0.05
+
+    # Three more tokens take 3 / 20 seconds to refill
+    for _ in range(3):
+        bucket.acquire()
+    assert time.monotonic() - start >= 0.14
+
+@pytest.fixture
+def server():
+    """Local HTTP server that records how many requests it handles at once"""
+    state = {"active": 0, "peak": 0, "count": 0}
+    lock = threading.Lock()
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            with lock:
+                state["active"] += 1
+                state["count"] += 1
+                state["peak"] = max(state["peak"], state["active"])
+            time.sleep(0.05)
+            with lock:
+                state["active"] -= 1
+            self.send_response(200)
+            self.send_header("Content-Length", "2")
+            self.end_headers()
+            self.wfile.write(b"ok")
+
+        def log_message(self, format, *args):
+            pass
+
+    httpd = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    httpd.daemon_threads = True
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}", state
+    httpd.shutdown()
+    httpd.server_close()
+
+def test_polite_session_limits_requests_in_flight_per_host(server):
+    url, state = server
+    session = PoliteSession(rate=1000, burst=1000, max_per_host=2)
+    threads = [threading.Thread(target=session.get_text, args=(f"{url}/{i}",)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    session.close()
+
+    assert state["count"] == 8
+    assert state["peak"] == 2
+
+def test_polite_session_rate_limits_each_host(server):
+    url, _ = server
+    session = PoliteSession(rate=10, burst=1, max_per_host=4)
+    start = time.monotonic()
+    for i in range(3):
+        assert session.get_text(f"{url}/{i}") == "ok"
+    # The burst covers the first request; the other two wait 1/10 s each
+    assert time.monotonic() - start >= 0.19
+    session.close()
\ No newline at end of file
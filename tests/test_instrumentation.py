@@ -0,0 +1,82 @@
+import time
+import threading
+import pytest
+from instrumentation import MetricsRegistry, SamplingProfiler, STAGE_SECONDS, timed
+
+@pytest.fixture
+def registry():
+    return MetricsRegistry()
+
+def test_counter_renders_each_label_set(registry):
+    articles = registry.counter('articles_total', 'Articles seen', ['source', 'outcome'])
+    articles.inc(source="Fiji Sun", outcome="fetched")
+    articles.inc(2, source="Fiji Sun", outcome="fetched")
+    articles.inc(source='The "Times"', outcome="failed")
+
+    assert registry.render().splitlines() == [
+        "# HELP articles_total Articles seen",
+        "# TYPE articles_total counter",
+        'articles_total{source="Fiji Sun",outcome="fetched"} 3',
+        'articles_total{source="The \\"Times\\"",outcome="failed"} 1',
+    ]
+
+def test_labels_must_match(registry):
+    articles = registry.counter('articles_total', 'Articles seen', ['source'])
+    with pytest.raises(ValueError):
+        articles.inc(outcome="fetched")
+
+def test_same_name_returns_the_same_metric(registry):
+    assert registry.gauge('in_flight', 'In flight') is registry.gauge('in_flight', 'In flight')
+
+def test_gauge_tracks_work_in_flight(registry):
+    in_flight = registry.gauge('in_flight', 'In flight', ['operation'])
+    with in_flight.track_in_flight(operation="download"):
+        assert in_flight.values[("download",)] == 1
+    assert in_flight.values[("download",)] == 0
+
+    with pytest.raises(RuntimeError):
+        with in_flight.track_in_flight(operation="download"):
+            raise RuntimeError("failed")
+    assert in_flight.values[("download",)] == 0
+
+def test_histogram_buckets_are_cumulative(registry):
+    latency = registry.histogram('latency_seconds', 'Latency', ['stage'], buckets=(0.1, 1.0))
+    for value in (0.05, 0.5, 5.0):
+        latency.observe(value, stage="parse")
+
+    lines = registry.render().splitlines()
+    assert 'latency_seconds_bucket{stage="parse",le="0.1"} 1' in lines
+    assert 'latency_seconds_bucket{stage="parse",le="1.0"} 2' in lines
+    assert 'latency_seconds_bucket{stage="parse",le="+Inf"} 3' in lines
+    assert 'latency_seconds_sum{stage="parse"} 5.55' in lines
+    assert 'latency_seconds_count{stage="parse"} 3' in lines
+
+def test_timed_records_calls_that_raise():
+    @timed("test_stage")
+    def fail():
+        raise ValueError("bad input")
+
+    before = STAGE_SECONDS.values.get(("test_stage",), {"count": 0})["count"]
+    with pytest.raises(ValueError):
+        fail()
+    assert STAGE_SECONDS.values[("test_stage",)]["count"] == before + 1
+
+def test_profiler_folds_the_stacks_of_one_thread():
+    def busy_wait():
+        end = time.perf_counter() + 0.2
+        while time.perf_counter() < end:
+            pass
+
+    profiler = SamplingProfiler(interval=0.002).start()
+    busy_wait()
+    folded = profiler.stop()
+
+    top_stack, count = folded.splitlines()[0].rsplit(" ", 1)
+    assert int(count) > 10
+    assert top_stack.split(";")[-1].startswith("busy_wait (test_instrumentation.py:")
+
+def test_profiler_of_a_finished_thread_stops_sampling():
+    thread = threading.Thread(target=lambda: None)
+    thread.start()
+    thread.join()
+    assert SamplingProfiler(thread_id=thread.ident, interval=0.001).start().stop() == "\n"
\ No newline at end of file
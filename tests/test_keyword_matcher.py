@@ -0,0 +1,49 @@
+from keyword_matcher import KeywordMatcher
+
+def test_matches_whole_words_only():
+    matcher = KeywordMatcher({"threat": ["riot", "coup"]})
+    assert matcher.scan("A riot broke out")["threat"]["riot"] == 1
+    assert matcher.scan("Patriots won the game")["threat"]["riot"] == 0
+    assert matcher.scan("The coupon was valid")["threat"]["coup"] == 0
+
+def test_matching_ignores_case_and_spacing_of_phrases():
+    matcher = KeywordMatcher({"threat": ["economic crisis"]})
+    assert matcher.scan("An ECONOMIC\n  Crisis looms")["threat"]["economic crisis"] == 1
+
+def test_suffixes_extend_whole_words():
+    matcher = KeywordMatcher({"threat": ["protest"]})
+    for text in ("protests", "protested", "protesting", "the protest's end"):
+        assert matcher.scan(text)["threat"]["protest"] == 1, text
+    # Only the listed SUFFIXES are accepted
+    assert matcher.scan("protestation")["threat"]["protest"] == 0
+
+def test_star_marks_a_stem():
+    matcher = KeywordMatcher({"politics": ["legislat*"]})
+    hits = matcher.scan("Legislators passed the legislation")["politics"]
+    assert hits["legislat"] == 2
+    # Stems still start at a word boundary
+    assert matcher.scan("Unlegislated")["politics"]["legislat"] == 0
+
+def test_overlapping_keywords_are_all_counted():
+    matcher = KeywordMatcher({"threat": ["crisis", "economic crisis"], "economy": ["economic"]})
+    hits = matcher.scan("The economic crisis deepened")
+    assert hits["threat"]["economic crisis"] == 1
+    assert hits["threat"]["crisis"] == 1
+    assert hits["economy"]["economic"] == 1
+
+def test_keyword_in_several_categories():
+    matcher = KeywordMatcher({"weather": ["cyclone"], "disaster": ["cyclone"]})
+    hits = matcher.scan("Cyclone warning issued")
+    assert hits["weather"]["cyclone"] == 1
+    assert hits["disaster"]["cyclone"] == 1
+
+def test_empty_inputs():
+    matcher = KeywordMatcher({"threat": ["riot"]})
+    assert matcher.scan("")["threat"] == {}
+    assert KeywordMatcher({"threat": []}).scan("riot")["threat"] == {}
+
+def test_counts_and_search():
+    matcher = KeywordMatcher({"threat": ["riot", "strike"], "sport": ["rugby"]})
+    assert matcher.counts("Riot after the strike; another riot") == {"threat": 3, "sport": 0}
+    assert matcher.search("A general strike")
+    assert not matcher.search("A quiet day")
\ No newline at end of file
@@ -0,0 +1,115 @@
+import pytest
+from news_analyzer import NewsAnalyzer, split_sentences
+
+@pytest.fixture(scope="module")
+def analyzer():
+    return NewsAnalyzer()
+
+def make_article(i, title, text, **fields):
+    article = {
+        "url": f"https://news.test/{i}", "title": title, "source": "Fiji Times",
+        "published_date": "2025-01-10", "text": text, "summary": "", "keywords": []
+    }
+    article.update(fields)
+    return article
+
+CYCLONE = (
+    "Cyclone Ana made landfall near Nadi on Sunday night. "
+    "The cyclone brought heavy rain and strong winds to the western division. "
+    "Residents of Lautoka were moved to evacuation centres before the storm. "
+    "Officials said damage to roads and crops was still being assessed. "
+    "Schools across the west will stay closed until Wednesday. "
+    "The weather office expects the cyclone to weaken as it moves south."
+)
+BUDGET = (
+    "The Minister for Finance presented the national budget in Parliament. "
+    "Spending on health and education rises by ten percent. "
+    "Opposition members questioned how the deficit would be reduced. "
+    "Sugar cane farmers will receive a new fertiliser subsidy."
+)
+
+def test_split_sentences_keeps_titles_and_initials_together():
+    text = "Mr. Rabuka met Dr. Kumar in Suva. They spoke for an hour.\nA new paragraph"
+    assert split_sentences(text) == ["Mr. Rabuka met Dr. Kumar in Suva.", "They spoke for an hour.", "A new paragraph"]
+
+def test_summarize_nothing(analyzer):
+    assert analyzer.summarize_articles([]) == []
+
+def test_summary_sentences_come_from_the_article_in_text_order(analyzer):
+    articles = [make_article(1, "Cyclone Ana hits the west", CYCLONE), make_article(2, "National budget presented", BUDGET)]
+    analyzer.summarize_articles(articles, max_sentences=3)
+
+    sentences = split_sentences(CYCLONE)
+    summary = articles[0]["summary"].split("\n")
+    assert len(summary) == 3
+    assert all(sentence in sentences for sentence in summary)
+    assert [sentences.index(sentence) for sentence in summary] == sorted(sentences.index(sentence) for sentence in summary)
+
+def test_short_article_summary_is_the_whole_text(analyzer):
+    articles = [make_article(1, "Budget", BUDGET)]
+    analyzer.summarize_articles(articles, max_sentences=10)
+    assert articles[0]["summary"] == "\n".join(split_sentences(BUDGET))
+
+def test_keywords_skip_stop_words_and_respect_the_limit(analyzer):
+    articles = [make_article(1, "Cyclone Ana hits the west", CYCLONE), make_article(2, "National budget presented", BUDGET)]
+    analyzer.summarize_articles(articles, num_keywords=5)
+
+    assert len(articles[0]["keywords"]) == 5
+    assert "cyclone" in articles[0]["keywords"]
+    assert not set(articles[0]["keywords"]) & analyzer.stop_words
+
+def test_existing_output_is_kept(analyzer):
+    articles = [make_article(1, "Cyclone", CYCLONE, summary="Given summary", keywords=["given"])]
+    analyzer.summarize_articles(articles)
+    assert articles[0]["summary"] == "Given summary"
+    assert articles[0]["keywords"] == ["given"]
+
+def test_article_without_text(analyzer):
+    articles = [make_article(1, "Flood warning for Ba", ""), make_article(2, "Cyclone", CYCLONE)]
+    analyzer.summarize_articles(articles)
+    assert articles[0]["summary"] == ""
+    assert set(articles[0]["keywords"]) <= {"flood", "warning", "ba"}
+
+def test_archive_document_frequencies_lower_common_terms(analyzer):
+    text = "Lautoka council approved the market upgrade in Lautoka today. The upgrade was welcomed across Lautoka."
+
+    def document_frequencies(terms):
+        # Every archived article mentions Lautoka, none mentions the market
+        return [1000 if term == "lautoka" else 0 for term in terms], 1000
+
+    alone = [make_article(1, "Council news", text)]
+    analyzer.summarize_articles(alone, num_keywords=3)
+    weighted = [make_article(1, "Council news", text)]
+    analyzer.summarize_articles(weighted, num_keywords=3, document_frequencies=document_frequencies)
+
+    assert "lautoka" in alone[0]["keywords"]
+    assert "lautoka" not in weighted[0]["keywords"]
+
+def test_digest_of_nothing(analyzer):
+    assert analyzer.digest({}) == {}
+    assert analyzer.digest({"Politics": [], "Weather": []}) == {}
+
+def test_digest_counts_each_story_once(analyzer):
+    original = make_article(1, "Cyclone Ana hits the west", CYCLONE, story_id=7)
+    copy = make_article(2, "Cyclone Ana hits the west", CYCLONE, story_id=7, source="Fiji Sun")
+    news_data = {
+        "Weather": [original, copy],
+        "Politics": [make_article(3, "National budget presented", BUDGET)],
+        "Sports": []
+    }
+
+    digests = analyzer.digest(news_data, num_sentences=4)
+    assert set(digests) == {"Weather", "Politics"}
+    weather = digests["Weather"]
+    assert weather["featured"]["url"] == original["url"]
+    assert weather["featured"]["summary"]
+    # One sentence per story, and the copy is not a second story
+    assert len(weather["sentences"]) == 1
+    assert weather["sentences"][0]["url"] == original["url"]
+    assert weather["sentences"][0]["sentence"] in split_sentences(CYCLONE)
+
+def test_digest_skips_fragments(analyzer):
+    articles = [make_article(i, f"Item {i}", "Suva, Fiji. By staff.") for i in range(3)]
+    digests = analyzer.digest({"Politics": articles})
+    assert digests["Politics"]["sentences"] == []
+    assert digests["Politics"]["featured"]["url"] in {article["url"] for article in articles}
\ No newline at end of file
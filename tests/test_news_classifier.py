@@ -0,0 +1,74 @@
+import os
+import pytest
+from news_classifier import NewsClassifier
+from snapshots import save_snapshot
+
+TEXTS = {
+    "sports": [
+        "The Fiji rugby team beat Samoa in the sevens final after the coach changed the lineup.",
+        "Netball players trained all week before the Pacific championship match in Suva.",
+        "The soccer league resumes on Saturday with the top team facing the defending champions.",
+    ],
+    "crime": [
+        "Police arrested two suspects after a robbery at a store in Nadi on Tuesday night.",
+        "The court sentenced the man to prison for fraud and theft from his employer.",
+        "Investigators say the assault victim is recovering while police question a suspect.",
+    ],
+}
+
+def article(category, i, text):
+    return {"url": f"https://example.com/{category}/{i}", "title": text.split(" after ")[0], "text": text}
+
+@pytest.fixture
+def classifier(tmp_path, monkeypatch):
+    # The model and any prepared artifact live under data/ of the working directory
+    monkeypatch.chdir(tmp_path)
+    os.makedirs("data")
+    return NewsClassifier()
+
+@pytest.fixture
+def snapshot(tmp_path):
+    path = str(tmp_path / "fiji_news_20240101_000000.jsonl.gz")
+    save_snapshot(path, {
+        category: [article(category, i, text) for i, text in enumerate(texts)]
+        for category, texts in TEXTS.items()
+    })
+    return path
+
+def test_untrained_model_falls_back_to_keyword_rules(classifier):
+    assert not classifier.is_trained()
+    articles = [
+        {"title": "Police arrest suspect", "text": "Police arrested a suspect after the robbery."},
+        {"title": "Weather", "text": "Sunny skies are expected all weekend."},
+    ]
+    categorized = classifier.categorize(articles)
+    assert categorized["crime"] == [articles[0]]
+    assert categorized["others"] == [articles[1]]
+    assert [a["category"] for a in articles] == ["crime", "others"]
+
+def test_categorize_nothing(classifier):
+    assert classifier.categorize([]) == {category: [] for category in classifier.categories}
+
+def test_train_counts_each_article_once_and_saves_the_model(classifier, snapshot):
+    counts = classifier.train([snapshot, snapshot])
+    assert counts == {"politics": 0, "community": 0, "sports": 3, "crime": 3, "others": 0}
+    assert classifier.is_trained()
+    assert os.path.exists(classifier.model_path)
+
+    # A new classifier picks up the saved model
+    assert NewsClassifier().is_trained()
+
+def test_trained_model_categorizes_in_one_batch(classifier, snapshot):
+    classifier.train([snapshot])
+    articles = [
+        {"title": "Rugby coach names team", "text": "The rugby coach named the team for the sevens match."},
+        {"title": "Police make arrest", "text": "Police arrested a suspect over the robbery and theft."},
+    ]
+    classifier.categorize(articles)
+    assert [a["category"] for a in articles] == ["sports", "crime"]
+
+def test_training_needs_two_categories(classifier, tmp_path):
+    path = str(tmp_path / "fiji_news_20240102_000000.jsonl.gz")
+    save_snapshot(path, {"sports": [article("sports", i, text) for i, text in enumerate(TEXTS["sports"])]})
+    with pytest.raises(ValueError):
+        classifier.train([path])
\ No newline at end of file
@@ -0,0 +1,89 @@
+import pytest
+from benchmarks.corpus import generate_corpus
+from benchmarks.mock_news_server import MockNewsServer
+from http_client import PoliteSession
+from news_harvester import NewsScraper
+
+@pytest.fixture
+def mock_sites():
+    server = MockNewsServer(generate_corpus(150, duplicate_rate=0), feeds=True)
+    sources = server.start()
+    yield server, sources
+    server.stop()
+
+def make_scraper(tmp_path, sources, articles_per_source=5):
+    scraper = NewsScraper(
+        articles_per_source=articles_per_source,
+        index_path=str(tmp_path / "article_index.db"),
+        feeds_path=str(tmp_path / "feeds.db")
+    )
+    scraper.sources = sources
+    scraper.session = PoliteSession(headers=scraper.headers, rate=1000, burst=1000, max_per_host=4)
+    return scraper
+
+def test_harvests_every_source_up_to_the_limit(tmp_path, mock_sites):
+    _, sources = mock_sites
+    scraper = make_scraper(tmp_path, sources, articles_per_source=4)
+
+    articles = scraper.harvest()
+    by_source = {source["name"]: [a for a in articles if a["source"] == source["name"]] for source in sources}
+    assert all(len(source_articles) == 4 for source_articles in by_source.values())
+    assert len({article["url"] for article in articles}) == len(articles)
+
+def test_no_article_is_downloaded_beyond_the_limit(tmp_path, mock_sites):
+    _, sources = mock_sites
+    scraper = make_scraper(tmp_path, sources[:1], articles_per_source=3)
+
+    assert len(scraper.harvest_source(sources[0])) == 3
+    # Every article of the mock sites is relevant, so exactly three were fetched
+    assert scraper.pipeline_stats[sources[0]["name"]]["fetch"]["in"] == 3
+def test_reharvest_reuses_the_index(tmp_path, mock_sites):
+    _, sources = mock_sites
+    # The last mock site has no feed, so every harvest crawls the same articles
+    source = sources[-1]
+    scraper = make_scraper(tmp_path, [source], articles_per_source=3)
+    first = scraper.harvest_source(source)
+    urls = {article["url"] for article in first}
+
+    requested = []
+    get = scraper.session.get
+    def spy(url, **kwargs):
+        requested.append((url, kwargs.get("headers") or {}))
+        return get(url, **kwargs)
+    scraper.session.get = spy
+
+    # Freshly checked articles are answered from the index without a request
+    assert scraper.harvest_source(source) == first
+    assert not [url for url, _ in requested if url in urls]
+
+    # Stale ones are revalidated with their ETag instead of downloaded again
+    scraper.index.recheck_after = 0
+    requested.clear()
+    assert scraper.harvest_source(source) == first
+    revalidated = [headers for url, headers in requested if url in urls]
+    assert len(revalidated) == 3
+    assert all("If-None-Match" in headers for headers in revalidated)
+@pytest.fixture
+def scraper(tmp_path):
+    return NewsScraper(index_path=str(tmp_path / "article_index.db"), feeds_path=str(tmp_path / "feeds.db"))
+
+def test_title_mentioning_fiji_is_relevant(scraper):
+    assert scraper._is_fiji_related({"title": "Flooding closes roads in Nadi", "text": ""})
+
+def test_lead_paragraph_mentioning_fiji_is_relevant(scraper):
+    article = {
+        "title": "Council approves new market",
+        "text": "Council approves new market\n12 March 2024\n"
+                "The Suva City Council has approved plans for a new municipal market near the wharf.\n"
+                "Construction starts next year."
+    }
+    assert scraper._is_fiji_related(article)
+
+def test_passing_mention_after_the_lead_is_not_relevant(scraper):
+    article = {
+        "title": "Rugby sevens series heads to Singapore",
+        "text": "The world rugby sevens series moves to Singapore this weekend after a strong start in Perth.\n"
+                "Teams from New Zealand and Argentina lead the standings.\n"
+                "Fiji are third after losing narrowly in the semi-finals."
+    }
+    assert not scraper._is_fiji_related(article)
\ No newline at end of file
@@ -0,0 +1,46 @@
+import os
+import pytest
+from result_cache import ResultCache, news_data_hash
+
+@pytest.fixture
+def cache(tmp_path):
+    return ResultCache(str(tmp_path / "cache"), max_entries=2)
+
+def test_values_survive_a_restart(cache, tmp_path):
+    key = cache.key("summary", "abc", 1)
+    assert cache.get(key) is None
+    cache.put(key, {"summary": "Quiet week"})
+
+    assert ResultCache(str(tmp_path / "cache")).get(key) == {"summary": "Quiet week"}
+
+def test_keys_depend_on_kind_content_and_version(cache):
+    keys = {cache.key("summary", "abc", 1), cache.key("trends", "abc", 1),
+            cache.key("summary", "abd", 1), cache.key("summary", "abc", 2)}
+    assert len(keys) == 4
+
+def test_memory_tier_evicts_least_recently_used(cache):
+    for name in ("a", "b", "c"):
+        cache.put(name, name.upper())
+    assert list(cache.entries) == ["b", "c"]
+
+    # Evicted entries are still read back from disk
+    assert cache.get("a") == "A"
+    assert list(cache.entries) == ["c", "a"]
+
+def test_unreadable_entries_are_ignored(cache):
+    with open(os.path.join(cache.directory, "broken.json"), "w") as f:
+        f.write("{not json")
+    assert cache.get("broken") is None
+
+def test_file_hash_follows_the_contents(cache, tmp_path):
+    path = tmp_path / "fiji_news_20250101_000000.json"
+    path.write_text('{"politics": []}')
+    first = cache.file_hash(str(path))
+    assert cache.file_hash(str(path)) == first
+
+    path.write_text('{"politics": [], "sports": []}')
+    assert cache.file_hash(str(path)) != first
+
+def test_news_data_hash_ignores_key_order():
+    assert news_data_hash({"a": [1], "b": []}) == news_data_hash({"b": [], "a": [1]})
+    assert news_data_hash({"a": [1]}) != news_data_hash({"a": [2]})
\ No newline at end of file
@@ -0,0 +1,103 @@
+import threading
+import pytest
+from scheduler import SourceScheduler, SourceSchedule
+
+SOURCE = {"name": "FBC News", "url": "https://www.fbcnews.com.fj"}
+
+def make_scheduler(poll, **settings):
+    settings = dict(dict(min_interval=120, max_interval=3600, initial_interval=600, jitter=0), **settings)
+    scheduler = SourceScheduler(poll, [SOURCE], **settings)
+    # Polls are driven by the tests rather than the scheduler thread
+    return scheduler, SourceSchedule(SOURCE, scheduler.initial_interval, 0)
+
+def results(*values):
+    """poll function returning the given new article counts in turn; exceptions are raised"""
+    values = list(values)
+    def poll(source):
+        value = values.pop(0)
+        if isinstance(value, Exception):
+            raise value
+        return value
+    return poll
+
+def test_empty_polls_back_off_up_to_the_maximum():
+    scheduler, schedule = make_scheduler(results(0, 0, 0, 0))
+    intervals = []
+    for _ in range(4):
+        scheduler._poll(schedule)
+        intervals.append(schedule.interval)
+    assert intervals == [1200, 2400, 3600, 3600]
+    assert schedule.last_new == 0
+
+def test_failures_back_off_and_are_counted_until_a_poll_succeeds():
+    scheduler, schedule = make_scheduler(results(ConnectionError("timed out"), ConnectionError("timed out"), 3))
+    scheduler._poll(schedule)
+    scheduler._poll(schedule)
+    assert schedule.failures == 2
+    assert schedule.interval == 2400
+    assert schedule.last_error == "timed out"
+
+    scheduler._poll(schedule)
+    assert schedule.failures == 0
+    assert schedule.last_error is None
+
+def test_interval_follows_the_publishing_rate(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr("scheduler.time.monotonic", lambda: clock[0])
+    scheduler, schedule = make_scheduler(results(5, 6, 1), min_interval=60)
+
+    # The first poll is a baseline; six articles in 30 minutes is one every 5 minutes
+    scheduler._poll(schedule)
+    clock[0] += 1800
+    scheduler._poll(schedule)
+    assert schedule.interval == pytest.approx(300)
+
+    # A much slower hour pulls the smoothed rate down and the interval up
+    clock[0] += 3600
+    scheduler._poll(schedule)
+    assert schedule.rate == pytest.approx(0.3 / 3600 + 0.7 / 300)
+    assert schedule.interval == pytest.approx(1 / schedule.rate)
+    assert schedule.next_poll == clock[0] + schedule.interval
+
+def test_fast_sources_are_not_polled_below_the_minimum():
+    scheduler, schedule = make_scheduler(results(1, 500))
+    scheduler._poll(schedule)
+    scheduler._poll(schedule)
+    assert schedule.interval == 120
+
+def test_jitter_spreads_the_next_poll():
+    scheduler, schedule = make_scheduler(results(*[0] * 20), jitter=0.2, max_interval=600)
+    delays = set()
+    for _ in range(20):
+        scheduler._poll(schedule)
+        delays.add(round(schedule.next_poll - schedule.last_poll, 3))
+    assert len(delays) > 1
+    assert all(480 <= delay <= 720 for delay in delays)
+
+def test_running_scheduler_polls_each_source():
+    polled = threading.Event()
+    def poll(source):
+        polled.set()
+        return 1
+
+    scheduler = SourceScheduler(poll, [SOURCE], jitter=0)
+    scheduler.start()
+    try:
+        assert polled.wait(5)
+    finally:
+        scheduler.stop()
+    assert not scheduler.status()["running"]
+
+def test_only_one_scheduler_runs_per_lock_file(tmp_path):
+    lock_path = str(tmp_path / "data" / "scheduler.lock")
+    first = SourceScheduler(lambda source: 0, [SOURCE], lock_path=lock_path)
+    second = SourceScheduler(lambda source: 0, [SOURCE], lock_path=lock_path)
+
+    assert first.start()
+    assert not second.start()
+    assert not second.running
+
+    # Stopping hands the lock over
+    first.stop()
+    assert second.start()
+    second.stop()
\ No newline at end of file
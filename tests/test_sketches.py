@@ -0,0 +1,96 @@
+import random
+import numpy as np
+import pytest
+from collections import Counter
+from sketches import CountMinSketch, TopK, StreamingPhraseCounter
+
+def zipf_documents(count, length, vocabulary=5000, seed=0):
+    """Documents of words drawn with Zipfian frequencies, like news text"""
+    rng = random.Random(seed)
+    words = [f"w{i}" for i in range(vocabulary)]
+    weights = [1 / rank for rank in range(1, vocabulary + 1)]
+    return [tuple(rng.choices(words, weights, k=length)) for _ in range(count)]
+
+def test_count_min_never_undercounts():
+    sketch = CountMinSketch(epsilon=0.01, delta=0.01)
+    counts = Counter(word for document in zipf_documents(200, 100) for word in document)
+    items = list(counts)
+    sketch.add(items, [counts[item] for item in items])
+
+    estimates = sketch.estimate(items)
+    exact = np.array([counts[item] for item in items])
+    assert sketch.total == sum(counts.values())
+    assert (estimates >= exact).all()
+    # Overcounts beyond epsilon * total are rare
+    assert ((estimates - exact) > 0.01 * sketch.total).mean() < 0.01
+
+def test_merged_sketches_equal_one_sketch():
+    first, second, both = (CountMinSketch(epsilon=0.01) for _ in range(3))
+    first.add(["suva", "nadi"], [3, 1])
+    second.add(["suva", "lautoka"], [2, 5])
+    both.add(["suva", "nadi", "suva", "lautoka"], [3, 1, 2, 5])
+    first.merge(second)
+    assert (first.table == both.table).all()
+    assert first.total == both.total
+
+    with pytest.raises(ValueError):
+        first.merge(CountMinSketch(epsilon=0.1))
+
+def test_top_k_keeps_the_most_frequent_items():
+    sketch = CountMinSketch()
+    tracker = TopK(3, sketch)
+    for item, count in [("a", 10), ("b", 1), ("c", 7), ("d", 2), ("e", 8), ("f", 1)] * 2:
+        sketch.add([item], [count])
+        tracker.offer([item], sketch.estimate([item]))
+    assert tracker.items() == [("a", 20), ("e", 16), ("c", 14)]
+
+def exact_phrases(documents, num_phrases, min_freq=3):
+    """PMI ranking of the bigrams within documents, computed directly"""
+    words = Counter(word for document in documents for word in document)
+    pairs = Counter(pair for document in documents for pair in zip(document, document[1:]))
+    total = sum(words.values())
+    scored = sorted(
+        (-(np.log2(count * total) - np.log2(words[first] * words[second])), f"{first} {second}")
+        for (first, second), count in pairs.items() if count >= min_freq
+    )
+    return [pair for _, pair in scored[:num_phrases]]
+
+def test_phrases_match_exact_pmi_on_a_realistic_vocabulary():
+    documents = zipf_documents(1000, 300)
+    counter = StreamingPhraseCounter()
+    for document in documents:
+        counter.add_document(document)
+
+    assert counter.top_phrases(10) == exact_phrases(documents, 10)
+
+def test_phrases_match_nltk():
+    collocations = pytest.importorskip("nltk.collocations")
+    documents = zipf_documents(300, 100, vocabulary=2000, seed=1)
+    counter = StreamingPhraseCounter()
+    for document in documents:
+        counter.add_document(document)
+
+    finder = collocations.BigramCollocationFinder.from_documents(documents)
+    finder.apply_freq_filter(3)
+    scores = dict(finder.score_ngrams(collocations.BigramAssocMeasures.pmi))
+    phrases = counter.top_phrases(20)
+    assert len(phrases) == 20
+    expected = sorted(scores.values(), reverse=True)[:20]
+    assert [scores[tuple(phrase.split(" "))] for phrase in phrases] == pytest.approx(expected)
+
+def test_merging_counters_equals_counting_everything():
+    documents = zipf_documents(200, 100)
+    whole, first, second = StreamingPhraseCounter(), StreamingPhraseCounter(), StreamingPhraseCounter()
+    for i, document in enumerate(documents):
+        whole.add_document(document)
+        (first if i % 2 else second).add_document(document)
+    first.merge(second)
+
+    assert first.top_phrases(10) == whole.top_phrases(10)
+    assert first.top_topics(10) == whole.top_topics(10)
+
+def test_topics_skip_short_terms():
+    counter = StreamingPhraseCounter()
+    counter.add_document(("fiji", "cyclone", "fiji", "rain", "cyclone", "cyclone", "suva"))
+    assert counter.top_topics(3) == ["cyclone", "fiji", "rain"]
+    assert counter.top_phrases() == []
\ No newline at end of file
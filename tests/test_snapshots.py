@@ -0,0 +1,95 @@
+import os
+import gzip
+import json
+import pytest
+from snapshots import BLOCK_SIZE, is_snapshot, list_snapshots, index_path, save_snapshot, load_snapshot, read_article
+
+def make_news_data(count):
+    news_data = {"Politics": [], "Weather": [], "Sports": []}
+    categories = ["Politics", "Weather"]  # Sports stays empty
+    for i in range(count):
+        category = categories[i % len(categories)]
+        news_data[category].append({
+            "url": f"https://news.test/{i}",
+            "title": f"Story {i} from Nadi – café",
+            "source": "Fiji Times",
+            "published_date": f"2025-01-{1 + i % 28:02d}",
+            "text": f"Body of story {i}. " * 20,
+            "summary": f"Summary {i}",
+            "keywords": ["nadi", str(i)],
+            "category": category
+        })
+    return news_data
+
+def test_round_trip_across_blocks(tmp_path):
+    path = str(tmp_path / "fiji_news_20250101_000000.jsonl.gz")
+    news_data = make_news_data(BLOCK_SIZE * 2 + 5)
+    save_snapshot(path, news_data)
+
+    assert load_snapshot(path) == news_data
+
+def test_list_fields_come_from_the_index(tmp_path):
+    path = str(tmp_path / "fiji_news_20250101_000000.jsonl.gz")
+    news_data = make_news_data(BLOCK_SIZE + 3)
+    save_snapshot(path, news_data)
+
+    light = load_snapshot(path, ["url", "title"])
+    assert list(light) == ["Politics", "Weather", "Sports"]
+    assert light["Sports"] == []
+    originals = [article for articles in news_data.values() for article in articles]
+    for article in light["Politics"] + light["Weather"]:
+        assert set(article) == {"url", "title", "position"}
+        assert read_article(path, article["position"]) == originals[article["position"]]
+        assert read_article(path, article["position"])["url"] == article["url"]
+
+def test_fields_outside_the_index_read_the_data(tmp_path):
+    path = str(tmp_path / "fiji_news_20250101_000000.jsonl.gz")
+    save_snapshot(path, make_news_data(4))
+
+    light = load_snapshot(path, ["url", "summary"])
+    assert [article["summary"] for article in light["Politics"]] == ["Summary 0", "Summary 2"]
+
+def test_data_file_is_plain_gzip_json_lines(tmp_path):
+    path = str(tmp_path / "fiji_news_20250101_000000.jsonl.gz")
+    save_snapshot(path, make_news_data(BLOCK_SIZE + 1))
+
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        lines = [json.loads(line) for line in f]
+    assert len(lines) == BLOCK_SIZE + 1
+    with gzip.open(index_path(path), 'rt', encoding='utf-8') as f:
+        index = json.load(f)
+    assert "text" not in index["articles"][0] and "summary" not in index["articles"][0]
+
+def test_read_article_out_of_range(tmp_path):
+    path = str(tmp_path / "fiji_news_20250101_000000.jsonl.gz")
+    save_snapshot(path, make_news_data(2))
+
+    with pytest.raises(IndexError):
+        read_article(path, 2)
+    with pytest.raises(IndexError):
+        read_article(path, -1)
+
+def test_legacy_json_snapshot(tmp_path):
+    path = tmp_path / "fiji_news_20240101_000000.json"
+    news_data = make_news_data(3)
+    for articles in news_data.values():
+        for article in articles:
+            del article["category"]
+    path.write_text(json.dumps(news_data), encoding='utf-8')
+
+    loaded = load_snapshot(str(path))
+    assert loaded["Weather"][0]["category"] == "Weather"
+    # Positions follow the file, category by category
+    assert read_article(str(path), 1)["url"] == "https://news.test/2"
+
+def test_snapshot_names(tmp_path):
+    assert is_snapshot("fiji_news_20250101_000000.json")
+    assert is_snapshot("fiji_news_20250101_000000.jsonl.gz")
+    assert not is_snapshot("fiji_news_20250101_000000.idx")
+    assert not is_snapshot("summary_20250101_000000.txt")
+
+    for name in ("fiji_news_20250102_000000.jsonl.gz", "fiji_news_20250101_000000.json", "notes.txt"):
+        (tmp_path / name).write_text("{}")
+    assert [os.path.basename(p) for p in list_snapshots(str(tmp_path))] == [
+        "fiji_news_20250101_000000.json", "fiji_news_20250102_000000.jsonl.gz"
+    ]
\ No newline at end of file
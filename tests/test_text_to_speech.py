@@ -0,0 +1,110 @@
+import time
+import threading
+import pytest
+from text_to_speech import TextToSpeech
+
+class LocalSynthesizer:
+    """Stand-in for gTTS that returns the text itself as audio after a delay"""
+    name = 'local'
+    extension = 'mp3'
+    concatenable = True
+
+    def __init__(self, delay=0.0, voice='en', rate='normal'):
+        self.delay = delay
+        self.voice = voice
+        self.rate = rate
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def synthesize(self, text):
+        with self.lock:
+            self.calls.append(text)
+        time.sleep(self.delay)
+        return f"[{text}]".encode('utf-8')
+
+BRIEFING = (
+    "Heavy rain is expected in the west. Roads near Ba may flood overnight. "
+    "Schools in Lautoka will open late on Monday. The weather office will update the warning at noon."
+)
+
+@pytest.fixture(autouse=True)
+def workdir(tmp_path, monkeypatch):
+    # Audio files are written to data/ of the working directory
+    monkeypatch.chdir(tmp_path)
+
+def test_chunks_are_whole_sentences_within_the_limit():
+    tts = TextToSpeech(LocalSynthesizer(), chunk_chars=80)
+    chunks = tts._chunks(BRIEFING)
+    assert " ".join(chunks) == BRIEFING
+    assert all(len(chunk) <= 80 and chunk.endswith(".") for chunk in chunks)
+    assert len(chunks) == 3
+
+def test_long_sentences_are_broken_between_words():
+    tts = TextToSpeech(LocalSynthesizer(), chunk_chars=20)
+    chunks = tts._chunks("One two three four five six seven eight nine ten.")
+    assert all(len(chunk) <= 20 for chunk in chunks)
+    assert " ".join(chunks) == "One two three four five six seven eight nine ten."
+
+def test_chunks_are_synthesized_in_parallel_and_joined_in_order():
+    backend = LocalSynthesizer(delay=0.3)
+    tts = TextToSpeech(backend, max_workers=4, chunk_chars=80)
+
+    start = time.monotonic()
+    filename = tts.convert(BRIEFING)
+    assert time.monotonic() - start < 0.6
+
+    with open(filename, 'rb') as f:
+        assert f.read() == b"".join(f"[{chunk}]".encode('utf-8') for chunk in tts._chunks(BRIEFING))
+
+def test_same_text_voice_and_rate_reuse_the_audio():
+    backend = LocalSynthesizer()
+    tts = TextToSpeech(backend, chunk_chars=80)
+    filename = tts.convert(BRIEFING)
+    calls = len(backend.calls)
+
+    assert tts.convert(BRIEFING) == filename
+    assert len(backend.calls) == calls
+
+    # Another voice or rate is different audio
+    assert TextToSpeech(LocalSynthesizer(voice='en-au')).cache_filename(BRIEFING) != filename
+    assert TextToSpeech(LocalSynthesizer(rate='slow')).cache_filename(BRIEFING) != filename
+
+def test_backends_that_cannot_be_concatenated_get_the_whole_text():
+    backend = LocalSynthesizer()
+    backend.concatenable = False
+    tts = TextToSpeech(backend, chunk_chars=80)
+    tts.convert(BRIEFING)
+    assert backend.calls == [BRIEFING]
+
+def test_stream_yields_chunks_in_order_and_caches_the_file():
+    backend = LocalSynthesizer(delay=0.05)
+    tts = TextToSpeech(backend, chunk_chars=80)
+    parts = list(tts.stream(BRIEFING))
+    assert parts == [f"[{chunk}]".encode('utf-8') for chunk in tts._chunks(BRIEFING)]
+
+    with open(tts.cache_filename(BRIEFING), 'rb') as f:
+        assert f.read() == b"".join(parts)
+    calls = len(backend.calls)
+    assert b"".join(tts.stream(BRIEFING)) == b"".join(parts)
+    assert len(backend.calls) == calls
+
+def test_background_jobs_report_their_file():
+    tts = TextToSpeech(LocalSynthesizer(), chunk_chars=80)
+    job_id = tts.submit(BRIEFING)
+    tts.job_pool.shutdown(wait=True)
+    assert tts.job_status(job_id) == {"status": "done", "audio_file": tts.cache_filename(BRIEFING), "error": None}
+    assert tts.job_status("missing") is None
+
+class OfflineSynthesizer(LocalSynthesizer):
+    """Stand-in for gTTS without an internet connection"""
+    def synthesize(self, text):
+        raise ConnectionError("No internet")
+
+def test_conversion_fails_fast_when_neither_engine_works():
+    tts = TextToSpeech(OfflineSynthesizer())
+    tts.offline_worker.unavailable = "No speech driver found"
+
+    start = time.monotonic()
+    with pytest.raises(RuntimeError, match="unavailable"):
+        tts.convert(BRIEFING)
+    assert time.monotonic() - start < 1
\ No newline at end of file
@@ -0,0 +1,88 @@
+import math
+import datetime
+import pytest
+from threat_monitor import ThreatMonitor, poisson_tail
+
+TODAY = datetime.date(2025, 3, 20)
+
+@pytest.fixture
+def monitor(tmp_path):
+    monitor = ThreatMonitor(str(tmp_path / "data" / "threats.db"))
+    yield monitor
+    monitor.close()
+
+def day(offset):
+    return (TODAY + datetime.timedelta(days=offset)).strftime("%Y-%m-%d")
+
+def make_article(name, text, published_date, source="Fiji Sun"):
+    return {"url": f"https://news.test/{name}", "title": "Council news", "text": text,
+            "source": source, "published_date": published_date}
+
+def quiet_baseline(monitor, days=5, per_day=20):
+    """A fortnight's worth of ordinary news without threat keywords"""
+    monitor.observe([
+        make_article(f"quiet-{d}-{i}", "The town council met to discuss the new market.", day(-d))
+        for d in range(1, days + 1) for i in range(per_day)
+    ], today=TODAY)
+
+def test_poisson_tail():
+    assert poisson_tail(0, 2.0) == 1.0
+    assert poisson_tail(3, 0) == 0.0
+    assert poisson_tail(1, 1.0) == pytest.approx(1 - math.exp(-1))
+    assert poisson_tail(2, 1.0) == pytest.approx(1 - 2 * math.exp(-1))
+    assert poisson_tail(500, 400.0) < 1e-6
+
+def test_score_weights_keywords(monitor):
+    scored = monitor.score({"title": "Riot in the capital", "text": "Police raised a concern about violence."})
+    assert scored["keywords"] == ["riot", "violence", "concern"]
+    assert scored["score"] == 3.0 + 3.0 + 0.5
+
+def test_spike_of_a_strong_keyword_alerts_where_a_weak_one_does_not(monitor):
+    quiet_baseline(monitor)
+    alerts = monitor.observe([
+        make_article(f"today-{i}", "Police say the riot was a serious issue." if i < 3 else "The market opened.", day(0))
+        for i in range(5)
+    ], today=TODAY)
+
+    # Three of five articles is unlikely for any keyword the baseline never saw, but an
+    # everyday word like "issue" needs far stronger evidence than "riot"
+    assert {(alert["keyword"], alert["source"]) for alert in alerts} == {("riot", "Fiji Sun"), ("riot", "all sources")}
+    assert alerts[0]["count"] == 3
+    assert len(alerts[0]["articles"]) == 3
+
+def test_each_keyword_source_and_day_alerts_once(monitor):
+    quiet_baseline(monitor)
+    articles = [make_article(f"riot-{i}", "A riot broke out.", day(0)) for i in range(5)]
+    first = monitor.observe(articles[:3], today=TODAY)
+    assert len(first) == 2
+
+    # More hits update the alert; the same articles again are not counted twice
+    assert monitor.observe(articles, today=TODAY) == []
+    stored = monitor.alerts()
+    assert [alert["count"] for alert in stored] == [5, 5]
+    assert monitor.alerts(after=stored[0]["id"]) == stored[1:]
+
+def test_no_alert_without_enough_evidence(monitor):
+    quiet_baseline(monitor, days=1, per_day=10)
+    # Too little baseline to judge
+    assert monitor.observe([make_article(f"a-{i}", "A riot broke out.", day(0)) for i in range(5)], today=TODAY) == []
+
+def test_no_alert_below_the_minimum_count(monitor):
+    quiet_baseline(monitor)
+    assert monitor.observe([make_article(f"a-{i}", "A riot broke out.", day(0)) for i in range(2)], today=TODAY) == []
+
+def test_old_articles_only_build_the_baseline(monitor):
+    quiet_baseline(monitor)
+    old = [make_article(f"old-{i}", "A riot broke out.", "2024-01-01") for i in range(5)]
+    assert monitor.observe(old, today=TODAY) == []
+
+def test_usual_keyword_rates_do_not_alert(monitor):
+    # Protests are in the news every day, so three today is nothing unusual
+    monitor.observe([
+        make_article(f"base-{d}-{i}", "Students held a protest." if i < 3 else "The market opened.", day(-d))
+        for d in range(1, 8) for i in range(5)
+    ], today=TODAY)
+    assert monitor.observe([
+        make_article(f"today-{i}", "Students held a protest." if i < 3 else "The market opened.", day(0))
+        for i in range(5)
+    ], today=TODAY) == []
\ No newline at end of file
@@ -0,0 +1,117 @@
+import os
+import time
+import textwrap
+import pytest
+from tts_worker import OfflineSpeechWorker
+
+ENGINES = {
+    "working": """
+        import os
+
+        class Engine:
+            def __init__(self):
+                self.pending = []
+            def setProperty(self, name, value):
+                pass
+            def getProperty(self, name):
+                return []
+            def save_to_file(self, text, path):
+                if text == "crash":
+                    os._exit(1)
+                self.pending.append(path)
+            def runAndWait(self):
+                for path in self.pending:
+                    with open(path, "wb") as f:
+                        f.write(b"RIFF")
+                self.pending = []
+
+        def init():
+            return Engine()
+    """,
+    "no_driver": """
+        def init():
+            raise RuntimeError("No speech driver found")
+    """,
+    "crashing": """
+        import os
+
+        def init():
+            with open(os.environ["TTS_STARTS"], "a") as f:
+                f.write("start\\n")
+            os._exit(1)
+    """,
+}
+
+def use_engine(tmp_path, monkeypatch, name):
+    """Put a stand-in pyttsx3 on the path the spawned workers import from"""
+    directory = tmp_path / "engine"
+    directory.mkdir()
+    (directory / "pyttsx3.py").write_text(textwrap.dedent(ENGINES[name]))
+    monkeypatch.syspath_prepend(str(directory))
+    monkeypatch.setenv("TTS_STARTS", str(tmp_path / "starts.txt"))
+
+@pytest.fixture
+def make_worker(tmp_path):
+    workers = []
+    def make(**settings):
+        worker = OfflineSpeechWorker(output_dir=str(tmp_path), check_interval=0.1, **settings)
+        workers.append(worker)
+        return worker
+    yield make
+    for worker in workers:
+        if worker.jobs_queue is not None:
+            worker.close()
+
+def test_jobs_are_synthesized_by_the_worker(tmp_path, monkeypatch, make_worker):
+    use_engine(tmp_path, monkeypatch, "working")
+    worker = make_worker(processes=2)
+    job_ids = [worker.submit(f"Bulletin {i}") for i in range(4)]
+
+    paths = [worker.wait(job_id, timeout=60) for job_id in job_ids]
+    assert len(set(paths)) == 4
+    assert all(os.path.exists(path) for path in paths)
+    assert worker.status(job_ids[0]) is None
+
+def test_engine_that_cannot_start_is_reported_unavailable(tmp_path, monkeypatch, make_worker):
+    use_engine(tmp_path, monkeypatch, "no_driver")
+    worker = make_worker()
+    job_id = worker.submit("Bulletin")
+
+    start = time.monotonic()
+    with pytest.raises(RuntimeError, match="No speech driver found"):
+        worker.wait(job_id, timeout=60)
+    assert time.monotonic() - start < 30
+
+    # Later requests fail straight away instead of queueing for a worker
+    with pytest.raises(RuntimeError, match="unavailable"):
+        worker.submit("Bulletin")
+
+def test_workers_dying_before_starting_fail_queued_jobs_and_stop_restarting(tmp_path, monkeypatch, make_worker):
+    use_engine(tmp_path, monkeypatch, "crashing")
+    worker = make_worker(restart_delay=0.1, max_restarts=3)
+    job_id = worker.submit("Bulletin")
+
+    with pytest.raises(RuntimeError, match="exited before starting"):
+        worker.wait(job_id, timeout=60)
+
+    # Restarts back off and end after max_restarts crashes in a row
+    deadline = time.monotonic() + 60
+    while worker.unavailable is None and time.monotonic() < deadline:
+        time.sleep(0.1)
+    assert worker.unavailable is not None
+    time.sleep(1)
+    with open(tmp_path / "starts.txt") as f:
+        assert len(f.readlines()) == 3
+    with pytest.raises(RuntimeError, match="unavailable"):
+        worker.submit("Bulletin")
+
+def test_crash_during_a_job_fails_only_that_job(tmp_path, monkeypatch, make_worker):
+    use_engine(tmp_path, monkeypatch, "working")
+    worker = make_worker(restart_delay=0.1)
+
+    with pytest.raises(RuntimeError, match="exited"):
+        worker.wait(worker.submit("crash"), timeout=60)
+
+    # The worker is replaced and takes the next job
+    assert os.path.exists(worker.wait(worker.submit("Bulletin"), timeout=60))
+    assert worker.crashes == 0
\ No newline at end of file
@@ -1,72 +1,203 @@
 import os
-import datetime
-import pyttsx3
+import io
+import re
+import uuid
+import hashlib
 from gtts import gTTS
 import threading
+from concurrent.futures import ThreadPoolExecutor
+from tts_worker import OfflineSpeechWorker
+from instrumentation import STAGE_SECONDS, IN_FLIGHT, timed
+
+class GTTSBackend:
+    """Online synthesis with gTTS (requires internet)"""
+    name = 'gtts'
+    extension = 'mp3'
+    concatenable = True  # MP3 frames play back to back, so chunk audio can simply be joined
+    
+    def __init__(self, lang='en', slow=False):
+        self.voice = lang
+        self.rate = 'slow' if slow else 'normal'
+        self.slow = slow
+    
+    def synthesize(self, text):
+        """Return MP3 data for a piece of text"""
+        buffer = io.BytesIO()
+        gTTS(text=text, lang=self.voice, slow=self.slow).write_to_fp(buffer)
+        return buffer.getvalue()
 
 class TextToSpeech:
-    def __init__(self):
+    def __init__(self, online_backend=None, max_workers=4, chunk_chars=500):
         # Create the audio directory if it doesn't exist
         if not os.path.exists('data'):
             os.makedirs('data')
         
-        # Initialize pyttsx3 TTS engine
-        self.offline_engine = pyttsx3.init()
+        # Any object with name, extension, voice, rate and synthesize(text) -> bytes can
+        # stand in for gTTS, e.g. a local synthesizer in tests. Only backends that set
+        # concatenable have texts split into chunks; others synthesize a text in one piece
+        self.online_backend = online_backend or GTTSBackend()
         
-        # Configure voice properties
-        self.offline_engine.setProperty('rate', 150)  # Speed of speech
-        self.offline_engine.setProperty('volume', 0.9)  # Volume (0.0 to 1.0)
+        # Chunks are synthesized in parallel, so long texts take about as long as one chunk
+        self.max_workers = max_workers
+        self.chunk_chars = chunk_chars
+        self.synthesis_pool = ThreadPoolExecutor(max_workers=max_workers)
         
-        # Get available voices and set to a English voice if available
-        voices = self.offline_engine.getProperty('voices')
-        for voice in voices:
-            if "english" in voice.name.lower():
-                self.offline_engine.setProperty('voice', voice.id)
-                break
+        # pyttsx3 runs in its own worker process, started on the first offline request
+        self.offline_worker = OfflineSpeechWorker(output_dir='data', rate=150, volume=0.9)
+        self.offline_timeout = 300  # Seconds to wait for an offline job
+        
+        # Background conversions that callers can poll by job ID
+        self.jobs = {}
+        self.max_jobs = 100
+        self.jobs_lock = threading.Lock()
+        self.job_pool = ThreadPoolExecutor(max_workers=max_workers)
     
+    @timed("tts")
     def convert(self, text):
         """Convert text to speech and return the filename"""
         if not text:
             return None
         
-        # Create a timestamp for the filename
-        timestamp = datetime.datetime.now().strftime("%Y%m%d_%H%M%S")
-        filename = f"data/audio_{timestamp}.mp3"
+        # Audio for the same text, voice and rate is reused from earlier conversions
+        filename = self.cache_filename(text)
+        if os.path.exists(filename):
+            return filename
         
         # Try to use gTTS (online) first, fall back to pyttsx3 (offline)
         try:
             self._convert_online(text, filename)
         except Exception as e:
             print(f"Online TTS failed: {str(e)}. Falling back to offline TTS.")
-            self._convert_offline(text, filename)
+            filename = self._convert_offline(text)
         
         return filename
     
+    def cache_filename(self, text):
+        """Filename of the online audio for a text, keyed by hash(text, voice, rate)"""
+        backend = self.online_backend
+        key = hashlib.sha256(f"{backend.name}|{backend.voice}|{backend.rate}|{text}".encode('utf-8')).hexdigest()
+        return f"data/audio_{key[:32]}.{backend.extension}"
+    
+    def stream(self, text):
+        """Yield audio in order as each chunk is synthesized, caching the complete file"""
+        filename = self.cache_filename(text)
+        if os.path.exists(filename):
+            with open(filename, 'rb') as f:
+                for block in iter(lambda: f.read(64 * 1024), b''):
+                    yield block
+            return
+        
+        chunks = self._chunks(text)
+        futures = [self.synthesis_pool.submit(self._synthesize_chunk, chunk) for chunk in chunks]
+        
+        # The first sentence can play while later chunks are still being synthesized
+        audio_parts = []
+        try:
+            for future in futures:
+                part = future.result()
+                audio_parts.append(part)
+                yield part
+        finally:
+            for future in futures:
+                future.cancel()
+        
+        self._write_audio(filename, audio_parts)
+    
+    def _chunks(self, text):
+        """Pieces of text to synthesize separately; one piece unless the backend's audio can be concatenated"""
+        if getattr(self.online_backend, 'concatenable', False):
+            return self._split_sentences(text)
+        return [text] if text.strip() else []
+    
+    def _split_sentences(self, text):
+        """Split text into chunks of whole sentences no longer than chunk_chars"""
+        sentences = [s for s in re.split(r'(?<=[.!?])\s+|\n+', text) if s.strip()]
+        
+        chunks = []
+        current = ""
+        for sentence in sentences:
+            # A single over-long sentence is broken between words
+            while len(sentence) > self.chunk_chars:
+                cut = sentence.rfind(' ', 0, self.chunk_chars)
+                if cut <= 0:
+                    cut = self.chunk_chars
+                if current:
+                    chunks.append(current)
+                    current = ""
+                chunks.append(sentence[:cut].strip())
+                sentence = sentence[cut:].strip()
+            
+            if current and len(current) + 1 + len(sentence) > self.chunk_chars:
+                chunks.append(current)
+                current = sentence
+            else:
+                current = f"{current} {sentence}" if current else sentence
+        
+        if current:
+            chunks.append(current)
+        return chunks
+    
     def _convert_online(self, text, filename):
-        """Convert text to speech using gTTS (requires internet)"""
-        # Break text into chunks if it's very long (gTTS has limits)
-        max_chars = 5000
-        chunks = [text[i:i+max_chars] for i in range(0, len(text), max_chars)]
+        """Synthesize sentence chunks in parallel and stitch them into one file"""
+        chunks = self._chunks(text)
+        if not chunks:
+            raise ValueError("No text to synthesize")
         
-        # Process only the first chunk for now to avoid lengthy processing
-        # In a production system, you might want to process all chunks and combine them
-        if chunks:
-            tts = gTTS(text=chunks[0], lang='en', slow=False)
-            tts.save(filename)
-    
-    def _convert_offline(self, text, filename):
-        """Convert text to speech using pyttsx3 (offline)"""
-        # pyttsx3 doesn't support mp3 directly, so we'll save as .wav initially
-        wav_file = filename.replace('.mp3', '.wav')
+        audio_parts = list(self.synthesis_pool.map(self._synthesize_chunk, chunks))
+        self._write_audio(filename, audio_parts)
+    
+    def _synthesize_chunk(self, chunk):
+        """Synthesize one chunk with the online backend"""
+        with IN_FLIGHT.track_in_flight(operation="tts_chunk"), STAGE_SECONDS.time(stage="tts_chunk"):
+            return self.online_backend.synthesize(chunk)
+    
+    def _write_audio(self, filename, audio_parts):
+        """Stitch synthesized chunks into one file"""
+        # Several parts only come from concatenable backends (see _chunks). Write to a temporary
+        # file first so a failed or concurrent conversion never leaves a partial cache entry.
+        temp_filename = f"{filename}.{threading.get_ident()}.tmp"
+        with open(temp_filename, 'wb') as f:
+            for part in audio_parts:
+                f.write(part)
+        os.replace(temp_filename, filename)
+    
+    @timed("tts_offline")
+    def _convert_offline(self, text):
+        """Convert text to speech using pyttsx3 (offline) and return the WAV filename"""
+        job_id = self.offline_worker.submit(text)
+        return self.offline_worker.wait(job_id, timeout=self.offline_timeout)
+    
+    def submit(self, text):
+        """Start converting text in the background and return a job ID to poll"""
+        job_id = uuid.uuid4().hex
+        with self.jobs_lock:
+            self.jobs[job_id] = {"status": "running", "audio_file": None, "error": None}
+            
+            # Forget the oldest finished jobs
+            finished = [key for key, job in self.jobs.items() if job["status"] != "running"]
+            for key in finished[:max(0, len(self.jobs) - self.max_jobs)]:
+                del self.jobs[key]
         
-        # Save to file
-        self.offline_engine.save_to_file(text, wav_file)
-        self.offline_engine.runAndWait()
+        self.job_pool.submit(self._run_job, job_id, text)
+        return job_id
+    
+    def _run_job(self, job_id, text):
+        """Run a background conversion and record its outcome"""
+        try:
+            audio_file = self.convert(text)
+            update = {"status": "done", "audio_file": audio_file}
+        except Exception as e:
+            print(f"Speech job {job_id} failed: {str(e)}")
+            update = {"status": "failed", "error": str(e)}
         
-        # In a real application, you might want to convert .wav to .mp3 here
-        # For simplicity, we'll just rename the file
-        if os.path.exists(wav_file):
-            os.rename(wav_file, filename)
+        with self.jobs_lock:
+            self.jobs[job_id].update(update)
+    
+    def job_status(self, job_id):
+        """State of a background conversion, or None if the ID is unknown"""
+        with self.jobs_lock:
+            job = self.jobs.get(job_id)
+            return dict(job) if job else None
     
     def convert_async(self, text, callback=None):
         """Convert text to speech asynchronously"""
@@ -79,4 +210,4 @@ class TextToSpeech:
         """Internal method for asynchronous conversion"""
         filename = self.convert(text)
         if callback:
-            callback(filename) 
\ No newline at end of file
+            callback(filename)
\ No newline at end of file
@@ -0,0 +1,269 @@
+import os
+import json
+import math
+import sqlite3
+import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from keyword_matcher import KeywordMatcher
+from instrumentation import registry
+
+# Keywords that may signal a threat to stability, shared with the trend analysis
+THREAT_KEYWORDS = [
+    'protest', 'riot', 'unrest', 'violence', 'conflict', 'strike', 'coup',
+    'demonstration', 'crisis', 'tension', 'opposition', 'controversial',
+    'disaster', 'emergency', 'threat', 'attack', 'warning', 'security',
+    'concern', 'issue', 'problem', 'critical', 'serious', 'dispute',
+    'political instability', 'economic crisis', 'corruption', 'scandal'
+]
+
+# How much a keyword says about a threat; everyday words like "issue" count for little
+KEYWORD_WEIGHTS = {
+    'riot': 3.0, 'coup': 3.0, 'violence': 3.0, 'attack': 3.0, 'unrest': 2.5,
+    'political instability': 2.5, 'economic crisis': 2.0, 'emergency': 2.0, 'disaster': 2.0,
+    'protest': 2.0, 'demonstration': 1.5, 'strike': 1.5, 'crisis': 1.5, 'conflict': 1.5,
+    'concern': 0.5, 'issue': 0.5, 'problem': 0.5, 'serious': 0.5, 'critical': 0.5, 'opposition': 0.5
+}
+
+# Counts for every source together are kept under this source name
+ALL_SOURCES = '*'
+
+ALERTS = registry.counter(
+    'fiji_threat_alerts_total', 'Threat spike alerts raised, by keyword', ['keyword']
+)
+
+def poisson_tail(count, expected):
+    """Probability of seeing count or more events when expected are due (Poisson upper tail)"""
+    if count <= 0:
+        return 1.0
+    if expected <= 0:
+        return 0.0
+    # 1 - P(X < count), summing the terms iteratively so large counts don't overflow
+    term = math.exp(-expected)
+    below = term
+    for i in range(1, count):
+        term *= expected / i
+        below += term
+    return max(1.0 - below, 0.0)
+
+class ThreatMonitor:
+    """Scores articles for threat keywords as they are ingested and raises alerts on spikes
+
+    Keyword hits and article volumes are counted per source and per day. The hits of
+    a keyword on the current day are compared with its rate per article over the
+    previous baseline_days; a count that is very unlikely under that rate (Poisson
+    tail below p_threshold) raises an alert. The threshold is raised to the power
+    1 / KEYWORD_WEIGHTS[keyword], so a spike of "riot" alerts on weaker evidence
+    than one of "issue". The alert is delivered to the optional webhook and kept
+    for the /threat_alerts endpoint.
+    """
+    def __init__(self, db_path='data/threats.db', keywords=THREAT_KEYWORDS, webhook_url=None,
+                 baseline_days=14, min_baseline_articles=20, min_count=3, p_threshold=0.001, max_age_days=2):
+        # Create the data directory if it doesn't exist
+        directory = os.path.dirname(db_path)
+        if directory and not os.path.exists(directory):
+            os.makedirs(directory)
+
+        self.keywords = list(keywords)
+        self.matcher = KeywordMatcher({"threat": self.keywords})
+        self.webhook_url = webhook_url
+        self.baseline_days = baseline_days
+        self.min_baseline_articles = min_baseline_articles
+        self.min_count = min_count
+        self.p_threshold = p_threshold
+        # Older articles still build the baseline but are no news to alert about
+        self.max_age_days = max_age_days
+
+        # Webhook calls run one at a time off the ingest path, in the order alerts were raised
+        self.delivery = ThreadPoolExecutor(max_workers=1) if webhook_url else None
+
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS keyword_counts (
+                keyword TEXT, source TEXT, day TEXT, count INTEGER,
+                PRIMARY KEY (keyword, source, day)
+            );
+            CREATE TABLE IF NOT EXISTS article_counts (
+                source TEXT, day TEXT, count INTEGER,
+                PRIMARY KEY (source, day)
+            );
+            CREATE TABLE IF NOT EXISTS hits (keyword TEXT, source TEXT, day TEXT, url TEXT, title TEXT, score REAL);
+            CREATE INDEX IF NOT EXISTS idx_hits ON hits (keyword, day);
+            CREATE TABLE IF NOT EXISTS alerts (
+                id INTEGER PRIMARY KEY,
+                raised_at TEXT,
+                day TEXT,
+                keyword TEXT,
+                source TEXT,
+                count INTEGER,
+                expected REAL,
+                p_value REAL,
+                articles TEXT,
+                UNIQUE (day, keyword, source)
+            );
+            -- Each article URL is counted once, however often it is ingested
+            CREATE TABLE IF NOT EXISTS observed (url TEXT PRIMARY KEY);
+        """)
+        self.conn.commit()
+
+    def score(self, article):
+        """Threat keywords found in an article and its weighted score"""
+        found = set(self.matcher.scan(article['text'])["threat"])
+        found.update(self.matcher.scan(article['title'])["threat"])
+        keywords = [keyword for keyword in self.keywords if keyword in found]
+        return {"keywords": keywords, "score": sum(KEYWORD_WEIGHTS.get(keyword, 1.0) for keyword in keywords)}
+
+    def observe(self, articles, today=None):
+        """Count articles not seen before and return the alerts they raise, one article at a time"""
+        today = today or datetime.date.today()
+        alerts = []
+
+        with self.lock:
+            for article in articles:
+                if self.conn.execute("SELECT 1 FROM observed WHERE url = ?", (article["url"],)).fetchone():
+                    continue
+                self.conn.execute("INSERT INTO observed VALUES (?)", (article["url"],))
+                alerts.extend(self._observe(article, today))
+            self.conn.commit()
+
+        for alert in alerts:
+            ALERTS.inc(keyword=alert["keyword"])
+            print(f"Threat alert: {alert['count']} articles mention '{alert['keyword']}' "
+                  f"({alert['source']}, {alert['day']}), {alert['expected']:.1f} expected")
+            if self.delivery is not None:
+                self.delivery.submit(self._deliver, alert)
+        return alerts
+
+    def _observe(self, article, today):
+        """Add one article to the counts and check the keywords it mentions for spikes"""
+        day = article.get("published_date")
+        if not day:
+            return []
+
+        scopes = (article["source"], ALL_SOURCES)
+        for source in scopes:
+            self.conn.execute(
+                "INSERT INTO article_counts VALUES (?, ?, 1) ON CONFLICT DO UPDATE SET count = count + 1", (source, day)
+            )
+
+        scored = self.score(article)
+        if not scored["keywords"]:
+            return []
+
+        alerts = []
+        for keyword in scored["keywords"]:
+            self.conn.execute(
+                "INSERT INTO hits VALUES (?, ?, ?, ?, ?, ?)",
+                (keyword, article["source"], day, article["url"], article["title"], scored["score"])
+            )
+            for source in scopes:
+                self.conn.execute(
+                    "INSERT INTO keyword_counts VALUES (?, ?, ?, 1) ON CONFLICT DO UPDATE SET count = count + 1",
+                    (keyword, source, day)
+                )
+                alert = self._check_spike(keyword, source, day, today)
+                if alert is not None:
+                    alerts.append(alert)
+        return alerts
+
+    def _check_spike(self, keyword, source, day, today):
+        """Alert if today's hits of a keyword are far above its baseline rate, or None"""
+        try:
+            current = datetime.datetime.strptime(day, "%Y-%m-%d").date()
+        except ValueError:
+            return None
+        if (today - current).days > self.max_age_days:
+            return None
+
+        # The rolling baseline is the days before the one being checked
+        start = (current - datetime.timedelta(days=self.baseline_days)).strftime("%Y-%m-%d")
+        baseline_articles = self.conn.execute(
+            "SELECT COALESCE(SUM(count), 0) FROM article_counts WHERE source = ? AND day >= ? AND day < ?",
+            (source, start, day)
+        ).fetchone()[0]
+        if baseline_articles < self.min_baseline_articles:
+            return None
+
+        baseline_hits = self.conn.execute(
+            "SELECT COALESCE(SUM(count), 0) FROM keyword_counts WHERE keyword = ? AND source = ? AND day >= ? AND day < ?",
+            (keyword, source, start, day)
+        ).fetchone()[0]
+        count = self.conn.execute(
+            "SELECT count FROM keyword_counts WHERE keyword = ? AND source = ? AND day = ?", (keyword, source, day)
+        ).fetchone()[0]
+        articles = self.conn.execute(
+            "SELECT count FROM article_counts WHERE source = ? AND day = ?", (source, day)
+        ).fetchone()[0]
+
+        # Expected hits at the baseline rate per article; the +1 keeps unseen keywords from alerting on one hit
+        expected = (baseline_hits + 1) / (baseline_articles + 1) * articles
+        p_value = poisson_tail(count, expected)
+        # With p_threshold 0.001, weight 3 alerts below 0.1 and weight 0.5 only below 0.000001
+        threshold = self.p_threshold ** (1 / KEYWORD_WEIGHTS.get(keyword, 1.0))
+        if count < self.min_count or p_value >= threshold:
+            return None
+
+        # One alert per keyword, source and day; later hits only update it
+        existing = self.conn.execute(
+            "SELECT id FROM alerts WHERE day = ? AND keyword = ? AND source = ?", (day, keyword, source)
+        ).fetchone()
+        recent = [
+            dict(row) for row in self.conn.execute(
+                f"""SELECT url, title, source, score FROM hits WHERE keyword = ? AND day = ?
+                    {'' if source == ALL_SOURCES else 'AND source = ?'} ORDER BY rowid DESC LIMIT 10""",
+                (keyword, day) if source == ALL_SOURCES else (keyword, day, source)
+            )
+        ]
+        values = (count, expected, p_value, json.dumps(recent))
+        if existing:
+            self.conn.execute(
+                "UPDATE alerts SET count = ?, expected = ?, p_value = ?, articles = ? WHERE id = ?", values + (existing[0],)
+            )
+            return None
+
+        raised_at = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+        alert_id = self.conn.execute(
+            "INSERT INTO alerts (raised_at, day, keyword, source, count, expected, p_value, articles) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (raised_at, day, keyword, source) + values
+        ).lastrowid
+        return {
+            "id": alert_id, "raised_at": raised_at, "day": day, "keyword": keyword,
+            "source": "all sources" if source == ALL_SOURCES else source,
+            "count": count, "expected": round(expected, 2), "p_value": p_value, "articles": recent
+        }
+
+    def _deliver(self, alert):
+        """POST an alert to the webhook"""
+        import requests
+
+        try:
+            response = requests.post(self.webhook_url, json=alert, timeout=10)
+            response.raise_for_status()
+        except Exception as e:
+            print(f"Could not deliver threat alert {alert['id']} to {self.webhook_url}: {str(e)}")
+
+    def alerts(self, after=0, limit=100):
+        """Alerts with an ID above after, oldest first, so clients can poll for new ones"""
+        with self.lock:
+            rows = self.conn.execute(
+                "SELECT * FROM alerts WHERE id > ? ORDER BY id LIMIT ?", (after, limit)
+            ).fetchall()
+
+        alerts = []
+        for row in rows:
+            alert = dict(row)
+            alert["source"] = "all sources" if alert["source"] == ALL_SOURCES else alert["source"]
+            alert["expected"] = round(alert["expected"], 2)
+            alert["articles"] = json.loads(alert["articles"])
+            alerts.append(alert)
+        return alerts
+
+    def close(self):
+        """Close the database connection"""
+        if self.delivery is not None:
+            self.delivery.shutdown()
+        with self.lock:
+            self.conn.close()
\ No newline at end of file
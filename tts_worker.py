@@ -0,0 +1,241 @@
+import os
+import time
+import uuid
+import queue
+import threading
+import multiprocessing
+
+def _worker_main(jobs, results, rate, volume):
+    """Worker process loop; each process owns exactly one pyttsx3 engine"""
+    try:
+        import pyttsx3
+
+        engine = pyttsx3.init()
+
+        # Configure voice properties
+        engine.setProperty('rate', rate)  # Speed of speech
+        engine.setProperty('volume', volume)  # Volume (0.0 to 1.0)
+
+        # Get available voices and set to a English voice if available
+        for voice in engine.getProperty('voices'):
+            if "english" in voice.name.lower():
+                engine.setProperty('voice', voice.id)
+                break
+    except Exception as e:
+        # Without a working engine (no pyttsx3, no speech driver) no job can ever succeed
+        results.put(("unavailable", None, str(e)))
+        return
+
+    results.put(("ready", None, os.getpid()))
+    while True:
+        job = jobs.get()
+        if job is None:
+            break
+
+        job_id, text, path = job
+        # Tells the parent which process holds the job, in case the process dies with it
+        results.put(("started", job_id, os.getpid()))
+        try:
+            # runAndWait is not re-entrant, so jobs are handled strictly one at a time
+            engine.save_to_file(text, path)
+            engine.runAndWait()
+            if not os.path.exists(path):
+                raise RuntimeError("The speech engine did not write any audio")
+            results.put(("done", job_id, path))
+        except Exception as e:
+            results.put(("failed", job_id, str(e)))
+
+class OfflineSpeechWorker:
+    """Runs pyttsx3 in dedicated worker processes fed by a job queue"""
+    def __init__(self, processes=1, output_dir='data', rate=150, volume=0.9, max_age=3600, check_interval=1.0,
+                 restart_delay=1.0, max_restart_delay=60, max_restarts=5):
+        self.processes = processes
+        self.output_dir = output_dir
+        self.rate = rate
+        self.volume = volume
+
+        # Finished jobs nobody waited for are forgotten after max_age seconds, and the
+        # worker processes are checked for crashes every check_interval seconds
+        self.max_age = max_age
+        self.check_interval = check_interval
+
+        # Crashed workers are replaced after a delay that doubles with every consecutive
+        # crash; after max_restarts crashes without a finished job the engine is given up
+        self.restart_delay = restart_delay
+        self.max_restart_delay = max_restart_delay
+        self.max_restarts = max_restarts
+        self.crashes = 0
+        self.restart_at = 0
+
+        # Spawned (not forked) so workers never inherit the web server's threads
+        self.context = multiprocessing.get_context('spawn')
+        self.jobs_queue = None
+        self.results_queue = None
+        self.workers = []
+        self.ready = set()  # PIDs of workers whose engine started
+
+        self.jobs = {}
+        self.closed = False
+        self.unavailable = None  # Why the engine cannot run, once that is known
+        self.lock = threading.Lock()
+
+    def _ensure_started(self):
+        """Start the worker processes on first use and replace any that have died"""
+        with self.lock:
+            if self.unavailable:
+                raise RuntimeError(f"Offline speech is unavailable: {self.unavailable}")
+            self.closed = False
+            if self.jobs_queue is None:
+                self.jobs_queue = self.context.Queue()
+                self.results_queue = self.context.Queue()
+
+                collector = threading.Thread(target=self._collect_results)
+                collector.daemon = True
+                collector.start()
+
+            self._supervise()
+
+    def _supervise(self):
+        """Fail the jobs of worker processes that died and replace them, backing off; the caller holds the lock"""
+        dead = [worker for worker in self.workers if not worker.is_alive()]
+        if dead:
+            self.workers = [worker for worker in self.workers if worker.is_alive()]
+            self.crashes += len(dead)
+
+            alive = {worker.pid for worker in self.workers}
+            for job in self.jobs.values():
+                if job["status"] == "running" and job["worker"] not in alive:
+                    self._finish(job, None, "The speech worker process exited")
+
+            # Workers that die before their engine starts will not start it on the next try
+            # either, so queued jobs fail now rather than waiting for one that never comes
+            started_before_exit = any(worker.pid in self.ready for worker in dead)
+            if not started_before_exit and not alive & self.ready:
+                for job in self.jobs.values():
+                    if job["status"] == "queued":
+                        self._finish(job, None, "The speech worker process exited before starting")
+            self.ready -= {worker.pid for worker in dead}
+
+            if self.crashes >= self.max_restarts:
+                self._give_up(f"The speech worker process exited {self.crashes} times in a row")
+                return
+            self.restart_at = time.time() + min(self.restart_delay * 2 ** (self.crashes - 1), self.max_restart_delay)
+
+        if time.time() >= self.restart_at:
+            self._start_workers()
+
+    def _give_up(self, error):
+        """Mark the engine unavailable and fail every unfinished job; the caller holds the lock"""
+        print(f"Offline speech is unavailable: {error}")
+        self.unavailable = error
+        for job in self.jobs.values():
+            if not job["finished_at"]:
+                self._finish(job, None, f"Offline speech is unavailable: {error}")
+
+    def _start_workers(self):
+        """Bring the pool back to its size; the caller holds the lock"""
+        while len(self.workers) < self.processes:
+            worker = self.context.Process(
+                target=_worker_main,
+                args=(self.jobs_queue, self.results_queue, self.rate, self.volume)
+            )
+            worker.daemon = True
+            worker.start()
+            self.workers.append(worker)
+
+    def _collect_results(self):
+        """Record job progress reported by the worker processes, checking on them in between"""
+        while True:
+            try:
+                kind, job_id, value = self.results_queue.get(timeout=self.check_interval)
+            except queue.Empty:
+                self._check_workers()
+                continue
+
+            with self.lock:
+                if kind == "ready":
+                    self.ready.add(value)
+                    continue
+                if kind == "unavailable":
+                    self._give_up(value)
+                    continue
+
+                job = self.jobs.get(job_id)
+                if job is None:
+                    # The caller gave up on this job, so its audio would never be used
+                    if kind == "done" and os.path.exists(value):
+                        os.remove(value)
+                elif kind == "started":
+                    job["status"] = "running"
+                    job["worker"] = value
+                else:
+                    self._finish(job, value if kind == "done" else None, value if kind == "failed" else None)
+                if kind == "done":
+                    self.crashes = 0
+
+    def _check_workers(self):
+        """Fail the jobs of worker processes that died, replace those processes and forget old jobs"""
+        with self.lock:
+            if not self.closed and not self.unavailable:
+                self._supervise()
+
+            now = time.time()
+            expired = [job_id for job_id, job in self.jobs.items() if job["finished_at"] and now - job["finished_at"] > self.max_age]
+            for job_id in expired:
+                del self.jobs[job_id]
+
+    def _finish(self, job, path, error):
+        """Record the outcome of a job and wake its waiter; the caller holds the lock"""
+        job["status"] = "failed" if error else "done"
+        job["path"] = path
+        job["error"] = error
+        job["finished_at"] = time.time()
+        job["event"].set()
+
+    def submit(self, text):
+        """Queue text for synthesis and return the job ID"""
+        self._ensure_started()
+
+        # Every job gets its own output file, so concurrent requests never overwrite each other
+        job_id = uuid.uuid4().hex
+        path = os.path.join(self.output_dir, f"audio_{job_id}.wav")
+        with self.lock:
+            self.jobs[job_id] = {
+                "status": "queued", "path": None, "error": None,
+                "worker": None, "finished_at": None, "event": threading.Event()
+            }
+
+        self.jobs_queue.put((job_id, text, path))
+        return job_id
+
+    def status(self, job_id):
+        """Current state of a job, or None if the ID is unknown"""
+        with self.lock:
+            job = self.jobs.get(job_id)
+        if job is None:
+            return None
+        return {"status": job["status"], "path": job["path"], "error": job["error"]}
+
+    def wait(self, job_id, timeout=None):
+        """Block until a job finishes and return its output path"""
+        with self.lock:
+            job = self.jobs[job_id]
+        job["event"].wait(timeout)
+
+        # The job is forgotten either way; audio that arrives after a timeout is deleted
+        with self.lock:
+            self.jobs.pop(job_id, None)
+            finished = job["event"].is_set()
+        if not finished:
+            raise TimeoutError(f"Offline speech job {job_id} did not finish in time")
+        if job["error"]:
+            raise RuntimeError(job["error"])
+        return job["path"]
+
+    def close(self):
+        """Ask the worker processes to exit"""
+        with self.lock:
+            self.closed = True
+            for _ in self.workers:
+                self.jobs_queue.put(None)
+            self.workers = []
\ No newline at end of file